@@ -20,130 +20,179 @@ from tempest_lib.services.identity.v2.token_client import TokenClientJSON
 from tempest_lib.services.identity.v3.token_client import V3TokenClientJSON
 
 from tempest.common import cred_provider
+from tempest.common import lazy_import
 from tempest.common import negative_rest_client
 from tempest import config
 from tempest import exceptions
 from tempest import manager
-from tempest.services.baremetal.v1.json.baremetal_client import \
-    BaremetalClient
-from tempest.services import botoclients
-from tempest.services.compute.json.agents_client import \
-    AgentsClient
-from tempest.services.compute.json.aggregates_client import \
-    AggregatesClient
-from tempest.services.compute.json.availability_zone_client import \
-    AvailabilityZoneClient
-from tempest.services.compute.json.baremetal_nodes_client import \
-    BaremetalNodesClient
-from tempest.services.compute.json.certificates_client import \
-    CertificatesClient
-from tempest.services.compute.json.extensions_client import \
-    ExtensionsClient
-from tempest.services.compute.json.fixed_ips_client import FixedIPsClient
-from tempest.services.compute.json.flavors_client import FlavorsClient
-from tempest.services.compute.json.floating_ip_pools_client import \
-    FloatingIPPoolsClient
-from tempest.services.compute.json.floating_ips_bulk_client import \
-    FloatingIPsBulkClient
-from tempest.services.compute.json.floating_ips_client import \
-    FloatingIPsClient
-from tempest.services.compute.json.hosts_client import HostsClient
-from tempest.services.compute.json.hypervisor_client import \
-    HypervisorClient
-from tempest.services.compute.json.images_client import ImagesClient
-from tempest.services.compute.json.instance_usage_audit_log_client import \
-    InstanceUsagesAuditLogClient
-from tempest.services.compute.json.interfaces_client import \
-    InterfacesClient
-from tempest.services.compute.json.keypairs_client import KeyPairsClient
-from tempest.services.compute.json.limits_client import LimitsClient
-from tempest.services.compute.json.migrations_client import \
-    MigrationsClient
-from tempest.services.compute.json.networks_client import NetworksClient
-from tempest.services.compute.json.quota_classes_client import \
-    QuotaClassesClient
-from tempest.services.compute.json.quotas_client import QuotasClient
-from tempest.services.compute.json.security_group_default_rules_client import \
-    SecurityGroupDefaultRulesClient
-from tempest.services.compute.json.security_group_rules_client import \
-    SecurityGroupRulesClient
-from tempest.services.compute.json.security_groups_client import \
-    SecurityGroupsClient
-from tempest.services.compute.json.server_groups_client import \
-    ServerGroupsClient
-from tempest.services.compute.json.servers_client import ServersClient
-from tempest.services.compute.json.services_client import ServicesClient
-from tempest.services.compute.json.tenant_networks_client import \
-    TenantNetworksClient
-from tempest.services.compute.json.tenant_usages_client import \
-    TenantUsagesClient
-from tempest.services.compute.json.volumes_extensions_client import \
-    VolumesExtensionsClient
-from tempest.services.data_processing.v1_1.data_processing_client import \
-    DataProcessingClient
-from tempest.services.database.json.flavors_client import \
-    DatabaseFlavorsClient
-from tempest.services.database.json.limits_client import \
-    DatabaseLimitsClient
-from tempest.services.database.json.versions_client import \
-    DatabaseVersionsClient
-from tempest.services.identity.v2.json.identity_client import \
-    IdentityClient
-from tempest.services.identity.v3.json.credentials_client import \
-    CredentialsClient
-from tempest.services.identity.v3.json.endpoints_client import \
-    EndPointClient
-from tempest.services.identity.v3.json.identity_client import \
-    IdentityV3Client
-from tempest.services.identity.v3.json.policy_client import PolicyClient
-from tempest.services.identity.v3.json.region_client import RegionClient
-from tempest.services.identity.v3.json.service_client import \
-    ServiceClient
-from tempest.services.image.v1.json.image_client import ImageClient
-from tempest.services.image.v2.json.image_client import ImageClientV2
-from tempest.services.messaging.json.messaging_client import \
-    MessagingClient
-from tempest.services.network.json.network_client import NetworkClient
-from tempest.services.object_storage.account_client import AccountClient
-from tempest.services.object_storage.container_client import ContainerClient
-from tempest.services.object_storage.object_client import ObjectClient
-from tempest.services.orchestration.json.orchestration_client import \
-    OrchestrationClient
-from tempest.services.telemetry.json.telemetry_client import \
-    TelemetryClient
-from tempest.services.volume.json.admin.volume_hosts_client import \
-    VolumeHostsClient
-from tempest.services.volume.json.admin.volume_quotas_client import \
-    VolumeQuotasClient
-from tempest.services.volume.json.admin.volume_services_client import \
-    VolumesServicesClient
-from tempest.services.volume.json.admin.volume_types_client import \
-    VolumeTypesClient
-from tempest.services.volume.json.availability_zone_client import \
-    VolumeAvailabilityZoneClient
-from tempest.services.volume.json.backups_client import BackupsClient
-from tempest.services.volume.json.extensions_client import \
-    ExtensionsClient as VolumeExtensionClient
-from tempest.services.volume.json.qos_client import QosSpecsClient
-from tempest.services.volume.json.snapshots_client import SnapshotsClient
-from tempest.services.volume.json.volumes_client import VolumesClient
-from tempest.services.volume.v2.json.admin.volume_hosts_client import \
-    VolumeHostsV2Client
-from tempest.services.volume.v2.json.admin.volume_quotas_client import \
-    VolumeQuotasV2Client
-from tempest.services.volume.v2.json.admin.volume_services_client import \
-    VolumesServicesV2Client
-from tempest.services.volume.v2.json.admin.volume_types_client import \
-    VolumeTypesV2Client
-from tempest.services.volume.v2.json.availability_zone_client import \
-    VolumeV2AvailabilityZoneClient
-from tempest.services.volume.v2.json.backups_client import BackupsClientV2
-from tempest.services.volume.v2.json.extensions_client import \
-    ExtensionsV2Client as VolumeV2ExtensionClient
-from tempest.services.volume.v2.json.qos_client import QosSpecsV2Client
-from tempest.services.volume.v2.json.snapshots_client import \
-    SnapshotsV2Client
-from tempest.services.volume.v2.json.volumes_client import VolumesV2Client
+
+# The service clients are only imported when first instantiated, see
+# tempest.common.lazy_import
+BaremetalClient = lazy_import.lazy_class(
+    'tempest.services.baremetal.v1.json.baremetal_client.BaremetalClient')
+botoclients = lazy_import.lazy_module('tempest.services.botoclients')
+AgentsClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.agents_client.AgentsClient')
+AggregatesClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.aggregates_client.AggregatesClient')
+AvailabilityZoneClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.availability_zone_client.'
+    'AvailabilityZoneClient')
+BaremetalNodesClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.baremetal_nodes_client.'
+    'BaremetalNodesClient')
+CertificatesClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.certificates_client.CertificatesClient')
+ExtensionsClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.extensions_client.ExtensionsClient')
+FixedIPsClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.fixed_ips_client.FixedIPsClient')
+FlavorsClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.flavors_client.FlavorsClient')
+FloatingIPPoolsClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.floating_ip_pools_client.'
+    'FloatingIPPoolsClient')
+FloatingIPsBulkClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.floating_ips_bulk_client.'
+    'FloatingIPsBulkClient')
+FloatingIPsClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.floating_ips_client.FloatingIPsClient')
+HostsClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.hosts_client.HostsClient')
+HypervisorClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.hypervisor_client.HypervisorClient')
+ImagesClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.images_client.ImagesClient')
+InstanceUsagesAuditLogClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.instance_usage_audit_log_client.'
+    'InstanceUsagesAuditLogClient')
+InterfacesClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.interfaces_client.InterfacesClient')
+KeyPairsClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.keypairs_client.KeyPairsClient')
+LimitsClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.limits_client.LimitsClient')
+MigrationsClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.migrations_client.MigrationsClient')
+NetworksClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.networks_client.NetworksClient')
+QuotaClassesClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.quota_classes_client.QuotaClassesClient')
+QuotasClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.quotas_client.QuotasClient')
+SecurityGroupDefaultRulesClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.security_group_default_rules_client.'
+    'SecurityGroupDefaultRulesClient')
+SecurityGroupRulesClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.security_group_rules_client.'
+    'SecurityGroupRulesClient')
+SecurityGroupsClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.security_groups_client.'
+    'SecurityGroupsClient')
+ServerGroupsClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.server_groups_client.ServerGroupsClient')
+ServersClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.servers_client.ServersClient')
+ServicesClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.services_client.ServicesClient')
+TenantNetworksClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.tenant_networks_client.'
+    'TenantNetworksClient')
+TenantUsagesClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.tenant_usages_client.TenantUsagesClient')
+VolumesExtensionsClient = lazy_import.lazy_class(
+    'tempest.services.compute.json.volumes_extensions_client.'
+    'VolumesExtensionsClient')
+DataProcessingClient = lazy_import.lazy_class(
+    'tempest.services.data_processing.v1_1.data_processing_client.'
+    'DataProcessingClient')
+DatabaseFlavorsClient = lazy_import.lazy_class(
+    'tempest.services.database.json.flavors_client.DatabaseFlavorsClient')
+DatabaseLimitsClient = lazy_import.lazy_class(
+    'tempest.services.database.json.limits_client.DatabaseLimitsClient')
+DatabaseVersionsClient = lazy_import.lazy_class(
+    'tempest.services.database.json.versions_client.DatabaseVersionsClient')
+IdentityClient = lazy_import.lazy_class(
+    'tempest.services.identity.v2.json.identity_client.IdentityClient')
+CredentialsClient = lazy_import.lazy_class(
+    'tempest.services.identity.v3.json.credentials_client.CredentialsClient')
+EndPointClient = lazy_import.lazy_class(
+    'tempest.services.identity.v3.json.endpoints_client.EndPointClient')
+IdentityV3Client = lazy_import.lazy_class(
+    'tempest.services.identity.v3.json.identity_client.IdentityV3Client')
+PolicyClient = lazy_import.lazy_class(
+    'tempest.services.identity.v3.json.policy_client.PolicyClient')
+RegionClient = lazy_import.lazy_class(
+    'tempest.services.identity.v3.json.region_client.RegionClient')
+ServiceClient = lazy_import.lazy_class(
+    'tempest.services.identity.v3.json.service_client.ServiceClient')
+ImageClient = lazy_import.lazy_class(
+    'tempest.services.image.v1.json.image_client.ImageClient')
+ImageClientV2 = lazy_import.lazy_class(
+    'tempest.services.image.v2.json.image_client.ImageClientV2')
+MessagingClient = lazy_import.lazy_class(
+    'tempest.services.messaging.json.messaging_client.MessagingClient')
+NetworkClient = lazy_import.lazy_class(
+    'tempest.services.network.json.network_client.NetworkClient')
+AccountClient = lazy_import.lazy_class(
+    'tempest.services.object_storage.account_client.AccountClient')
+ContainerClient = lazy_import.lazy_class(
+    'tempest.services.object_storage.container_client.ContainerClient')
+ObjectClient = lazy_import.lazy_class(
+    'tempest.services.object_storage.object_client.ObjectClient')
+OrchestrationClient = lazy_import.lazy_class(
+    'tempest.services.orchestration.json.orchestration_client.'
+    'OrchestrationClient')
+TelemetryClient = lazy_import.lazy_class(
+    'tempest.services.telemetry.json.telemetry_client.TelemetryClient')
+VolumeHostsClient = lazy_import.lazy_class(
+    'tempest.services.volume.json.admin.volume_hosts_client.VolumeHostsClient')
+VolumeQuotasClient = lazy_import.lazy_class(
+    'tempest.services.volume.json.admin.volume_quotas_client.'
+    'VolumeQuotasClient')
+VolumesServicesClient = lazy_import.lazy_class(
+    'tempest.services.volume.json.admin.volume_services_client.'
+    'VolumesServicesClient')
+VolumeTypesClient = lazy_import.lazy_class(
+    'tempest.services.volume.json.admin.volume_types_client.VolumeTypesClient')
+VolumeAvailabilityZoneClient = lazy_import.lazy_class(
+    'tempest.services.volume.json.availability_zone_client.'
+    'VolumeAvailabilityZoneClient')
+BackupsClient = lazy_import.lazy_class(
+    'tempest.services.volume.json.backups_client.BackupsClient')
+VolumeExtensionClient = lazy_import.lazy_class(
+    'tempest.services.volume.json.extensions_client.ExtensionsClient')
+QosSpecsClient = lazy_import.lazy_class(
+    'tempest.services.volume.json.qos_client.QosSpecsClient')
+SnapshotsClient = lazy_import.lazy_class(
+    'tempest.services.volume.json.snapshots_client.SnapshotsClient')
+VolumesClient = lazy_import.lazy_class(
+    'tempest.services.volume.json.volumes_client.VolumesClient')
+VolumeHostsV2Client = lazy_import.lazy_class(
+    'tempest.services.volume.v2.json.admin.volume_hosts_client.'
+    'VolumeHostsV2Client')
+VolumeQuotasV2Client = lazy_import.lazy_class(
+    'tempest.services.volume.v2.json.admin.volume_quotas_client.'
+    'VolumeQuotasV2Client')
+VolumesServicesV2Client = lazy_import.lazy_class(
+    'tempest.services.volume.v2.json.admin.volume_services_client.'
+    'VolumesServicesV2Client')
+VolumeTypesV2Client = lazy_import.lazy_class(
+    'tempest.services.volume.v2.json.admin.volume_types_client.'
+    'VolumeTypesV2Client')
+VolumeV2AvailabilityZoneClient = lazy_import.lazy_class(
+    'tempest.services.volume.v2.json.availability_zone_client.'
+    'VolumeV2AvailabilityZoneClient')
+BackupsClientV2 = lazy_import.lazy_class(
+    'tempest.services.volume.v2.json.backups_client.BackupsClientV2')
+VolumeV2ExtensionClient = lazy_import.lazy_class(
+    'tempest.services.volume.v2.json.extensions_client.ExtensionsV2Client')
+QosSpecsV2Client = lazy_import.lazy_class(
+    'tempest.services.volume.v2.json.qos_client.QosSpecsV2Client')
+SnapshotsV2Client = lazy_import.lazy_class(
+    'tempest.services.volume.v2.json.snapshots_client.SnapshotsV2Client')
+VolumesV2Client = lazy_import.lazy_class(
+    'tempest.services.volume.v2.json.volumes_client.VolumesV2Client')
 
 CONF = config.CONF
 LOG = logging.getLogger(__name__)
@@ -173,19 +222,23 @@ class Manager(manager.Manager):
     def __init__(self, credentials=None, service=None):
         super(Manager, self).__init__(credentials=credentials)
 
+        # The clients are only instantiated on first access, see __getattr__
+        self._client_factories = {}
         self._set_compute_clients()
         self._set_database_clients()
         self._set_identity_clients()
         self._set_volume_clients()
         self._set_object_storage_clients()
 
-        self.baremetal_client = BaremetalClient(
+        self._set_client(
+            'baremetal_client', BaremetalClient,
             self.auth_provider,
             CONF.baremetal.catalog_type,
             CONF.identity.region,
             endpoint_type=CONF.baremetal.endpoint_type,
             **self.default_params_with_timeout_values)
-        self.network_client = NetworkClient(
+        self._set_client(
+            'network_client', NetworkClient,
             self.auth_provider,
             CONF.network.catalog_type,
             CONF.network.region or CONF.identity.region,
@@ -193,20 +246,23 @@ class Manager(manager.Manager):
             build_interval=CONF.network.build_interval,
             build_timeout=CONF.network.build_timeout,
             **self.default_params)
-        self.messaging_client = MessagingClient(
+        self._set_client(
+            'messaging_client', MessagingClient,
             self.auth_provider,
             CONF.messaging.catalog_type,
             CONF.identity.region,
             **self.default_params_with_timeout_values)
         if CONF.service_available.ceilometer:
-            self.telemetry_client = TelemetryClient(
+            self._set_client(
+                'telemetry_client', TelemetryClient,
                 self.auth_provider,
                 CONF.telemetry.catalog_type,
                 CONF.identity.region,
                 endpoint_type=CONF.telemetry.endpoint_type,
                 **self.default_params_with_timeout_values)
         if CONF.service_available.glance:
-            self.image_client = ImageClient(
+            self._set_client(
+                'image_client', ImageClient,
                 self.auth_provider,
                 CONF.image.catalog_type,
                 CONF.image.region or CONF.identity.region,
@@ -214,7 +270,8 @@ class Manager(manager.Manager):
                 build_interval=CONF.image.build_interval,
                 build_timeout=CONF.image.build_timeout,
                 **self.default_params)
-            self.image_client_v2 = ImageClientV2(
+            self._set_client(
+                'image_client_v2', ImageClientV2,
                 self.auth_provider,
                 CONF.image.catalog_type,
                 CONF.image.region or CONF.identity.region,
@@ -222,7 +279,8 @@ class Manager(manager.Manager):
                 build_interval=CONF.image.build_interval,
                 build_timeout=CONF.image.build_timeout,
                 **self.default_params)
-        self.orchestration_client = OrchestrationClient(
+        self._set_client(
+            'orchestration_client', OrchestrationClient,
             self.auth_provider,
             CONF.orchestration.catalog_type,
             CONF.orchestration.region or CONF.identity.region,
@@ -230,13 +288,15 @@ class Manager(manager.Manager):
             build_interval=CONF.orchestration.build_interval,
             build_timeout=CONF.orchestration.build_timeout,
             **self.default_params)
-        self.data_processing_client = DataProcessingClient(
+        self._set_client(
+            'data_processing_client', DataProcessingClient,
             self.auth_provider,
             CONF.data_processing.catalog_type,
             CONF.identity.region,
             endpoint_type=CONF.data_processing.endpoint_type,
             **self.default_params_with_timeout_values)
-        self.negative_client = negative_rest_client.NegativeRestClient(
+        self._set_client(
+            'negative_client', negative_rest_client.NegativeRestClient,
             self.auth_provider, service, **self.default_params)
 
         # Generating EC2 credentials in tempest is only supported
@@ -245,8 +305,32 @@ class Manager(manager.Manager):
                 CONF.identity.auth_version == 'v2':
             # EC2 and S3 clients, if used, will check configured AWS
             # credentials and generate new ones if needed
-            self.ec2api_client = botoclients.APIClientEC2(self.identity_client)
-            self.s3_client = botoclients.ObjectClientS3(self.identity_client)
+            self._set_client(
+                'ec2api_client',
+                lambda: botoclients.APIClientEC2(self.identity_client))
+            self._set_client(
+                's3_client',
+                lambda: botoclients.ObjectClientS3(self.identity_client))
+
+    def __getattr__(self, name):
+        # Only called when the attribute is not set, that is for the
+        # clients not accessed yet
+        try:
+            factory, args, kwargs = self.__dict__['_client_factories'][name]
+        except KeyError:
+            raise AttributeError("'%s' object has no attribute '%s'" %
+                                 (type(self).__name__, name))
+        client = factory(*args, **kwargs)
+        # Another thread may have instantiated the client meanwhile
+        return self.__dict__.setdefault(name, client)
+
+    def _set_client(self, name, factory, *args, **kwargs):
+        """Sets the client attribute name, instantiated on first access.
+
+        The client is created with factory(*args, **kwargs), unless the
+        attribute is set directly before being accessed.
+        """
+        self._client_factories[name] = (factory, args, kwargs)
 
     def _set_compute_clients(self):
         params = {
@@ -258,60 +342,45 @@ class Manager(manager.Manager):
         }
         params.update(self.default_params)
 
-        self.agents_client = AgentsClient(self.auth_provider, **params)
-        self.networks_client = NetworksClient(self.auth_provider, **params)
-        self.migrations_client = MigrationsClient(self.auth_provider,
-                                                  **params)
-        self.security_group_default_rules_client = (
-            SecurityGroupDefaultRulesClient(self.auth_provider, **params))
-        self.certificates_client = CertificatesClient(self.auth_provider,
-                                                      **params)
-        self.servers_client = ServersClient(
+        for name, client_class in (
+                ('agents_client', AgentsClient),
+                ('networks_client', NetworksClient),
+                ('migrations_client', MigrationsClient),
+                ('security_group_default_rules_client',
+                 SecurityGroupDefaultRulesClient),
+                ('certificates_client', CertificatesClient),
+                ('server_groups_client', ServerGroupsClient),
+                ('limits_client', LimitsClient),
+                ('images_client', ImagesClient),
+                ('keypairs_client', KeyPairsClient),
+                ('quotas_client', QuotasClient),
+                ('quota_classes_client', QuotaClassesClient),
+                ('flavors_client', FlavorsClient),
+                ('extensions_client', ExtensionsClient),
+                ('floating_ip_pools_client', FloatingIPPoolsClient),
+                ('floating_ips_bulk_client', FloatingIPsBulkClient),
+                ('floating_ips_client', FloatingIPsClient),
+                ('security_group_rules_client', SecurityGroupRulesClient),
+                ('security_groups_client', SecurityGroupsClient),
+                ('interfaces_client', InterfacesClient),
+                ('fixed_ips_client', FixedIPsClient),
+                ('availability_zone_client', AvailabilityZoneClient),
+                ('aggregates_client', AggregatesClient),
+                ('services_client', ServicesClient),
+                ('tenant_usages_client', TenantUsagesClient),
+                ('hosts_client', HostsClient),
+                ('hypervisor_client', HypervisorClient),
+                ('instance_usages_audit_log_client',
+                 InstanceUsagesAuditLogClient),
+                ('tenant_networks_client', TenantNetworksClient),
+                ('baremetal_nodes_client', BaremetalNodesClient)):
+            self._set_client(name, client_class, self.auth_provider, **params)
+        self._set_client(
+            'servers_client', ServersClient,
             self.auth_provider,
             enable_instance_password=CONF.compute_feature_enabled
                 .enable_instance_password,
             **params)
-        self.server_groups_client = ServerGroupsClient(
-            self.auth_provider, **params)
-        self.limits_client = LimitsClient(self.auth_provider, **params)
-        self.images_client = ImagesClient(self.auth_provider, **params)
-        self.keypairs_client = KeyPairsClient(self.auth_provider, **params)
-        self.quotas_client = QuotasClient(self.auth_provider, **params)
-        self.quota_classes_client = QuotaClassesClient(self.auth_provider,
-                                                       **params)
-        self.flavors_client = FlavorsClient(self.auth_provider, **params)
-        self.extensions_client = ExtensionsClient(self.auth_provider,
-                                                  **params)
-        self.floating_ip_pools_client = FloatingIPPoolsClient(
-            self.auth_provider, **params)
-        self.floating_ips_bulk_client = FloatingIPsBulkClient(
-            self.auth_provider, **params)
-        self.floating_ips_client = FloatingIPsClient(self.auth_provider,
-                                                     **params)
-        self.security_group_rules_client = SecurityGroupRulesClient(
-            self.auth_provider, **params)
-        self.security_groups_client = SecurityGroupsClient(
-            self.auth_provider, **params)
-        self.interfaces_client = InterfacesClient(self.auth_provider,
-                                                  **params)
-        self.fixed_ips_client = FixedIPsClient(self.auth_provider,
-                                               **params)
-        self.availability_zone_client = AvailabilityZoneClient(
-            self.auth_provider, **params)
-        self.aggregates_client = AggregatesClient(self.auth_provider,
-                                                  **params)
-        self.services_client = ServicesClient(self.auth_provider, **params)
-        self.tenant_usages_client = TenantUsagesClient(self.auth_provider,
-                                                       **params)
-        self.hosts_client = HostsClient(self.auth_provider, **params)
-        self.hypervisor_client = HypervisorClient(self.auth_provider,
-                                                  **params)
-        self.instance_usages_audit_log_client = \
-            InstanceUsagesAuditLogClient(self.auth_provider, **params)
-        self.tenant_networks_client = \
-            TenantNetworksClient(self.auth_provider, **params)
-        self.baremetal_nodes_client = BaremetalNodesClient(
-            self.auth_provider, **params)
 
         # NOTE: The following client needs special timeout values because
         # the API is a proxy for the other component.
@@ -320,26 +389,22 @@ class Manager(manager.Manager):
             'build_interval': CONF.volume.build_interval,
             'build_timeout': CONF.volume.build_timeout
         })
-        self.volumes_extensions_client = VolumesExtensionsClient(
+        self._set_client(
+            'volumes_extensions_client', VolumesExtensionsClient,
             self.auth_provider, default_volume_size=CONF.volume.volume_size,
             **params_volume)
 
     def _set_database_clients(self):
-        self.database_flavors_client = DatabaseFlavorsClient(
-            self.auth_provider,
-            CONF.database.catalog_type,
-            CONF.identity.region,
-            **self.default_params_with_timeout_values)
-        self.database_limits_client = DatabaseLimitsClient(
-            self.auth_provider,
-            CONF.database.catalog_type,
-            CONF.identity.region,
-            **self.default_params_with_timeout_values)
-        self.database_versions_client = DatabaseVersionsClient(
-            self.auth_provider,
-            CONF.database.catalog_type,
-            CONF.identity.region,
-            **self.default_params_with_timeout_values)
+        for name, client_class in (
+                ('database_flavors_client', DatabaseFlavorsClient),
+                ('database_limits_client', DatabaseLimitsClient),
+                ('database_versions_client', DatabaseVersionsClient)):
+            self._set_client(
+                name, client_class,
+                self.auth_provider,
+                CONF.database.catalog_type,
+                CONF.identity.region,
+                **self.default_params_with_timeout_values)
 
     def _set_identity_clients(self):
         params = {
@@ -350,40 +415,40 @@ class Manager(manager.Manager):
         params_v2_admin = params.copy()
         params_v2_admin['endpoint_type'] = CONF.identity.v2_admin_endpoint_type
         # Client uses admin endpoint type of Keystone API v2
-        self.identity_client = IdentityClient(self.auth_provider,
-                                              **params_v2_admin)
+        self._set_client('identity_client', IdentityClient,
+                         self.auth_provider, **params_v2_admin)
         params_v2_public = params.copy()
         params_v2_public['endpoint_type'] = (
             CONF.identity.v2_public_endpoint_type)
         # Client uses public endpoint type of Keystone API v2
-        self.identity_public_client = IdentityClient(self.auth_provider,
-                                                     **params_v2_public)
+        self._set_client('identity_public_client', IdentityClient,
+                         self.auth_provider, **params_v2_public)
         params_v3 = params.copy()
         params_v3['endpoint_type'] = CONF.identity.v3_endpoint_type
         # Client uses the endpoint type of Keystone API v3
-        self.identity_v3_client = IdentityV3Client(self.auth_provider,
-                                                   **params_v3)
-        self.endpoints_client = EndPointClient(self.auth_provider,
-                                               **params)
-        self.service_client = ServiceClient(self.auth_provider, **params)
-        self.policy_client = PolicyClient(self.auth_provider, **params)
-        self.region_client = RegionClient(self.auth_provider, **params)
-        self.credentials_client = CredentialsClient(self.auth_provider,
-                                                    **params)
+        self._set_client('identity_v3_client', IdentityV3Client,
+                         self.auth_provider, **params_v3)
+        for name, client_class in (
+                ('endpoints_client', EndPointClient),
+                ('service_client', ServiceClient),
+                ('policy_client', PolicyClient),
+                ('region_client', RegionClient),
+                ('credentials_client', CredentialsClient)):
+            self._set_client(name, client_class, self.auth_provider, **params)
         # Token clients do not use the catalog. They only need default_params.
         # They read auth_url, so they should only be set if the corresponding
         # API version is marked as enabled
         if CONF.identity_feature_enabled.api_v2:
             if CONF.identity.uri:
-                self.token_client = TokenClientJSON(
-                    CONF.identity.uri, **self.default_params)
+                self._set_client('token_client', TokenClientJSON,
+                                 CONF.identity.uri, **self.default_params)
             else:
                 msg = 'Identity v2 API enabled, but no identity.uri set'
                 raise exceptions.InvalidConfiguration(msg)
         if CONF.identity_feature_enabled.api_v3:
             if CONF.identity.uri_v3:
-                self.token_v3_client = V3TokenClientJSON(
-                    CONF.identity.uri_v3, **self.default_params)
+                self._set_client('token_v3_client', V3TokenClientJSON,
+                                 CONF.identity.uri_v3, **self.default_params)
             else:
                 msg = 'Identity v3 API enabled, but no identity.uri_v3 set'
                 raise exceptions.InvalidConfiguration(msg)
@@ -398,47 +463,33 @@ class Manager(manager.Manager):
         }
         params.update(self.default_params)
 
-        self.volume_qos_client = QosSpecsClient(self.auth_provider,
-                                                **params)
-        self.volume_qos_v2_client = QosSpecsV2Client(
-            self.auth_provider, **params)
-        self.volume_services_v2_client = VolumesServicesV2Client(
-            self.auth_provider, **params)
-        self.backups_client = BackupsClient(self.auth_provider, **params)
-        self.backups_v2_client = BackupsClientV2(self.auth_provider,
-                                                 **params)
-        self.snapshots_client = SnapshotsClient(self.auth_provider,
-                                                **params)
-        self.snapshots_v2_client = SnapshotsV2Client(self.auth_provider,
-                                                     **params)
-        self.volumes_client = VolumesClient(
-            self.auth_provider, default_volume_size=CONF.volume.volume_size,
-            **params)
-        self.volumes_v2_client = VolumesV2Client(
-            self.auth_provider, default_volume_size=CONF.volume.volume_size,
-            **params)
-        self.volume_types_client = VolumeTypesClient(self.auth_provider,
-                                                     **params)
-        self.volume_services_client = VolumesServicesClient(
-            self.auth_provider, **params)
-        self.volume_hosts_client = VolumeHostsClient(self.auth_provider,
-                                                     **params)
-        self.volume_hosts_v2_client = VolumeHostsV2Client(
-            self.auth_provider, **params)
-        self.volume_quotas_client = VolumeQuotasClient(self.auth_provider,
-                                                       **params)
-        self.volume_quotas_v2_client = VolumeQuotasV2Client(self.auth_provider,
-                                                            **params)
-        self.volumes_extension_client = VolumeExtensionClient(
-            self.auth_provider, **params)
-        self.volumes_v2_extension_client = VolumeV2ExtensionClient(
-            self.auth_provider, **params)
-        self.volume_availability_zone_client = \
-            VolumeAvailabilityZoneClient(self.auth_provider, **params)
-        self.volume_v2_availability_zone_client = \
-            VolumeV2AvailabilityZoneClient(self.auth_provider, **params)
-        self.volume_types_v2_client = VolumeTypesV2Client(
-            self.auth_provider, **params)
+        for name, client_class in (
+                ('volume_qos_client', QosSpecsClient),
+                ('volume_qos_v2_client', QosSpecsV2Client),
+                ('volume_services_v2_client', VolumesServicesV2Client),
+                ('backups_client', BackupsClient),
+                ('backups_v2_client', BackupsClientV2),
+                ('snapshots_client', SnapshotsClient),
+                ('snapshots_v2_client', SnapshotsV2Client),
+                ('volume_types_client', VolumeTypesClient),
+                ('volume_services_client', VolumesServicesClient),
+                ('volume_hosts_client', VolumeHostsClient),
+                ('volume_hosts_v2_client', VolumeHostsV2Client),
+                ('volume_quotas_client', VolumeQuotasClient),
+                ('volume_quotas_v2_client', VolumeQuotasV2Client),
+                ('volumes_extension_client', VolumeExtensionClient),
+                ('volumes_v2_extension_client', VolumeV2ExtensionClient),
+                ('volume_availability_zone_client',
+                 VolumeAvailabilityZoneClient),
+                ('volume_v2_availability_zone_client',
+                 VolumeV2AvailabilityZoneClient),
+                ('volume_types_v2_client', VolumeTypesV2Client)):
+            self._set_client(name, client_class, self.auth_provider, **params)
+        for name, client_class in (('volumes_client', VolumesClient),
+                                   ('volumes_v2_client', VolumesV2Client)):
+            self._set_client(name, client_class, self.auth_provider,
+                             default_volume_size=CONF.volume.volume_size,
+                             **params)
 
     def _set_object_storage_clients(self):
         params = {
@@ -448,9 +499,10 @@ class Manager(manager.Manager):
         }
         params.update(self.default_params_with_timeout_values)
 
-        self.account_client = AccountClient(self.auth_provider, **params)
-        self.container_client = ContainerClient(self.auth_provider, **params)
-        self.object_client = ObjectClient(self.auth_provider, **params)
+        for name, client_class in (('account_client', AccountClient),
+                                   ('container_client', ContainerClient),
+                                   ('object_client', ObjectClient)):
+            self._set_client(name, client_class, self.auth_provider, **params)
 
 
 class AdminManager(Manager):
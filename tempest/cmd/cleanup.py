@@ -48,6 +48,12 @@ saved_state.json and based on the **--delete-tempest-conf-objects** flag.
 By default the tempest and alternate tempest users and tenants are not
 deleted and the admin user specified in tempest.conf is never deleted.
 
+**--journal**: Deletes the isolated credentials and network resources left
+in the journal file of a test worker, when the deferred cleanup of isolated
+credentials is enabled and the worker died before deleting them. The other
+objects are not cleaned up in this mode. With **--dry-run**, the resources
+left are reported in dry_run.json instead.
+
 Please run with **--help** to see full list of options.
 """
 import argparse
@@ -59,6 +65,8 @@ from oslo_serialization import jsonutils as json
 from tempest import clients
 from tempest.cmd import cleanup_service
 from tempest.common import cred_provider
+from tempest.common import isolated_creds
+from tempest.common import reaper
 from tempest import config
 
 SAVED_STATE_JSON = "saved_state.json"
@@ -92,6 +100,10 @@ class Cleanup(object):
             self._init_state()
             return
 
+        if opts.journals:
+            self._reap_journals()
+            return
+
         self._load_json()
         self._cleanup()
 
@@ -138,6 +150,23 @@ class Cleanup(object):
 
         self._remove_admin_user_roles()
 
+    def _reap_journals(self):
+        journals = self.options.journals
+        if self.options.dry_run:
+            for path in journals:
+                self.dry_run_data[path] = list(
+                    reaper.read_journal(path).values())
+            with open(DRY_RUN_JSON, 'w+') as f:
+                f.write(json.dumps(self.dry_run_data, sort_keys=True,
+                                   indent=2, separators=(',', ': ')))
+            return
+        provider = isolated_creds.IsolatedCreds(name='tempest-cleanup')
+        failures = sum(reaper.reap_journal(path, provider)
+                       for path in journals)
+        if failures:
+            LOG.error("%d isolated credentials could not be deleted"
+                      % failures)
+
     def _remove_admin_user_roles(self):
         tenant_ids = self.admin_role_added
         LOG.debug("Removing admin user roles where needed for tenants: %s"
@@ -211,6 +240,11 @@ class Cleanup(object):
                             help="Generate JSON file:" + DRY_RUN_JSON +
                             ", that reports the objects that would have "
                             "been deleted had a full cleanup been run.")
+        parser.add_argument('--journal', action="append",
+                            dest='journals', default=[], metavar='FILE',
+                            help="Delete the isolated credentials left in "
+                            "the journal FILE of a test worker, instead of "
+                            "running a full cleanup. Can be repeated.")
 
         self.options = parser.parse_args()
 
@@ -172,8 +172,7 @@ class ServerService(BaseService):
 
     def list(self):
         client = self.client
-        servers_body = client.list_servers()
-        servers = servers_body['servers']
+        servers = list(client.iter_servers())
         LOG.debug("List count, %s Servers" % len(servers))
         return servers
 
@@ -322,7 +321,7 @@ class VolumeService(BaseService):
 
     def list(self):
         client = self.client
-        vols = client.list_volumes()
+        vols = list(client.iter_volumes())
         LOG.debug("List count, %s Volumes" % len(vols))
         return vols
 
@@ -391,8 +390,7 @@ class NetworkService(BaseService):
 
     def list(self):
         client = self.client
-        networks = client.list_networks(**self.tenant_filter)
-        networks = networks['networks']
+        networks = list(client.iter_networks(**self.tenant_filter))
         # filter out networks declared in tempest.conf
         if self.is_preserve:
             networks = [network for network in networks
@@ -620,7 +618,7 @@ class NetworkPortService(NetworkService):
     def list(self):
         client = self.client
         ports = [port for port in
-                 client.list_ports(**self.tenant_filter)['ports']
+                 client.iter_ports(**self.tenant_filter)
                  if port["device_owner"] == "" or
                  port["device_owner"].startswith("compute:")]
 
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Utility for reporting where a run spent its time waiting on the APIs
+
+When ``[http]/latency_stats_dir`` is set, every worker process writes the
+latency histograms of its REST, image and boto calls to that directory.
+This utility merges them and reports the calls by total time spent, with
+their count and latency percentiles (p50, p95 and p99), in milliseconds.
+
+**Usage:** ``tempest-latency-report [-h] [--top TOP] [--json] path
+[path ...]``.
+
+A path is either a histograms file, or a directory of them::
+
+    tempest-latency-report /var/log/tempest/latency
+"""
+
+import argparse
+import glob
+import os
+
+from oslo_serialization import jsonutils as json
+
+from tempest.common import api_latency
+
+
+def find_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path,
+                                                       'latency-*.json'))))
+        else:
+            files.append(path)
+    return files
+
+
+def _ms(microseconds):
+    return microseconds / 1000.0
+
+
+def summarize(histograms, top=None):
+    """Summarizes the histograms of the calls.
+
+    Returns a list of dicts, sorted by total time spent in the call.
+    """
+    summary = []
+    for (service, method, url, status), histogram in histograms.items():
+        summary.append({'service': service,
+                        'method': method,
+                        'url': url,
+                        'status': status,
+                        'count': histogram.count,
+                        'total': _ms(histogram.total),
+                        'p50': _ms(histogram.percentile(50)),
+                        'p95': _ms(histogram.percentile(95)),
+                        'p99': _ms(histogram.percentile(99)),
+                        'max': _ms(histogram.max)})
+    summary.sort(key=lambda s: -s['total'])
+    return summary[:top] if top else summary
+
+
+def format_summary(summary):
+    lines = ['%-10s %-7s %-48s %6s %7s %11s %9s %9s %9s %9s' % (
+        'service', 'method', 'url', 'status', 'count', 'total', 'p50',
+        'p95', 'p99', 'max')]
+    for row in summary:
+        lines.append('%-10s %-7s %-48s %6s %7d %11.1f %9.1f %9.1f %9.1f '
+                     '%9.1f' % (row['service'], row['method'], row['url'],
+                                row['status'], row['count'], row['total'],
+                                row['p50'], row['p95'], row['p99'],
+                                row['max']))
+    return '\n'.join(lines)
+
+
+def get_options():
+    parser = argparse.ArgumentParser(
+        description='Report the time spent per API call from the latency '
+                    'histograms written by the tempest workers.')
+    parser.add_argument('paths', nargs='+', metavar='path',
+                        help='histograms files, or directories of them')
+    parser.add_argument('--top', type=int, default=None,
+                        help='only report the calls with the most total '
+                             'time')
+    parser.add_argument('--json', action='store_true',
+                        help='output the report as JSON')
+    return parser.parse_args()
+
+
+def main(opts=None):
+    if not opts:
+        opts = get_options()
+    histograms = api_latency.load(find_files(opts.paths))
+    summary = summarize(histograms, top=opts.top)
+    if opts.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(format_summary(summary))
+
+
+if __name__ == "__main__":
+    main()
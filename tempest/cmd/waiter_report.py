@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Utility for reporting where the waiters spent their time during a run
+
+The waiters record the timeline of the states each resource went through,
+which is attached to every test result as the *waiter-timelines* subunit
+detail. This utility aggregates them from one or more subunit v2 streams,
+for instance the files of a *.testrepository* directory, and reports per
+resource type and state how long resources stayed in that state (p50, p95
+and max), together with the overall wait time and number of polls.
+
+**Usage:** ``tempest-waiter-report [-h] [--json] [stream ...]``.
+
+The stream is read from the standard input when no file is given::
+
+    testr last --subunit | tempest-waiter-report
+"""
+
+import argparse
+import collections
+import math
+import sys
+
+from oslo_serialization import jsonutils as json
+import subunit
+import testtools
+
+from tempest.common import timelines
+
+
+class TimelineCollector(testtools.StreamResult):
+    """Collects the waiter timelines attached to the test results."""
+
+    def __init__(self):
+        super(TimelineCollector, self).__init__()
+        self.records = []
+        self._chunks = collections.defaultdict(list)
+
+    def status(self, test_id=None, test_status=None, test_tags=None,
+               runnable=True, file_name=None, file_bytes=None, eof=False,
+               mime_type=None, route_code=None, timestamp=None):
+        if file_name != timelines.DETAIL_NAME:
+            return
+        key = (route_code, test_id)
+        self._chunks[key].append(file_bytes)
+        if eof:
+            data = b''.join(self._chunks.pop(key))
+            self.records.extend(json.loads(data.decode('utf-8')))
+
+
+def percentile(values, percent):
+    """Returns the nearest-rank percentile of a sorted list of values."""
+    if not values:
+        return None
+    rank = int(math.ceil(percent / 100.0 * len(values))) - 1
+    return values[min(max(rank, 0), len(values) - 1)]
+
+
+def summarize(records):
+    """Aggregates the timeline records per resource type and state.
+
+    Returns a list of dicts, sorted by resource type and by total time
+    spent in the state.
+    """
+    in_state = collections.defaultdict(list)
+    for record in records:
+        resource_type = record['resource_type']
+        in_state[(resource_type, 'total wait')].append(record['duration'])
+        in_state[(resource_type, 'polls')].append(record['polls'])
+        in_state[(resource_type, 'request time')].append(
+            record['request_time'])
+        for state, seconds in timelines.time_in_states(record):
+            in_state[(resource_type, state)].append(seconds)
+    summary = []
+    for (resource_type, state), values in in_state.items():
+        values.sort()
+        summary.append({'resource_type': resource_type,
+                        'state': state,
+                        'count': len(values),
+                        'total': sum(values),
+                        'p50': percentile(values, 50),
+                        'p95': percentile(values, 95),
+                        'max': values[-1]})
+    summary.sort(key=lambda s: (s['resource_type'], -s['total']))
+    return summary
+
+
+def format_summary(summary):
+    lines = ['%-16s %-32s %7s %10s %9s %9s %9s' % (
+        'resource', 'state', 'count', 'total', 'p50', 'p95', 'max')]
+    for row in summary:
+        lines.append('%-16s %-32s %7d %10.1f %9.1f %9.1f %9.1f' % (
+            row['resource_type'], row['state'], row['count'], row['total'],
+            row['p50'], row['p95'], row['max']))
+    return '\n'.join(lines)
+
+
+def read_records(streams):
+    collector = TimelineCollector()
+    for stream in streams:
+        subunit.ByteStreamToStreamResult(
+            stream, non_subunit_name='stdout').run(collector)
+    return collector.records
+
+
+def get_options():
+    parser = argparse.ArgumentParser(
+        description='Report the time spent by the waiters per resource '
+                    'type and state from subunit v2 streams.')
+    parser.add_argument('streams', nargs='*', metavar='stream',
+                        help='subunit v2 stream files, the standard input '
+                             'is read if none is given')
+    parser.add_argument('--json', action='store_true',
+                        help='output the report as JSON')
+    return parser.parse_args()
+
+
+def main(opts=None):
+    if not opts:
+        opts = get_options()
+    if opts.streams:
+        streams = [open(path, 'rb') for path in opts.streams]
+    else:
+        streams = [getattr(sys.stdin, 'buffer', sys.stdin)]
+    try:
+        summary = summarize(read_records(streams))
+    finally:
+        if opts.streams:
+            for stream in streams:
+                stream.close()
+    if opts.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(format_summary(summary))
+
+
+if __name__ == "__main__":
+    main()
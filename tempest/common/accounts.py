@@ -12,11 +12,17 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
+import errno
 import hashlib
 import os
+import socket
+import sqlite3
+import time
 
 from oslo_concurrency import lockutils
 from oslo_log import log as logging
+from oslo_serialization import jsonutils as json
 import six
 import yaml
 
@@ -36,6 +42,232 @@ def read_accounts_yaml(path):
     return accounts
 
 
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno != errno.ESRCH
+    return True
+
+
+class AccountAllocator(object):
+    """Allocates the accounts through a database shared by the workers.
+
+    Every claim and release is a single short transaction on a sqlite
+    database in the lock path, instead of a scan of lock files under a
+    global lock. The free accounts are indexed by their admin flag and their
+    roles, so a claim does not depend on the number of accounts in use.
+
+    When no matching account is free, the claim waits in line, first come
+    first served among the workers asking for the same roles, until
+    [auth]/test_accounts_wait_timeout expires. The accounts held by dead
+    workers of the host are then reclaimed.
+
+    The accounts are only written to the database by the first allocator
+    created for them, or after a change of their roles. The next ones,
+    created by every test class, only read the digest of the accounts the
+    database was filled with.
+
+    :param path: the database file, specific to the set of accounts
+    :param hash_dict: the hash dict of the accounts, see
+                      Accounts.get_hash_dict
+    """
+
+    def __init__(self, path, hash_dict):
+        self.path = path
+        self.host = socket.gethostname()
+        digest = self._get_digest(hash_dict)
+        if self._read_digest() != digest:
+            self._fill(hash_dict, digest)
+
+    @staticmethod
+    def _get_digest(hash_dict):
+        accounts = json.dumps([sorted(hash_dict['creds']),
+                               sorted((role, sorted(hashes)) for role, hashes
+                                      in six.iteritems(hash_dict['roles'])),
+                               CONF.identity.admin_role])
+        return hashlib.md5(accounts.encode('utf-8')).hexdigest()
+
+    def _read_digest(self):
+        db = sqlite3.connect(self.path, timeout=60)
+        try:
+            row = db.execute("SELECT value FROM meta WHERE "
+                             "key = 'digest'").fetchone()
+        except sqlite3.OperationalError:
+            # Not filled yet
+            return None
+        finally:
+            db.close()
+        return row[0] if row else None
+
+    def _fill(self, hash_dict, digest):
+        admin_hashes = set(hash_dict['roles'].get(CONF.identity.admin_role,
+                                                  []))
+        with self._transaction() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS meta ('
+                       'key TEXT PRIMARY KEY, value TEXT)')
+            db.execute('CREATE TABLE IF NOT EXISTS accounts ('
+                       'hash TEXT PRIMARY KEY, admin INTEGER, '
+                       'owner_host TEXT, owner_pid INTEGER, owner_name TEXT)')
+            db.execute('CREATE INDEX IF NOT EXISTS free_accounts '
+                       'ON accounts (admin, owner_pid)')
+            db.execute('CREATE TABLE IF NOT EXISTS roles ('
+                       'role TEXT, hash TEXT, PRIMARY KEY (role, hash))')
+            db.execute('CREATE TABLE IF NOT EXISTS waiters ('
+                       'ticket INTEGER PRIMARY KEY AUTOINCREMENT, '
+                       'request TEXT, owner_host TEXT, owner_pid INTEGER)')
+            db.executemany(
+                'INSERT OR IGNORE INTO accounts (hash, admin) VALUES (?, ?)',
+                [(account_hash, int(account_hash in admin_hashes))
+                 for account_hash in hash_dict['creds']])
+            # The roles may have changed since the database was filled
+            db.executemany(
+                'UPDATE accounts SET admin = ? WHERE hash = ?',
+                [(int(account_hash in admin_hashes), account_hash)
+                 for account_hash in hash_dict['creds']])
+            db.execute('DELETE FROM roles')
+            db.executemany(
+                'INSERT INTO roles (role, hash) VALUES (?, ?)',
+                [(role, account_hash)
+                 for role, hashes in six.iteritems(hash_dict['roles'])
+                 for account_hash in hashes])
+            db.execute("INSERT OR REPLACE INTO meta (key, value) "
+                       "VALUES ('digest', ?)", (digest,))
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        try:
+            # Takes the write lock upfront, so that the transactions of the
+            # workers are serialized instead of failing on conflicts
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                yield db
+            except Exception:
+                db.execute('ROLLBACK')
+                raise
+            db.execute('COMMIT')
+        finally:
+            db.close()
+
+    def _find_free(self, db, roles):
+        query = 'SELECT hash FROM accounts WHERE owner_pid IS NULL'
+        params = []
+        # NOTE(mtreinish): admin is a special case because of the increased
+        # privlege set which could potentially cause issues on tests where
+        # that is not expected. So unless the admin role isn't specified do
+        # not allocate admin.
+        if not roles or CONF.identity.admin_role not in roles:
+            query += ' AND admin = 0'
+        if roles:
+            query += (' AND hash IN (SELECT hash FROM roles WHERE role IN '
+                      '(%s) GROUP BY hash HAVING COUNT(*) = ?)' %
+                      ', '.join('?' * len(roles)))
+            params = list(roles) + [len(roles)]
+        row = db.execute(query + ' LIMIT 1', params).fetchone()
+        return row[0] if row else None
+
+    def _reclaim(self, db):
+        """Frees the accounts and tickets of the dead workers of the host."""
+        for table in ('accounts', 'waiters'):
+            pids = db.execute('SELECT DISTINCT owner_pid FROM %s WHERE '
+                              'owner_host = ? AND owner_pid IS NOT NULL' %
+                              table, (self.host,)).fetchall()
+            for (pid,) in pids:
+                if _pid_alive(pid):
+                    continue
+                LOG.warning('Reclaiming the %s of dead worker %s',
+                            table, pid)
+                if table == 'accounts':
+                    db.execute('UPDATE accounts SET owner_host = NULL, '
+                               'owner_pid = NULL, owner_name = NULL WHERE '
+                               'owner_host = ? AND owner_pid = ?',
+                               (self.host, pid))
+                else:
+                    db.execute('DELETE FROM waiters WHERE owner_host = ? '
+                               'AND owner_pid = ?', (self.host, pid))
+
+    def _find_claimable(self, db, roles, request, ticket):
+        first = db.execute('SELECT MIN(ticket) FROM waiters WHERE '
+                           'request = ?', (request,)).fetchone()[0]
+        if first is not None and first != ticket:
+            # Older requests for the same roles are served first
+            return None
+        return self._find_free(db, roles)
+
+    def _try_claim(self, roles, name, ticket):
+        """Claims a free account, unless an older ticket is in line.
+
+        Returns the hash of the account claimed, or None, and the ticket of
+        the request, which is taken on the first unsuccessful try.
+        """
+        request = ','.join(sorted(roles or []))
+        with self._transaction() as db:
+            account_hash = self._find_claimable(db, roles, request, ticket)
+            if account_hash is None:
+                self._reclaim(db)
+                account_hash = self._find_claimable(db, roles, request,
+                                                    ticket)
+            if account_hash is not None:
+                db.execute('UPDATE accounts SET owner_host = ?, '
+                           'owner_pid = ?, owner_name = ? WHERE hash = ?',
+                           (self.host, os.getpid(), name, account_hash))
+                if ticket is not None:
+                    db.execute('DELETE FROM waiters WHERE ticket = ?',
+                               (ticket,))
+            elif ticket is None:
+                ticket = db.execute(
+                    'INSERT INTO waiters (request, owner_host, owner_pid) '
+                    'VALUES (?, ?, ?)',
+                    (request, self.host, os.getpid())).lastrowid
+        return account_hash, ticket
+
+    def claim(self, roles=None, name=None):
+        """Claims a free account with all the roles and returns its hash.
+
+        Raises InvalidConfiguration when no account was freed within
+        [auth]/test_accounts_wait_timeout seconds.
+        """
+        timeout = CONF.auth.test_accounts_wait_timeout
+        start = time.time()
+        interval = 0.1
+        account_hash, ticket = self._try_claim(roles, name, None)
+        try:
+            while account_hash is None:
+                if time.time() - start >= timeout:
+                    raise exceptions.InvalidConfiguration(
+                        'Insufficient number of users provided. %s have '
+                        'allocated all the credentials for this allocation '
+                        'request' % ','.join(self.owners()))
+                time.sleep(interval)
+                interval = min(interval * 2, 1)
+                account_hash, ticket = self._try_claim(roles, name, ticket)
+        except Exception:
+            if ticket is not None:
+                with self._transaction() as db:
+                    db.execute('DELETE FROM waiters WHERE ticket = ?',
+                               (ticket,))
+            raise
+        return account_hash
+
+    def release(self, account_hash):
+        with self._transaction() as db:
+            released = db.execute(
+                'UPDATE accounts SET owner_host = NULL, owner_pid = NULL, '
+                'owner_name = NULL WHERE hash = ? AND owner_pid IS NOT NULL',
+                (account_hash,)).rowcount
+        if not released:
+            LOG.warning('Expected the account %s to be allocated',
+                        account_hash)
+
+    def owners(self):
+        """Returns the names of the owners of the accounts in use."""
+        with self._transaction() as db:
+            rows = db.execute('SELECT DISTINCT owner_name FROM accounts '
+                              'WHERE owner_pid IS NOT NULL').fetchall()
+        return [row[0] or '' for row in rows]
+
+
 class Accounts(cred_provider.CredentialProvider):
 
     def __init__(self, identity_version=None, name=None):
@@ -49,10 +281,61 @@ class Accounts(cred_provider.CredentialProvider):
             accounts = {}
             self.use_default_creds = True
         self.hash_dict = self.get_hash_dict(accounts)
+        self._build_indexes()
         self.accounts_dir = os.path.join(lockutils.get_lock_path(CONF),
                                          'test_accounts')
+        self.allocator = None
+        if (CONF.auth.test_accounts_allocator == 'database' and
+                not self.use_default_creds):
+            self.allocator = AccountAllocator(
+                self._get_allocator_path(), self.hash_dict)
         self.isolated_creds = {}
 
+    def _get_allocator_path(self):
+        # One database per set of accounts, so that a change of the accounts
+        # file does not mix with the allocations made before
+        digest = hashlib.md5()
+        for account_hash in sorted(self.hash_dict['creds']):
+            digest.update(account_hash.encode('utf-8'))
+        return os.path.join(lockutils.get_lock_path(CONF),
+                            'test_accounts-%s.db' % digest.hexdigest()[:12])
+
+    def _build_indexes(self):
+        """Precomputes the lookups made by every allocation and release."""
+        self._role_index = dict(
+            (role, frozenset(hashes))
+            for role, hashes in six.iteritems(self.hash_dict['roles']))
+        self._admin_hashes = self._role_index.get(CONF.identity.admin_role,
+                                                  frozenset())
+        # Matching hashes by set of roles requested
+        self._match_index = {frozenset(): tuple(
+            account_hash for account_hash in self.hash_dict['creds']
+            if account_hash not in self._admin_hashes)}
+        # Hashes by the values of a set of attributes, by set of attributes
+        self._attributes_index = {}
+        for account in six.itervalues(self.hash_dict['creds']):
+            self._get_attributes_index(tuple(sorted(account)))
+
+    def _get_attributes_index(self, attributes):
+        index = self._attributes_index.get(attributes)
+        if index is not None:
+            return index
+        index = {}
+        for account_hash, account in six.iteritems(self.hash_dict['creds']):
+            values = []
+            for attribute in attributes:
+                if attribute in account:
+                    values.append(account[attribute])
+                elif attribute == 'user_domain_name':
+                    # Allow for the case of domain_name populated from config
+                    values.append(CONF.auth.default_credentials_domain_name)
+                else:
+                    break
+            else:
+                index.setdefault(tuple(values), account_hash)
+        self._attributes_index[attributes] = index
+        return index
+
     @classmethod
     def _append_role(cls, role, account_hash, hash_dict):
         if role in hash_dict['roles']:
@@ -149,37 +432,27 @@ class Accounts(cred_provider.CredentialProvider):
         raise exceptions.InvalidConfiguration(msg)
 
     def _get_match_hash_list(self, roles=None):
-        hashes = []
-        if roles:
-            # Loop over all the creds for each role in the subdict and generate
-            # a list of cred lists for each role
-            for role in roles:
-                temp_hashes = self.hash_dict['roles'].get(role, None)
-                if not temp_hashes:
-                    raise exceptions.InvalidConfiguration(
-                        "No credentials with role: %s specified in the "
-                        "accounts ""file" % role)
-                hashes.append(temp_hashes)
-            # Take the list of lists and do a boolean and between each list to
-            # find the creds which fall under all the specified roles
-            temp_list = set(hashes[0])
-            for hash_list in hashes[1:]:
-                temp_list = temp_list & set(hash_list)
-            hashes = temp_list
-        else:
-            hashes = self.hash_dict['creds'].keys()
+        key = frozenset(roles or [])
+        hashes = self._match_index.get(key)
+        if hashes is not None:
+            return hashes
+        for role in key:
+            if not self._role_index.get(role):
+                raise exceptions.InvalidConfiguration(
+                    "No credentials with role: %s specified in the "
+                    "accounts ""file" % role)
+        # Do a boolean and between the hashes of each role to find the creds
+        # which fall under all the specified roles
+        hashes = frozenset.intersection(*[self._role_index[role]
+                                          for role in key])
         # NOTE(mtreinish): admin is a special case because of the increased
         # privlege set which could potentially cause issues on tests where that
         # is not expected. So unless the admin role isn't specified do not
         # allocate admin.
-        admin_hashes = self.hash_dict['roles'].get(CONF.identity.admin_role,
-                                                   None)
-        if ((not roles or CONF.identity.admin_role not in roles) and
-                admin_hashes):
-            useable_hashes = [x for x in hashes if x not in admin_hashes]
-        else:
-            useable_hashes = hashes
-        return useable_hashes
+        if CONF.identity.admin_role not in key:
+            hashes = hashes - self._admin_hashes
+        hashes = self._match_index[key] = tuple(hashes)
+        return hashes
 
     def _sanitize_creds(self, creds):
         temp_creds = creds.copy()
@@ -191,7 +464,14 @@ class Accounts(cred_provider.CredentialProvider):
             raise exceptions.InvalidConfiguration(
                 "Account file %s doesn't exist" % CONF.auth.test_accounts_file)
         useable_hashes = self._get_match_hash_list(roles)
-        free_hash = self._get_free_hash(useable_hashes)
+        if self.allocator:
+            if not useable_hashes:
+                raise exceptions.InvalidConfiguration(
+                    "No credentials matching the roles %s specified in the "
+                    "accounts file" % roles)
+            free_hash = self.allocator.claim(roles, self.name)
+        else:
+            free_hash = self._get_free_hash(useable_hashes)
         clean_creds = self._sanitize_creds(
             self.hash_dict['creds'][free_hash])
         LOG.info('%s allocated creds:\n%s' % (self.name, clean_creds))
@@ -209,24 +489,21 @@ class Accounts(cred_provider.CredentialProvider):
                 os.rmdir(self.accounts_dir)
 
     def get_hash(self, creds):
-        for _hash in self.hash_dict['creds']:
-            # Comparing on the attributes that are expected in the YAML
-            init_attributes = creds.get_init_attributes()
-            hash_attributes = self.hash_dict['creds'][_hash].copy()
-            if ('user_domain_name' in init_attributes and 'user_domain_name'
-                    not in hash_attributes):
-                # Allow for the case of domain_name populated from config
-                domain_name = CONF.auth.default_credentials_domain_name
-                hash_attributes['user_domain_name'] = domain_name
-            if all([getattr(creds, k) == hash_attributes[k] for
-                   k in init_attributes]):
-                return _hash
-        raise AttributeError('Invalid credentials %s' % creds)
+        # Comparing on the attributes that are expected in the YAML
+        attributes = tuple(sorted(creds.get_init_attributes()))
+        index = self._get_attributes_index(attributes)
+        try:
+            return index[tuple(getattr(creds, k) for k in attributes)]
+        except (KeyError, TypeError):
+            raise AttributeError('Invalid credentials %s' % creds)
 
     def remove_credentials(self, creds):
         _hash = self.get_hash(creds)
         clean_creds = self._sanitize_creds(self.hash_dict['creds'][_hash])
-        self.remove_hash(_hash)
+        if self.allocator:
+            self.allocator.release(_hash)
+        else:
+            self.remove_hash(_hash)
         LOG.info("%s returned allocated creds:\n%s" % (self.name, clean_creds))
 
     def get_primary_creds(self):
@@ -0,0 +1,248 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Latency histograms of the API calls made by a worker process.
+
+When [http]/latency_stats_dir is set, the service clients, the image HTTP
+client and the boto clients record the latency of each call in a Histogram
+per service, method, URL template and status. Every process writes its
+histograms to latency-<pid>.json in that directory when it exits, to be merged
+and reported by tempest-latency-report.
+"""
+
+import atexit
+import math
+import os
+import re
+import threading
+
+from oslo_log import log as logging
+from oslo_serialization import jsonutils as json
+from six.moves.urllib import parse as urlparse
+
+from tempest import config
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+# Values are bucketed with 2 ** SUB_BUCKET_BITS buckets per power of two,
+# that is with a relative error below 1%
+SUB_BUCKET_BITS = 7
+
+_ID_RE = re.compile(r'^([0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?'
+                    r'[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}|\d+)$')
+# The object storage accounts, AUTH_<project id>
+_ACCOUNT_RE = re.compile(r'^([A-Za-z]+_)[0-9a-fA-F]{32}$')
+# The random number of the names made by data_utils.rand_name
+_RAND_NAME_RE = re.compile(r'-\d{4,}(-|\.|$)')
+
+
+def bucket_index(value):
+    """Returns the index of the bucket of a value, in microseconds."""
+    shift = max(0, value.bit_length() - SUB_BUCKET_BITS)
+    return (shift << SUB_BUCKET_BITS) + (value >> shift)
+
+
+def _bucket_value(bucket):
+    # The middle of the range of values of the bucket
+    shift, sub_bucket = divmod(bucket, 1 << SUB_BUCKET_BITS)
+    return (sub_bucket << shift) + ((1 << shift) >> 1)
+
+
+class Histogram(object):
+    """HDR style histogram of latencies, in microseconds.
+
+    Only the counts of the non empty buckets are kept, so recording is a
+    dict update and histograms are merged by adding their counts.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        value = max(int(value), 0)
+        bucket = bucket_index(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = (other.min if self.min is None
+                        else min(self.min, other.min))
+            self.max = (other.max if self.max is None
+                        else max(self.max, other.max))
+
+    def percentile(self, percent):
+        """Returns the nearest-rank percentile of the recorded values."""
+        if not self.count:
+            return None
+        rank = max(1, int(math.ceil(percent / 100.0 * self.count)))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(max(_bucket_value(bucket), self.min), self.max)
+        return self.max
+
+    def to_dict(self):
+        return {'counts': [[bucket, count] for bucket, count
+                           in sorted(self.counts.items())],
+                'count': self.count, 'total': self.total,
+                'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.counts = dict((bucket, count)
+                                for bucket, count in data['counts'])
+        histogram.count = data['count']
+        histogram.total = data['total']
+        histogram.min = data['min']
+        histogram.max = data['max']
+        return histogram
+
+
+def _segment_template(segment):
+    if _ID_RE.match(segment):
+        return '{id}'
+    account = _ACCOUNT_RE.match(segment)
+    if account:
+        return account.group(1) + '{id}'
+    if _RAND_NAME_RE.search(segment):
+        return '{name}'
+    return segment
+
+
+def url_template(url):
+    """Returns the path of a URL with its ids and random names replaced.
+
+    So that for instance the calls to servers/<uuid>/action, or to the
+    objects of the containers named by rand_name, are recorded together
+    whatever the server, account or container.
+    """
+    path = urlparse.urlparse(url).path
+    return '/'.join(_segment_template(segment)
+                    for segment in path.split('/'))
+
+
+def query_template(url):
+    """Returns the query of a URL with its ids and random names replaced."""
+    query = urlparse.parse_qsl(urlparse.urlparse(url).query,
+                               keep_blank_values=True)
+    return '&'.join('%s=%s' % (name, _segment_template(value))
+                    for name, value in query)
+
+
+class Recorder(object):
+    """Histograms of the latencies of the API calls, by call."""
+
+    def __init__(self):
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, service, method, url, status, seconds):
+        key = (service, method, url_template(url), str(status))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.record(seconds * 1e6)
+
+    def to_list(self):
+        with self._lock:
+            return [{'service': service, 'method': method, 'url': url,
+                     'status': status, 'histogram': histogram.to_dict()}
+                    for (service, method, url, status), histogram
+                    in self.histograms.items()]
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_list(), f)
+
+
+def load(paths):
+    """Merges the histograms of dump files, by call."""
+    histograms = {}
+    for path in paths:
+        with open(path) as f:
+            for entry in json.load(f):
+                key = (entry['service'], entry['method'], entry['url'],
+                       entry['status'])
+                histogram = Histogram.from_dict(entry['histogram'])
+                if key in histograms:
+                    histograms[key].merge(histogram)
+                else:
+                    histograms[key] = histogram
+    return histograms
+
+
+_recorder = None
+_recorder_pid = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder():
+    """Returns the recorder of this process, or None if not recording.
+
+    A forked process records, and dumps, its own histograms.
+    """
+    global _recorder, _recorder_pid
+    if not CONF.http.latency_stats_dir:
+        return None
+    recorder = _recorder
+    if recorder is not None and _recorder_pid == os.getpid():
+        return recorder
+    with _recorder_lock:
+        if _recorder is None or _recorder_pid != os.getpid():
+            if _recorder is None:
+                atexit.register(dump)
+            _recorder = Recorder()
+            _recorder_pid = os.getpid()
+        return _recorder
+
+
+def record(service, method, url, status, seconds):
+    """Records the latency of an API call, if recording."""
+    recorder = get_recorder()
+    if recorder is not None:
+        recorder.record(service, method, url, status, seconds)
+
+
+def dump():
+    """Writes the histograms of this process to its file, if recording.
+
+    Called at exit, and by the processes which exit without running the
+    atexit handlers, like the stress workers.
+    """
+    if _recorder is None or _recorder_pid != os.getpid():
+        return
+    path = os.path.join(CONF.http.latency_stats_dir,
+                        'latency-%d.json' % _recorder_pid)
+    try:
+        if not os.path.isdir(CONF.http.latency_stats_dir):
+            os.makedirs(CONF.http.latency_stats_dir)
+        _recorder.dump(path)
+    except (IOError, OSError):
+        LOG.exception('Failed to write the API latencies to %s', path)
@@ -0,0 +1,229 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Record and replay of the HTTP interactions of the clients.
+
+With [http]/cassette_mode set to record, the service clients, the auth
+providers and the image HTTP client append every response they get to the
+cassette file at [http]/cassette_path, one JSON document per line. With it
+set to replay, they get the recorded responses instead of sending requests,
+so that the tests, and tempest's own overhead, can be run without a cloud.
+
+The responses are replayed per test, service, method and URL template, in
+the order they were recorded. The URL templates have their ids and the
+names made by rand_name replaced, see api_latency.url_template, so that the
+requests of a new run, with new names, match. Keying on the test keeps the
+interactions of the tests run concurrently by the recording workers apart.
+The last response is replayed again once the others were, so that a waiter
+polling a resource eventually gets its final status.
+"""
+
+import base64
+import collections
+import threading
+import time
+
+import httplib2
+from oslo_serialization import jsonutils as json
+import six
+from tempest_lib.common.utils import misc as misc_utils
+
+from tempest.common import api_latency
+from tempest import config
+from tempest import exceptions
+
+CONF = config.CONF
+
+
+def _request_key(test, service, method, url):
+    # The endpoints may be different when replaying
+    template = api_latency.url_template(url)
+    query = api_latency.query_template(url)
+    if query:
+        template += '?' + query
+    return test, service, method, template
+
+
+class Cassette(object):
+    """The recorded interactions, by test, service, method and URL.
+
+    :param path: path of the cassette file
+    :param mode: 'record' or 'replay'
+    """
+
+    def __init__(self, path, mode):
+        self.path = path
+        self.mode = mode
+        self._interactions = collections.defaultdict(collections.deque)
+        self._lock = threading.Lock()
+        if mode == 'replay':
+            self._load()
+
+    @property
+    def replaying(self):
+        return self.mode == 'replay'
+
+    def _load(self):
+        with open(self.path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                interaction = json.loads(line)
+                key = _request_key(interaction.get('test'),
+                                   interaction['service'],
+                                   interaction['method'], interaction['url'])
+                self._interactions[key].append(interaction)
+
+    def record(self, service, method, url, status, headers, body, seconds):
+        interaction = {'test': misc_utils.find_test_caller(),
+                       'service': service, 'method': method, 'url': url,
+                       'status': int(status), 'headers': dict(headers),
+                       'seconds': round(seconds, 6)}
+        if isinstance(body, six.text_type):
+            body = body.encode('utf-8')
+        try:
+            interaction['body'] = (body or b'').decode('utf-8')
+        except UnicodeDecodeError:
+            interaction['body_base64'] = base64.b64encode(body).decode()
+        line = json.dumps(interaction, separators=(',', ':')) + '\n'
+        with self._lock:
+            # A single write per line, so that the lines of the processes
+            # appending to the same cassette are not interleaved
+            with open(self.path, 'a') as f:
+                f.write(line)
+
+    def play(self, service, method, url):
+        """Returns the next recorded response to a request.
+
+        The body of the returned interaction is always bytes.
+
+        :raises exceptions.CassetteMiss: if no response was recorded
+        """
+        key = _request_key(misc_utils.find_test_caller(), service, method,
+                           url)
+        with self._lock:
+            interactions = self._interactions.get(key)
+            if not interactions:
+                raise exceptions.CassetteMiss(test=key[0], service=service,
+                                              method=method, url=key[3])
+            if len(interactions) > 1:
+                interaction = interactions.popleft()
+            else:
+                interaction = interactions[0]
+        if CONF.http.cassette_replay_latency:
+            time.sleep(interaction['seconds'])
+        interaction = dict(interaction)
+        if 'body_base64' in interaction:
+            interaction['body'] = base64.b64decode(
+                interaction.pop('body_base64'))
+        else:
+            interaction['body'] = interaction['body'].encode('utf-8')
+        return interaction
+
+
+class RecordingHttp(object):
+    """httplib2.Http recording its responses to a cassette."""
+
+    def __init__(self, http, cassette, service):
+        self.http = http
+        self.cassette = cassette
+        self.service = service
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        start = time.time()
+        resp, content = self.http.request(uri, method, body=body,
+                                          headers=headers, **kwargs)
+        self.cassette.record(self.service, method, uri, resp.status, resp,
+                             content, time.time() - start)
+        return resp, content
+
+    def __getattr__(self, name):
+        return getattr(self.http, name)
+
+
+class ReplayHttp(object):
+    """httplib2.Http replaying the responses of a cassette."""
+
+    def __init__(self, cassette, service):
+        self.cassette = cassette
+        self.service = service
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        interaction = self.cassette.play(self.service, method, uri)
+        resp = httplib2.Response(interaction['headers'])
+        resp.status = interaction['status']
+        return resp, interaction['body']
+
+
+class ReplayResponse(object):
+    """httplib response replaying an interaction, for the image client."""
+
+    def __init__(self, interaction):
+        self.status = interaction['status']
+        self.reason = ''
+        self.version = 11
+        self.headers = interaction['headers']
+        self._body = six.BytesIO(interaction['body'])
+
+    def getheaders(self):
+        return list(self.headers.items())
+
+    def getheader(self, key, default=None):
+        return self.headers.get(key, default)
+
+    def read(self, amt=None):
+        return self._body.read(amt)
+
+
+class RecordingIterator(object):
+    """Iterator over a response body, recorded once consumed."""
+
+    def __init__(self, body_iter, record):
+        self.body_iter = body_iter
+        self._record = record
+        self._chunks = []
+
+    def __iter__(self):
+        for chunk in self.body_iter:
+            self._chunks.append(chunk)
+            yield chunk
+        self._record(b''.join(self._chunks))
+
+    def __getattr__(self, name):
+        return getattr(self.body_iter, name)
+
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette():
+    """Returns the cassette, or None if not recording or replaying."""
+    global _cassette
+    if not CONF.http.cassette_mode:
+        return None
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette(CONF.http.cassette_path,
+                                 CONF.http.cassette_mode)
+        return _cassette
+
+
+def install(client, service):
+    """Makes a rest client record to, or replay from, the cassette."""
+    cassette = get_cassette()
+    if cassette is None:
+        return
+    if cassette.replaying:
+        client.http_obj = ReplayHttp(cassette, service)
+    else:
+        client.http_obj = RecordingHttp(client.http_obj, cassette, service)
@@ -147,6 +147,14 @@ class CredentialProvider(object):
     def is_role_available(self, role):
         return
 
+    def prefetch_credentials(self, credential_types):
+        """Allocates ahead the credentials of the types listed.
+
+        Providers able to allocate several credentials at once override it,
+        the credentials are still returned by the get_*_creds methods.
+        """
+        pass
+
 
 class TestResources(object):
     """Readonly Credentials, with network resources added."""
@@ -17,10 +17,14 @@
 
 import copy
 import hashlib
+import os
 import posixpath
 import re
 import socket
+import ssl
+import stat
 import struct
+import time
 
 import OpenSSL
 from oslo_log import log as logging
@@ -31,12 +35,18 @@ from six.moves import http_client as httplib
 from six.moves.urllib import parse as urlparse
 from tempest_lib import exceptions as lib_exc
 
+from tempest.common import api_latency
+from tempest.common import cassette
+from tempest.common import http_pool
 from tempest import exceptions as exc
 
 LOG = logging.getLogger(__name__)
 USER_AGENT = 'tempest'
 CHUNKSIZE = 1024 * 64  # 64kB
 TOKEN_CHARS_RE = re.compile('^[-A-Za-z0-9+/=]*$')
+# The requests which can be sent again if the pooled connection they were
+# sent on turns out to be closed
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS')
 
 
 class HTTPClient(object):
@@ -51,9 +61,15 @@ class HTTPClient(object):
         self.endpoint_port = endpoint_parts.port
         self.endpoint_path = endpoint_parts.path
 
+        self.chunk_size = kwargs.pop('chunk_size', None)
         self.connection_class = self.get_connection_class(self.endpoint_scheme)
         self.connection_kwargs = self.get_connection_kwargs(
             self.endpoint_scheme, **kwargs)
+        self.pool = http_pool.get_pool()
+        self.pool_key = ('glance', self.connection_class.__name__,
+                         self.endpoint_hostname, self.endpoint_port,
+                         tuple(sorted(self.connection_kwargs.items())))
+        self.cassette = cassette.get_cassette()
 
     @staticmethod
     def get_connection_class(scheme):
@@ -84,6 +100,22 @@ class HTTPClient(object):
             raise exc.EndpointNotFound
 
     def _http_request(self, url, method, **kwargs):
+        # Records the latency of the request, up to the response headers
+        # for the image data which is streamed, see api_latency
+        recorder = api_latency.get_recorder()
+        if recorder is None:
+            return self._do_http_request(url, method, **kwargs)
+        status = 'error'
+        start = time.time()
+        try:
+            resp, body_iter = self._do_http_request(url, method, **kwargs)
+            status = resp.status
+            return resp, body_iter
+        finally:
+            recorder.record('image', method, url, status,
+                            time.time() - start)
+
+    def _do_http_request(self, url, method, **kwargs):
         """Send an http request with the specified characteristics.
 
         Wrapper around httplib.HTTP(S)Connection.request to handle tasks such
@@ -92,29 +124,44 @@ class HTTPClient(object):
         # Copy the kwargs so we can reuse the original in case of redirects
         kwargs['headers'] = copy.deepcopy(kwargs.get('headers', {}))
         kwargs['headers'].setdefault('User-Agent', USER_AGENT)
+        checksum = kwargs.pop('checksum', None)
 
         self._log_request(method, url, kwargs['headers'])
 
-        conn = self.get_connection()
-
+        if self.cassette is not None and self.cassette.replaying:
+            resp = cassette.ReplayResponse(
+                self.cassette.play('image', method, url))
+            return self._read_response(resp, checksum=checksum)
+
+        start = time.time()
+        url_parts = urlparse.urlparse(url)
+        conn_url = posixpath.normpath(url_parts.path)
+        LOG.debug('Actual Path: {path}'.format(path=conn_url))
+        chunked = kwargs['headers'].get('Transfer-Encoding') == 'chunked'
+        # A chunked body cannot be sent again if the pooled connection
+        # turns out to be closed, and a request which is not idempotent,
+        # like an image create, may have been processed by the server
+        # anyway, so they are always sent on a new connection
+        conn = None
+        if (self.pool is not None and not chunked and
+                method.upper() in IDEMPOTENT_METHODS):
+            conn = self.pool.get(self.pool_key)
         try:
-            url_parts = urlparse.urlparse(url)
-            conn_url = posixpath.normpath(url_parts.path)
-            LOG.debug('Actual Path: {path}'.format(path=conn_url))
-            if kwargs['headers'].get('Transfer-Encoding') == 'chunked':
-                conn.putrequest(method, conn_url)
-                for header, value in kwargs['headers'].items():
-                    conn.putheader(header, value)
-                conn.endheaders()
-                chunk = kwargs['body'].read(CHUNKSIZE)
-                # Chunk it, baby...
-                while chunk:
-                    conn.send('%x\r\n%s\r\n' % (len(chunk), chunk))
-                    chunk = kwargs['body'].read(CHUNKSIZE)
-                conn.send('0\r\n\r\n')
-            else:
-                conn.request(method, conn_url, **kwargs)
-            resp = conn.getresponse()
+            resp = None
+            if conn is not None:
+                try:
+                    resp = self._send_request(conn, method, conn_url,
+                                              chunked, **kwargs)
+                except (socket.error, httplib.HTTPException) as e:
+                    if isinstance(e, socket.timeout):
+                        raise
+                    LOG.debug('Pooled connection to %s closed, retrying '
+                              'on a new connection', self.endpoint)
+                    conn.close()
+            if resp is None:
+                conn = self.get_connection()
+                resp = self._send_request(conn, method, conn_url, chunked,
+                                          **kwargs)
         except socket.gaierror as e:
             message = ("Error finding address for %(url)s: %(e)s" %
                        {'url': url, 'e': e})
@@ -124,17 +171,94 @@ class HTTPClient(object):
                        {'endpoint': self.endpoint, 'e': e})
             raise exc.TimeoutException(message)
 
-        body_iter = ResponseBodyIterator(resp)
+        release = None
+        if self.pool is not None:
+            def release():
+                self.pool.put(self.pool_key, conn)
+
+        resp, body_iter = self._read_response(resp, release, checksum)
+        if self.cassette is not None:
+            def record(body):
+                self.cassette.record('image', method, url, resp.status,
+                                     resp.getheaders(), body,
+                                     time.time() - start)
+
+            if isinstance(body_iter, ResponseBodyIterator):
+                body_iter = cassette.RecordingIterator(body_iter, record)
+            else:
+                record(body_iter.getvalue())
+        return resp, body_iter
+
+    def _read_response(self, resp, release=None, checksum=None):
+        body_iter = ResponseBodyIterator(resp, release,
+                                         self.chunk_size or CHUNKSIZE,
+                                         checksum)
         # Read body into string if it isn't obviously image data
         if resp.getheader('content-type', None) != 'application/octet-stream':
             body_str = ''.join([body_chunk for body_chunk in body_iter])
             body_iter = six.StringIO(body_str)
-            self._log_response(resp, None)
-        else:
-            self._log_response(resp, body_iter)
+        # The image data is streamed, it cannot be logged
+        self._log_response(resp, None)
 
         return resp, body_iter
 
+    def _send_request(self, conn, method, conn_url, chunked, **kwargs):
+        if chunked:
+            conn.putrequest(method, conn_url)
+            for header, value in kwargs['headers'].items():
+                conn.putheader(header, value)
+            conn.endheaders()
+            self._send_chunks(conn, kwargs['body'])
+            conn.send(b'0\r\n\r\n')
+        else:
+            conn.request(method, conn_url, **kwargs)
+        return conn.getresponse()
+
+    def _send_chunks(self, conn, body):
+        """Sends a file-like body in chunks, without copying them.
+
+        The size and the end of each chunk are sent separately from its
+        data. Real files are sent with sendfile where available, else
+        read into a single buffer reused for all the chunks.
+        """
+        chunk_size = self.chunk_size or CHUNKSIZE
+        # The OpenSSL connections of VerifiedHTTPSConnection only send bytes
+        buffers = isinstance(conn.sock, socket.socket)
+        fileno = _get_fileno(body)
+        if (fileno is not None and hasattr(os, 'sendfile') and buffers and
+                not isinstance(conn.sock, ssl.SSLSocket)):
+            offset = os.lseek(fileno, 0, os.SEEK_CUR)
+            while True:
+                size = min(chunk_size,
+                           os.fstat(fileno).st_size - offset)
+                if size <= 0:
+                    break
+                conn.send(('%x\r\n' % size).encode('ascii'))
+                # sendfile may send less than asked
+                end = offset + size
+                while offset < end:
+                    offset += os.sendfile(conn.sock.fileno(), fileno,
+                                          offset, end - offset)
+                conn.send(b'\r\n')
+            os.lseek(fileno, offset, os.SEEK_SET)
+        elif hasattr(body, 'readinto'):
+            buf = bytearray(chunk_size)
+            view = memoryview(buf)
+            while True:
+                size = body.readinto(buf)
+                if not size:
+                    break
+                conn.send(('%x\r\n' % size).encode('ascii'))
+                conn.send(view[:size] if buffers else bytes(buf[:size]))
+                conn.send(b'\r\n')
+        else:
+            chunk = body.read(chunk_size)
+            while chunk:
+                conn.send(('%x\r\n' % len(chunk)).encode('ascii'))
+                conn.send(chunk)
+                conn.send(b'\r\n')
+                chunk = body.read(chunk_size)
+
     def _log_request(self, method, url, headers):
         LOG.info('Request: ' + method + ' ' + url)
         if headers:
@@ -358,19 +482,51 @@ class VerifiedHTTPSConnection(httplib.HTTPSConnection):
         httplib.HTTPSConnection.close(self)
 
 
+def _get_fileno(body):
+    # The descriptor of a body which is a regular file, or None
+    try:
+        fileno = body.fileno()
+    except (AttributeError, IOError, OSError, ValueError):
+        return None
+    if not stat.S_ISREG(os.fstat(fileno).st_mode):
+        return None
+    return fileno
+
+
 class ResponseBodyIterator(object):
-    """A class that acts as an iterator over an HTTP response."""
+    """A class that acts as an iterator over an HTTP response.
 
-    def __init__(self, resp):
+    :param release: called once the response was entirely read
+    :param chunk_size: size of the chunks read from the response
+    :param checksum: name of the hashlib algorithm of the checksum computed
+                     while the response is read, see checksum()
+    """
+
+    def __init__(self, resp, release=None, chunk_size=CHUNKSIZE,
+                 checksum=None):
         self.resp = resp
+        self.release = release
+        self.chunk_size = chunk_size
+        self.hasher = hashlib.new(checksum) if checksum else None
 
     def __iter__(self):
         while True:
             yield self.next()
 
     def next(self):
-        chunk = self.resp.read(CHUNKSIZE)
+        chunk = self.resp.read(self.chunk_size)
         if chunk:
+            if self.hasher is not None:
+                self.hasher.update(chunk)
             return chunk
         else:
+            if self.release is not None:
+                release, self.release = self.release, None
+                release()
             raise StopIteration()
+
+    def checksum(self):
+        """Returns the hex digest of the data read so far, or None."""
+        if self.hasher is None:
+            return None
+        return self.hasher.hexdigest()
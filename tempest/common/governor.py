@@ -0,0 +1,222 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Per endpoint concurrency and rate limits of the service clients.
+
+The requests the service clients of a process send to an endpoint are
+bounded to [http]/max_in_flight_per_endpoint at a time, and paced to
+[http]/max_requests_per_second, across all the threads of the process.
+
+An idempotent request which gets a 429 or a 503 response is retried up to
+[http]/overload_retries times. When the response has a Retry-After header,
+no request is sent to the endpoint until that delay, capped to
+[http]/max_overload_backoff, elapsed; otherwise the request is retried
+after a jittered exponential backoff. The 413 responses are left to the
+retries of RestClient.request, so that they are not retried twice.
+"""
+
+import atexit
+import calendar
+import collections
+import email.utils
+import os
+import random
+import threading
+import time
+
+from oslo_log import log as logging
+import six
+from six.moves.urllib import parse as urlparse
+
+from tempest import config
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+OVERLOAD_STATUSES = (429, 503)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS')
+
+
+def retry_after(resp):
+    """Returns the delay in seconds of a Retry-After header, or None.
+
+    The header is either a number of seconds or an HTTP date.
+    """
+    value = resp.get('retry-after')
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        date = email.utils.parsedate(value)
+        if date is None:
+            return None
+        return max(calendar.timegm(date) - time.time(), 0.0)
+
+
+class EndpointLimiter(object):
+    """Concurrency and rate limits of the requests to an endpoint.
+
+    :param max_in_flight: maximum number of requests in flight, or 0
+    :param rate: maximum number of requests per second, or 0
+    """
+
+    def __init__(self, max_in_flight, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._slots = (threading.BoundedSemaphore(max_in_flight)
+                       if max_in_flight > 0 else None)
+        self._lock = threading.Lock()
+        self._not_before = 0.0
+
+    def acquire(self):
+        """Waits for a slot and for the turn of a request.
+
+        Returns the number of seconds waited for the turn.
+        """
+        if self._slots is not None:
+            self._slots.acquire()
+        with self._lock:
+            now = time.time()
+            start = max(now, self._not_before)
+            if self.interval:
+                self._not_before = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+        return start - now
+
+    def release(self):
+        if self._slots is not None:
+            self._slots.release()
+
+    def pause(self, seconds):
+        """Sends no request to the endpoint for the given delay."""
+        with self._lock:
+            self._not_before = max(self._not_before, time.time() + seconds)
+
+
+class Governor(object):
+    """Limits and retries the requests of the clients, per endpoint.
+
+    The counters are the number of requests sent, of requests delayed by
+    the limits and the total seconds they waited, of overload responses,
+    and of retries.
+    """
+
+    def __init__(self, max_in_flight=0, rate=0.0, retries=0, backoff=1.0,
+                 max_backoff=60.0):
+        self.max_in_flight = max_in_flight
+        self.rate = rate
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._limiters = {}
+        self._counters = collections.Counter()
+        self._lock = threading.Lock()
+
+    def limiter(self, url):
+        parts = urlparse.urlparse(url)
+        key = (parts.scheme, parts.netloc)
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limiter = EndpointLimiter(self.max_in_flight, self.rate)
+                self._limiters[key] = limiter
+            return limiter
+
+    def _count(self, **counts):
+        with self._lock:
+            self._counters.update(counts)
+
+    def stats(self):
+        with self._lock:
+            stats = dict.fromkeys(('requests', 'delayed', 'wait_seconds',
+                                   'overloaded', 'retries'), 0)
+            stats.update(self._counters)
+            return stats
+
+    def _can_retry(self, method, body):
+        if method not in IDEMPOTENT_METHODS:
+            return False
+        # A file-like body cannot be sent again
+        return body is None or isinstance(body, (six.binary_type,
+                                                 six.text_type))
+
+    def request(self, method, url, body, send):
+        """Sends a request with send() within the limits of its endpoint.
+
+        :param send: callable sending the request, returning the response
+                     and its body
+        """
+        limiter = self.limiter(url)
+        attempt = 0
+        while True:
+            waited = limiter.acquire()
+            try:
+                resp, resp_body = send()
+            finally:
+                limiter.release()
+            self._count(requests=1)
+            if waited:
+                self._count(delayed=1, wait_seconds=waited)
+            if resp.status not in OVERLOAD_STATUSES:
+                return resp, resp_body
+            self._count(overloaded=1)
+            delay = retry_after(resp)
+            if delay is not None:
+                # The other requests to the endpoint wait too, but not for
+                # longer than a backoff, whatever the server asked
+                delay = min(delay, self.max_backoff)
+                limiter.pause(delay)
+            if attempt >= self.retries or not self._can_retry(method, body):
+                return resp, resp_body
+            if delay is None:
+                time.sleep(random.uniform(
+                    0, min(self.backoff * 2 ** attempt, self.max_backoff)))
+            attempt += 1
+            self._count(retries=1)
+            LOG.debug('Retrying %s %s after a %s response (%d/%d)', method,
+                      url, resp.status, attempt, self.retries)
+
+
+_governor = None
+_governor_pid = None
+_governor_lock = threading.Lock()
+
+
+def get_governor():
+    """Returns the governor of this process, or None if not configured."""
+    global _governor, _governor_pid
+    opts = CONF.http
+    if not (opts.max_in_flight_per_endpoint or opts.max_requests_per_second or
+            opts.overload_retries):
+        return None
+    if _governor is not None and _governor_pid == os.getpid():
+        return _governor
+    with _governor_lock:
+        if _governor is None or _governor_pid != os.getpid():
+            if _governor is None:
+                atexit.register(_log_stats)
+            _governor = Governor(
+                max_in_flight=opts.max_in_flight_per_endpoint,
+                rate=opts.max_requests_per_second,
+                retries=opts.overload_retries,
+                backoff=opts.overload_backoff,
+                max_backoff=opts.max_overload_backoff)
+            _governor_pid = os.getpid()
+        return _governor
+
+
+def _log_stats():
+    if _governor is not None and _governor_pid == os.getpid():
+        LOG.info('HTTP governor: %(requests)d requests, %(delayed)d delayed '
+                 'for %(wait_seconds).1f seconds, %(overloaded)d overload '
+                 'responses, %(retries)d retries', _governor.stats())
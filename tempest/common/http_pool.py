@@ -0,0 +1,196 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Keep-alive HTTP connections shared by the clients of a process.
+
+By default every request of a service client opens a new connection, and
+does a new TLS handshake, since tempest_lib asks the server to close the
+connection after each response. When [http]/connection_pool is set, the
+service clients and the image HTTP client instead take their connections
+from a per-process ConnectionPool, and hand them back once the response
+was read, to be reused by the next request to the same endpoint.
+"""
+
+import atexit
+import collections
+import os
+import threading
+
+import httplib2
+from oslo_log import log as logging
+
+from tempest import config
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+
+class ConnectionPool(object):
+    """Idle connections, by endpoint and connection settings.
+
+    A connection is taken out of the pool for the duration of a request,
+    so that it is never used by two threads at a time. The idle connections
+    of a parent process are forgotten by its forked children, which would
+    otherwise read and write the same sockets, by the clients they created
+    before the fork.
+
+    :param max_idle: maximum number of idle connections kept per key
+    """
+
+    def __init__(self, max_idle):
+        self.max_idle = max_idle
+        self.hits = 0
+        self.misses = 0
+        self._idle = collections.defaultdict(list)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _check_pid(self):
+        # Called with the lock held. The sockets of the parent are left
+        # open, they are still used by the parent
+        if self._pid != os.getpid():
+            self._idle = collections.defaultdict(list)
+            self._pid = os.getpid()
+
+    def get(self, key):
+        """Returns an idle connection for the key, or None."""
+        with self._lock:
+            self._check_pid()
+            idle = self._idle.get(key)
+            if idle:
+                self.hits += 1
+                return idle.pop()
+            self.misses += 1
+        return None
+
+    def put(self, key, conn):
+        """Hands a connection back once its response was read.
+
+        The connection is dropped if the server closed it, or closed if
+        there are already max_idle connections for the key.
+        """
+        if getattr(conn, 'sock', None) is None:
+            return
+        with self._lock:
+            self._check_pid()
+            idle = self._idle[key]
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def clear(self):
+        """Closes all the idle connections."""
+        with self._lock:
+            self._check_pid()
+            idle, self._idle = self._idle, collections.defaultdict(list)
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {'reused': self.hits,
+                    'opened': self.misses,
+                    'idle': sum(len(conns) for conns in self._idle.values()),
+                    'reuse_rate': (float(self.hits) / requests
+                                   if requests else 0.0)}
+
+
+def _connection_key(uri):
+    # Same key as httplib2.Http uses for its connections
+    scheme, authority, _, _ = httplib2.urlnorm(httplib2.iri2uri(uri))
+    domain_port = authority.split(":")[0:2]
+    if len(domain_port) == 2 and domain_port[1] == '443' and scheme == 'http':
+        scheme = 'https'
+        authority = domain_port[0]
+    return scheme + ":" + authority
+
+
+class PooledHttp(httplib2.Http):
+    """httplib2.Http using the connections of a ConnectionPool.
+
+    The connections are checked out of the pool for each request, instead
+    of being kept by the Http object, which can so be shared by threads.
+    """
+
+    def __init__(self, pool, **kwargs):
+        self._local = threading.local()
+        self.pool = pool
+        super(PooledHttp, self).__init__(**kwargs)
+
+    @property
+    def connections(self):
+        # The connections used by the current request of this thread
+        if not hasattr(self._local, 'connections'):
+            self._local.connections = {}
+        return self._local.connections
+
+    @connections.setter
+    def connections(self, value):
+        self._local.connections = value
+
+    def _pool_key(self, connection_key):
+        return ('httplib2', connection_key, self.ca_certs,
+                self.disable_ssl_certificate_validation, self.timeout)
+
+    def request(self, uri, *args, **kwargs):
+        connections = self.connections
+        connection_key = _connection_key(uri)
+        conn = self.pool.get(self._pool_key(connection_key))
+        if conn is not None:
+            connections[connection_key] = conn
+        succeeded = False
+        try:
+            response = super(PooledHttp, self).request(uri, *args, **kwargs)
+            succeeded = True
+            return response
+        finally:
+            # Redirections may have used connections to other endpoints
+            for key, conn in list(connections.items()):
+                if succeeded:
+                    self.pool.put(self._pool_key(key), conn)
+                else:
+                    conn.close()
+            connections.clear()
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Returns the pool of this process, or None if pooling is disabled.
+
+    A forked process gets a pool of its own. The pool of its parent, still
+    used by the clients created before the fork, is emptied on its first
+    use in the child, see ConnectionPool.
+    """
+    global _pool, _pool_pid
+    if not CONF.http.connection_pool:
+        return None
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            if _pool is None:
+                atexit.register(_log_stats)
+            _pool = ConnectionPool(CONF.http.max_idle_connections)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _log_stats():
+    if _pool is not None and _pool_pid == os.getpid():
+        LOG.info('HTTP connection pool: %(reused)d connections reused, '
+                 '%(opened)d opened, reuse rate %(reuse_rate).2f',
+                 _pool.stats())
@@ -13,13 +13,22 @@
 #    under the License.
 
 import abc
+import atexit
+import functools
+import sys
+import threading
+
 import netaddr
 from oslo_log import log as logging
 import six
+from six import moves
 from tempest_lib import exceptions as lib_exc
 
 from tempest import clients
 from tempest.common import cred_provider
+from tempest.common import reaper
+from tempest.common import tasks
+from tempest.common import token_cache
 from tempest.common.utils import data_utils
 from tempest import config
 from tempest import exceptions
@@ -28,6 +37,10 @@ from tempest.services.identity.v2.json import identity_client as v2_identity
 CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
+# Admin clients of the threads other than the one which created the
+# IsolatedCreds, per identity version and credentials domain
+_thread_local = threading.local()
+
 
 @six.add_metaclass(abc.ABCMeta)
 class CredsClient(object):
@@ -82,6 +95,13 @@ class CredsClient(object):
     def delete_user(self, user_id):
         self.identity_client.delete_user(user_id)
 
+    def update_user_name(self, user_id, name):
+        self.identity_client.update_user(user_id, name=name)
+
+    @abc.abstractmethod
+    def update_project_name(self, project_id, name):
+        pass
+
     def _list_roles(self):
         roles = self.identity_client.list_roles()
         return roles
@@ -101,6 +121,9 @@ class V2CredsClient(CredsClient):
             tenant_name=project['name'], tenant_id=project['id'],
             password=password)
 
+    def update_project_name(self, project_id, name):
+        self.identity_client.update_tenant(project_id, name=name)
+
     def delete_project(self, project_id):
         self.identity_client.delete_tenant(project_id)
 
@@ -133,6 +156,9 @@ class V3CredsClient(CredsClient):
             password=password,
             project_domain_name=self.creds_domain['name'])
 
+    def update_project_name(self, project_id, name):
+        self.identity_client.update_project(project_id, name=name)
+
     def delete_project(self, project_id):
         self.identity_client.delete_project(project_id)
 
@@ -156,7 +182,7 @@ class IsolatedCreds(cred_provider.CredentialProvider):
         self.default_admin_creds = cred_provider.get_configured_credentials(
             'identity_admin', fill_in=True,
             identity_version=self.identity_version)
-        self.identity_admin_client, self.network_admin_client = (
+        identity_admin_client, network_admin_client = (
             self._get_admin_clients())
         # Domain where isolated credentials are provisioned (v3 only).
         # Use that of the admin account is None is configured.
@@ -165,8 +191,42 @@ class IsolatedCreds(cred_provider.CredentialProvider):
             self.creds_domain_name = (
                 self.default_admin_creds.project_domain_name or
                 CONF.auth.default_credentials_domain_name)
-        self.creds_client = get_creds_client(
-            self.identity_admin_client, self.creds_domain_name)
+        self._owner_thread = threading.current_thread()
+        self._admin_clients = (
+            identity_admin_client, network_admin_client,
+            get_creds_client(identity_admin_client, self.creds_domain_name))
+
+    def _get_thread_admin_clients(self):
+        """Returns the admin clients to be used by the current thread.
+
+        The http connections of a client cannot be shared between threads,
+        so the threads other than the one which created this object, like
+        the task pool workers, use their own clients created on first use.
+        """
+        if threading.current_thread() is self._owner_thread:
+            return self._admin_clients
+        thread_clients = _thread_local.__dict__.setdefault('clients', {})
+        key = (self.identity_version, self.creds_domain_name)
+        if key not in thread_clients:
+            identity_admin_client, network_admin_client = (
+                self._get_admin_clients())
+            thread_clients[key] = (
+                identity_admin_client, network_admin_client,
+                get_creds_client(identity_admin_client,
+                                 self.creds_domain_name))
+        return thread_clients[key]
+
+    @property
+    def identity_admin_client(self):
+        return self._get_thread_admin_clients()[0]
+
+    @property
+    def network_admin_client(self):
+        return self._get_thread_admin_clients()[1]
+
+    @property
+    def creds_client(self):
+        return self._get_thread_admin_clients()[2]
 
     def _get_admin_clients(self):
         """
@@ -232,8 +292,8 @@ class IsolatedCreds(cred_provider.CredentialProvider):
         else:
             return os.identity_v3_client, os.network_client
 
-    def _create_creds(self, suffix="", admin=False, roles=None):
-        """Create random credentials under the following schema.
+    def _get_creds_names(self, suffix=""):
+        """Create random credentials names under the following schema.
 
         If the name contains a '.' is the full class path of something, and
         we don't really care. If it isn't, it's probably a meaningful name,
@@ -241,6 +301,8 @@ class IsolatedCreds(cred_provider.CredentialProvider):
 
         For logging purposes, -user and -tenant are long and redundant,
         don't use them. The user# will be sufficient to figure it out.
+
+        Returns the project name, the user name, password and email.
         """
         if '.' in self.name:
             root = ""
@@ -248,44 +310,80 @@ class IsolatedCreds(cred_provider.CredentialProvider):
             root = self.name
 
         project_name = data_utils.rand_name(root) + suffix
-        project_desc = project_name + "-desc"
-        project = self.creds_client.create_project(
-            name=project_name, description=project_desc)
-
         username = data_utils.rand_name(root) + suffix
         user_password = data_utils.rand_password()
         email = data_utils.rand_name(root) + suffix + "@example.com"
-        user = self.creds_client.create_user(
-            username, user_password, project, email)
-        role_assigned = False
+        return project_name, username, user_password, email
+
+    def _get_creds_roles(self, admin=False, roles=None):
+        user_roles = []
         if admin:
-            self.creds_client.assign_user_role(user, project,
-                                               CONF.identity.admin_role)
-            role_assigned = True
+            user_roles.append(CONF.identity.admin_role)
         # Add roles specified in config file
-        for conf_role in CONF.auth.tempest_roles:
-            self.creds_client.assign_user_role(user, project, conf_role)
-            role_assigned = True
+        user_roles.extend(CONF.auth.tempest_roles)
         # Add roles requested by caller
         if roles:
-            for role in roles:
-                self.creds_client.assign_user_role(user, project, role)
-                role_assigned = True
+            user_roles.extend(roles)
+        return user_roles
+
+    def _assign_member_role(self, user, project):
         # NOTE(mtreinish) For a user to have access to a project with v3 auth
         # it must beassigned a role on the project. So we need to ensure that
         # our newly created user has a role on the newly created project.
-        if self.identity_version == 'v3' and not role_assigned:
-            self.creds_client.create_user_role('Member')
-            self.creds_client.assign_user_role(user, project, 'Member')
+        self.creds_client.create_user_role('Member')
+        self.creds_client.assign_user_role(user, project, 'Member')
+
+    def _create_creds(self, suffix="", admin=False, roles=None):
+        project_name, username, user_password, email = (
+            self._get_creds_names(suffix))
+        project = self.creds_client.create_project(
+            name=project_name, description=project_name + "-desc")
+        user = self.creds_client.create_user(
+            username, user_password, project, email)
+        user_roles = self._get_creds_roles(admin=admin, roles=roles)
+        for role in user_roles:
+            self.creds_client.assign_user_role(user, project, role)
+        if self.identity_version == 'v3' and not user_roles:
+            self._assign_member_role(user, project)
 
         creds = self.creds_client.get_credentials(user, project, user_password)
         return cred_provider.TestResources(creds)
 
-    def _create_network_resources(self, tenant_id):
-        network = None
-        subnet = None
-        router = None
-        # Make sure settings
+    def _submit_creds(self, pool, admin=False, roles=None):
+        """Submits the creation of random credentials to the task pool.
+
+        Only the user creation depends on the project, and the role
+        assignments on the user, so the role assignments run concurrently.
+        Returns the tasks returning the project, the user and the
+        TestResources.
+        """
+        project_name, username, user_password, email = (
+            self._get_creds_names())
+        project_task = pool.submit(
+            lambda: self.creds_client.create_project(
+                name=project_name, description=project_name + "-desc"))
+        user_task = pool.submit(
+            lambda project: self.creds_client.create_user(
+                username, user_password, project, email),
+            after=[project_task])
+        user_roles = self._get_creds_roles(admin=admin, roles=roles)
+        role_tasks = [
+            pool.submit(lambda role, user, project:
+                        self.creds_client.assign_user_role(user, project,
+                                                           role),
+                        role, after=[user_task, project_task])
+            for role in user_roles]
+        if self.identity_version == 'v3' and not user_roles:
+            role_tasks.append(pool.submit(self._assign_member_role,
+                                          after=[user_task, project_task]))
+        creds_task = pool.submit(
+            lambda user, project, *roles: cred_provider.TestResources(
+                self.creds_client.get_credentials(user, project,
+                                                  user_password)),
+            after=[user_task, project_task] + role_tasks)
+        return project_task, user_task, creds_task
+
+    def _validate_network_resources(self):
         if self.network_resources:
             if self.network_resources['router']:
                 if (not self.network_resources['subnet'] or
@@ -299,6 +397,12 @@ class IsolatedCreds(cred_provider.CredentialProvider):
             elif self.network_resources['dhcp']:
                 raise exceptions.InvalidConfiguration('DHCP requires a subnet')
 
+    def _create_network_resources(self, tenant_id):
+        network = None
+        subnet = None
+        router = None
+        # Make sure settings
+        self._validate_network_resources()
         data_utils.rand_name_root = data_utils.rand_name(self.name)
         if not self.network_resources or self.network_resources['network']:
             network_name = data_utils.rand_name_root + "-network"
@@ -370,30 +474,234 @@ class IsolatedCreds(cred_provider.CredentialProvider):
         self.network_admin_client.add_router_interface_with_subnet_id(
             router_id, subnet_id)
 
+    def _submit_network_resources(self, pool, project_task):
+        """Submits the creation of the network resources to the task pool.
+
+        The router is created concurrently with the network and the subnet.
+        Returns the tasks returning the network, the subnet and the router,
+        None for the resources not requested, and the task adding the
+        router interface.
+        """
+        self._validate_network_resources()
+        network_task = subnet_task = router_task = interface_task = None
+        name_root = data_utils.rand_name(self.name)
+        if not self.network_resources or self.network_resources['network']:
+            network_task = pool.submit(
+                lambda project: self._create_network(
+                    name_root + "-network", project['id']),
+                after=[project_task])
+        if not self.network_resources or self.network_resources['subnet']:
+            subnet_task = pool.submit(
+                lambda network, project: self._create_subnet(
+                    name_root + "-subnet", project['id'], network['id']),
+                after=[network_task, project_task])
+        if not self.network_resources or self.network_resources['router']:
+            router_task = pool.submit(
+                lambda project: self._create_router(
+                    name_root + "-router", project['id']),
+                after=[project_task])
+            interface_task = pool.submit(
+                lambda router, subnet: self._add_router_interface(
+                    router['id'], subnet['id']),
+                after=[router_task, subnet_task])
+        return network_task, subnet_task, router_task, interface_task
+
+    def _submit_provisioning(self, pool, admin=False, roles=None):
+        """Submits the creation of credentials to the task pool.
+
+        The network resources only depend on the project, so they are
+        created concurrently with the user and its role assignments.
+        Returns the arguments of _collect_provisioning.
+        """
+        creds_tasks = self._submit_creds(pool, admin=admin, roles=roles)
+        network_tasks = None
+        if self._isolated_networks_enabled():
+            network_tasks = self._submit_network_resources(pool,
+                                                           creds_tasks[0])
+        return creds_tasks, network_tasks
+
+    def _clear_failed_provisioning(self, creds_tasks, network_tasks=None):
+        """Deletes the resources created by a provisioning which failed.
+
+        Every deletion is attempted, and their errors are only logged, so
+        that the error of the provisioning is the one raised.
+        """
+        def created(task):
+            if task is None or not task.done() or task.failed():
+                return None
+            return task.result()
+
+        steps = []
+        if network_tasks:
+            network, subnet, router = [created(task)
+                                       for task in network_tasks[:3]]
+            interface_task = network_tasks[3]
+            if router:
+                # The router cannot be deleted with an interface attached
+                if (subnet and interface_task is not None and
+                        interface_task.done() and
+                        not interface_task.failed()):
+                    steps.append(functools.partial(
+                        self._clear_isolated_router_interface,
+                        router['id'], subnet['id'], router['name']))
+                steps.append(functools.partial(self._clear_isolated_router,
+                                               router['id'], router['name']))
+            if subnet:
+                steps.append(functools.partial(self._clear_isolated_subnet,
+                                               subnet['id'], subnet['name']))
+            if network:
+                steps.append(functools.partial(self._clear_isolated_network,
+                                               network['id'],
+                                               network['name']))
+        project, user = [created(task) for task in creds_tasks[:2]]
+        if user:
+            steps.append(functools.partial(self._clear_isolated_user,
+                                           user['id'], user['name']))
+        if project:
+            steps.append(functools.partial(self._clear_isolated_project,
+                                           project['id'], project['name']))
+        for step in steps:
+            try:
+                step()
+            except Exception:
+                LOG.exception('Failed to delete the resources of isolated '
+                              'credentials which could not be created')
+
+    def _collect_provisioning(self, creds_tasks, network_tasks=None):
+        """Waits for submitted credentials and returns them.
+
+        The resources already created are deleted when the creation of one
+        of them failed.
+        """
+        pending = [creds_tasks[2]] + [task for task in network_tasks or []
+                                      if task is not None]
+        try:
+            credentials = tasks.wait_all(pending)[0]
+        except Exception:
+            exc_info = sys.exc_info()
+            self._clear_failed_provisioning(creds_tasks, network_tasks)
+            six.reraise(*exc_info)
+        # Maintained until tests are ported
+        LOG.info("Acquired isolated creds:\n credentials: %s"
+                 % credentials)
+        if network_tasks:
+            network, subnet, router = [task.result() if task else None
+                                       for task in network_tasks[:3]]
+            credentials.set_resources(network=network, subnet=subnet,
+                                      router=router)
+            LOG.info("Created isolated network resources for : \n"
+                     + " credentials: %s" % credentials)
+        return credentials
+
+    def _isolated_networks_enabled(self):
+        return (CONF.service_available.neutron and
+                not CONF.baremetal.driver_enabled and
+                CONF.auth.create_isolated_networks)
+
+    def _provision_credentials(self, admin=False, roles=None):
+        """Creates credentials and, if needed, their network resources.
+
+        The creation runs concurrently in the task pool, if enabled.
+        """
+        pool = get_task_pool()
+        if pool is not None:
+            return self._collect_provisioning(
+                *self._submit_provisioning(pool, admin=admin, roles=roles))
+        credentials = self._create_creds(admin=admin, roles=roles)
+        # Maintained until tests are ported
+        LOG.info("Acquired isolated creds:\n credentials: %s"
+                 % credentials)
+        if self._isolated_networks_enabled():
+            network, subnet, router = self._create_network_resources(
+                credentials.tenant_id)
+            credentials.set_resources(network=network, subnet=subnet,
+                                      router=router)
+            LOG.info("Created isolated network resources for : \n"
+                     + " credentials: %s" % credentials)
+        return credentials
+
+    def _get_pooled_credentials(self):
+        """Takes primary or alt credentials from the warm pool, if any.
+
+        The pooled user and project are renamed after this provider, so
+        that they are attributed to its test class like the provisioned
+        ones. Returns None when the pool is disabled or empty, or when the
+        test class requested specific network resources, since the pool
+        only provisions the default ones.
+        """
+        if self.network_resources:
+            return None
+        pool = get_warm_pool(self.identity_version)
+        if pool is None:
+            return None
+        credentials = pool.get()
+        if credentials is None:
+            return None
+        project_name, username, _, _ = self._get_creds_names()
+        try:
+            self.creds_client.update_project_name(credentials.tenant_id,
+                                                  project_name)
+            self.creds_client.update_user_name(credentials.user_id,
+                                               username)
+        except Exception:
+            # Owned by this provider from now on, so cleared with its others
+            self.isolated_creds[credentials.tenant_id] = credentials
+            raise
+        credentials.credentials.tenant_name = project_name
+        credentials.credentials.username = username
+        LOG.info("Acquired pooled isolated creds:\n credentials: %s"
+                 % credentials)
+        return credentials
+
     def get_credentials(self, credential_type):
         if self.isolated_creds.get(str(credential_type)):
             credentials = self.isolated_creds[str(credential_type)]
         else:
-            if credential_type in ['primary', 'alt', 'admin']:
-                is_admin = (credential_type == 'admin')
-                credentials = self._create_creds(admin=is_admin)
+            if credential_type == 'admin':
+                credentials = self._provision_credentials(admin=True)
+            elif credential_type in ['primary', 'alt']:
+                credentials = (self._get_pooled_credentials() or
+                               self._provision_credentials())
             else:
-                credentials = self._create_creds(roles=credential_type)
+                # The pooled users have the roles of the primary ones, so
+                # they would have more than the roles requested
+                credentials = self._provision_credentials(
+                    roles=credential_type)
             self.isolated_creds[str(credential_type)] = credentials
-            # Maintained until tests are ported
-            LOG.info("Acquired isolated creds:\n credentials: %s"
-                     % credentials)
-            if (CONF.service_available.neutron and
-                not CONF.baremetal.driver_enabled and
-                CONF.auth.create_isolated_networks):
-                network, subnet, router = self._create_network_resources(
-                    credentials.tenant_id)
-                credentials.set_resources(network=network, subnet=subnet,
-                                          router=router)
-                LOG.info("Created isolated network resources for : \n"
-                         + " credentials: %s" % credentials)
         return credentials
 
+    def prefetch_credentials(self, credential_types):
+        """Provisions the primary, alt and admin credentials concurrently.
+
+        Does nothing when the task pool is disabled. The credentials are
+        then returned by get_credentials.
+        """
+        pool = get_task_pool()
+        if pool is None:
+            return
+        submitted = []
+        for credential_type in credential_types:
+            if (credential_type not in ['primary', 'alt', 'admin'] or
+                    credential_type in self.isolated_creds or
+                    credential_type in dict(submitted)):
+                continue
+            if credential_type != 'admin':
+                credentials = self._get_pooled_credentials()
+                if credentials:
+                    self.isolated_creds[credential_type] = credentials
+                    continue
+            submitted.append((credential_type, self._submit_provisioning(
+                pool, admin=(credential_type == 'admin'))))
+        exc_info = None
+        for credential_type, provisioning in submitted:
+            try:
+                self.isolated_creds[credential_type] = (
+                    self._collect_provisioning(*provisioning))
+            except Exception:
+                exc_info = exc_info or sys.exc_info()
+        if exc_info:
+            six.reraise(*exc_info)
+
     def get_primary_creds(self):
         return self.get_credentials('primary')
 
@@ -453,53 +761,112 @@ class IsolatedCreds(cred_provider.CredentialProvider):
                 LOG.warn('Security group %s, id %s not found for clean-up' %
                          (secgroup['name'], secgroup['id']))
 
-    def _clear_isolated_net_resources(self):
+    def _clear_isolated_router_interface(self, router_id, subnet_id,
+                                         router_name):
         net_client = self.network_admin_client
-        for cred in self.isolated_creds:
-            creds = self.isolated_creds.get(cred)
-            if (not creds or not any([creds.router, creds.network,
-                                      creds.subnet])):
+        try:
+            net_client.remove_router_interface_with_subnet_id(router_id,
+                                                              subnet_id)
+        except lib_exc.NotFound:
+            LOG.warn('router with name: %s not found for delete' %
+                     router_name)
+
+    def _clear_isolated_user(self, user_id, username):
+        try:
+            self.creds_client.delete_user(user_id)
+        except lib_exc.NotFound:
+            LOG.warn("user with name: %s not found for delete" % username)
+
+    def _clear_isolated_project(self, project_id, project_name):
+        try:
+            if CONF.service_available.neutron:
+                self._cleanup_default_secgroup(project_id)
+            self.creds_client.delete_project(project_id)
+        except lib_exc.NotFound:
+            LOG.warn("tenant with name: %s not found for delete" %
+                     project_name)
+
+    def _get_cleanup_record(self, creds):
+        """Returns the ids and names of the resources of creds to delete.
+
+        The record is JSON serializable, so that the reaper can journal it.
+        """
+        record = {'user_id': creds.user_id,
+                  'username': creds.username,
+                  'project_id': creds.tenant_id,
+                  'project_name': creds.tenant_name}
+        if not any([creds.router, creds.network, creds.subnet]):
+            return record
+        if (not self.network_resources or
+                (self.network_resources.get('router') and creds.subnet)):
+            record['router'] = {'id': creds.router['id'],
+                                'name': creds.router['name'],
+                                'subnet_id': creds.subnet['id']}
+        if (not self.network_resources or
+            self.network_resources.get('subnet')):
+            record['subnet'] = {'id': creds.subnet['id'],
+                                'name': creds.subnet['name']}
+        if (not self.network_resources or
+            self.network_resources.get('network')):
+            record['network'] = {'id': creds.network['id'],
+                                 'name': creds.network['name']}
+        return record
+
+    def _clear_isolated_net_resources(self, records):
+        for record in records:
+            if not any(key in record
+                       for key in ('router', 'subnet', 'network')):
                 continue
             LOG.debug("Clearing network: %(network)s, "
                       "subnet: %(subnet)s, router: %(router)s",
-                      {'network': creds.network, 'subnet': creds.subnet,
-                       'router': creds.router})
-            if (not self.network_resources or
-                    (self.network_resources.get('router') and creds.subnet)):
-                try:
-                    net_client.remove_router_interface_with_subnet_id(
-                        creds.router['id'], creds.subnet['id'])
-                except lib_exc.NotFound:
-                    LOG.warn('router with name: %s not found for delete' %
-                             creds.router['name'])
-                self._clear_isolated_router(creds.router['id'],
-                                            creds.router['name'])
-            if (not self.network_resources or
-                self.network_resources.get('subnet')):
-                self._clear_isolated_subnet(creds.subnet['id'],
-                                            creds.subnet['name'])
-            if (not self.network_resources or
-                self.network_resources.get('network')):
-                self._clear_isolated_network(creds.network['id'],
-                                             creds.network['name'])
+                      {'network': record.get('network'),
+                       'subnet': record.get('subnet'),
+                       'router': record.get('router')})
+            router = record.get('router')
+            if router:
+                self._clear_isolated_router_interface(
+                    router['id'], router['subnet_id'], router['name'])
+                self._clear_isolated_router(router['id'], router['name'])
+            if record.get('subnet'):
+                self._clear_isolated_subnet(record['subnet']['id'],
+                                            record['subnet']['name'])
+            if record.get('network'):
+                self._clear_isolated_network(record['network']['id'],
+                                             record['network']['name'])
+
+    def _clear_cached_tokens(self, records):
+        cache = token_cache.get_token_cache()
+        if cache is None:
+            return
+        for record in records:
+            try:
+                cache.delete_user(record['username'])
+            except OSError:
+                LOG.exception('Cannot remove the cached tokens of %s',
+                              record['username'])
 
     def clear_isolated_creds(self):
+        """Deletes the isolated credentials and their network resources.
+
+        With the deferred cleanup enabled, they are handed over to the
+        reaper, which deletes them in the background. The cached tokens of
+        the users are removed right away.
+        """
         if not self.isolated_creds:
             return
-        self._clear_isolated_net_resources()
-        for creds in six.itervalues(self.isolated_creds):
-            try:
-                self.creds_client.delete_user(creds.user_id)
-            except lib_exc.NotFound:
-                LOG.warn("user with name: %s not found for delete" %
-                         creds.username)
-            try:
-                if CONF.service_available.neutron:
-                    self._cleanup_default_secgroup(creds.tenant_id)
-                self.creds_client.delete_project(creds.tenant_id)
-            except lib_exc.NotFound:
-                LOG.warn("tenant with name: %s not found for delete" %
-                         creds.tenant_name)
+        records = [self._get_cleanup_record(creds)
+                   for creds in six.itervalues(self.isolated_creds)]
+        self._clear_cached_tokens(records)
+        deferred_reaper = reaper.get_reaper()
+        if deferred_reaper is not None:
+            deferred_reaper.reap(self, records)
+        else:
+            self._clear_isolated_net_resources(records)
+            for record in records:
+                self._clear_isolated_user(record['user_id'],
+                                          record['username'])
+                self._clear_isolated_project(record['project_id'],
+                                             record['project_name'])
         self.isolated_creds = {}
 
     def is_multi_user(self):
@@ -510,3 +877,115 @@ class IsolatedCreds(cred_provider.CredentialProvider):
 
     def is_role_available(self, role):
         return True
+
+
+class WarmPool(object):
+    """Pool of isolated credentials provisioned ahead of demand.
+
+    A daemon thread keeps up to size non admin credentials, with the default
+    network resources, ready to be handed out by get(). The credentials
+    handed out become owned by the IsolatedCreds which took them and are
+    cleared with the others. The credentials left in the pool are cleared
+    when the process exits.
+    """
+
+    def __init__(self, size, identity_version=None):
+        self.size = size
+        self.identity_version = identity_version
+        self._ready = moves.queue.Queue()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run,
+                                        name='isolated-creds-pool')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def get(self):
+        """Returns pooled credentials or None if the pool is empty."""
+        try:
+            credentials = self._ready.get_nowait()
+        except moves.queue.Empty:
+            credentials = None
+        self._wakeup.set()
+        return credentials
+
+    def _run(self):
+        provider = IsolatedCreds(identity_version=self.identity_version,
+                                 name='warm-pool')
+        while not self._stopped:
+            self._wakeup.clear()
+            if self._ready.qsize() < self.size:
+                try:
+                    self._ready.put(provider._provision_credentials())
+                    continue
+                except Exception:
+                    LOG.exception('Failed to provision pooled credentials')
+            # Wait for the next demand, or for the next try after a failure
+            self._wakeup.wait()
+
+    def stop(self):
+        """Stops refilling the pool and clears the pooled credentials."""
+        self._stopped = True
+        self._wakeup.set()
+        self._thread.join()
+        provider = IsolatedCreds(identity_version=self.identity_version,
+                                 name='warm-pool')
+        while True:
+            try:
+                credentials = self._ready.get_nowait()
+            except moves.queue.Empty:
+                break
+            provider.isolated_creds[credentials.tenant_id] = credentials
+        provider.clear_isolated_creds()
+
+
+_warm_pools = {}
+_warm_pools_lock = threading.Lock()
+
+
+def get_warm_pool(identity_version=None):
+    """Returns the process wide warm pool for an identity version.
+
+    The pool is started on first use. Returns None when the pool is disabled
+    by setting [auth]/isolated_creds_pool_size to 0.
+    """
+    size = CONF.auth.isolated_creds_pool_size
+    if size <= 0:
+        return None
+    identity_version = identity_version or CONF.identity.auth_version
+    with _warm_pools_lock:
+        pool = _warm_pools.get(identity_version)
+        if pool is None:
+            pool = _warm_pools[identity_version] = WarmPool(
+                size, identity_version=identity_version)
+            if len(_warm_pools) == 1:
+                atexit.register(stop_warm_pools)
+    return pool
+
+
+def stop_warm_pools():
+    with _warm_pools_lock:
+        pools = list(_warm_pools.values())
+        _warm_pools.clear()
+    for pool in pools:
+        pool.stop()
+
+
+_task_pool = None
+_task_pool_lock = threading.Lock()
+
+
+def get_task_pool():
+    """Returns the process wide pool creating the isolated credentials.
+
+    Returns None when [auth]/isolated_creds_workers is 0, the credentials
+    are then created sequentially.
+    """
+    global _task_pool
+    workers = CONF.auth.isolated_creds_workers
+    if workers <= 0:
+        return None
+    with _task_pool_lock:
+        if _task_pool is None:
+            _task_pool = tasks.TaskPool(workers, name='isolated-creds')
+    return _task_pool
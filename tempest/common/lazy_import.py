@@ -0,0 +1,84 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Deferred imports of modules and classes.
+
+tempest.clients refers to every service client, and through them to the
+response schemas and to boto, while a test class only uses a few of them.
+The modules are so only imported when a class is first instantiated or a
+module attribute first accessed, rather than when tempest.clients is::
+
+    ServersClient = lazy_import.lazy_class(
+        'tempest.services.compute.json.servers_client.ServersClient')
+    botoclients = lazy_import.lazy_module('tempest.services.botoclients')
+"""
+
+import threading
+
+from oslo_utils import importutils
+
+_lock = threading.Lock()
+_registry = {}
+
+
+class LazyClass(object):
+    """Stands for a class, imported when first called or resolved."""
+
+    def __init__(self, path):
+        self.path = path
+        self._class = None
+
+    def __repr__(self):
+        return '<LazyClass %s>' % self.path
+
+    def resolve(self):
+        """Imports and returns the class."""
+        if self._class is None:
+            self._class = importutils.import_class(self.path)
+        return self._class
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+
+class LazyModule(object):
+    """Stands for a module, imported when one of its attributes is used."""
+
+    def __init__(self, name):
+        self.__name = name
+        self.__module = None
+
+    def __repr__(self):
+        return '<LazyModule %s>' % self.__name
+
+    def __getattr__(self, name):
+        if self.__module is None:
+            self.__module = importutils.import_module(self.__name)
+        return getattr(self.__module, name)
+
+
+def _register(lazy_type, path):
+    with _lock:
+        key = (lazy_type, path)
+        if key not in _registry:
+            _registry[key] = lazy_type(path)
+        return _registry[key]
+
+
+def lazy_class(path):
+    """Returns the LazyClass of a class path, shared by all its users."""
+    return _register(LazyClass, path)
+
+
+def lazy_module(name):
+    """Returns the LazyModule of a module name, shared by all its users."""
+    return _register(LazyModule, name)
@@ -0,0 +1,47 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Helpers of the iter_* methods of the service clients.
+
+The list_* methods fetch and decode a whole listing at once, which is slow
+and memory hungry on large tenants, and silently truncated by the page size
+limit of the server. The iter_* methods instead request the listing one
+page of `limit` items at a time, following the marker of the next page.
+"""
+
+from six.moves.urllib import parse as urllib
+
+DEFAULT_PAGE_SIZE = 1000
+
+
+def get_next_marker(links):
+    """Returns the marker of the next page of a listing, or None.
+
+    :param links: the `<resources>_links` list of a page, or the `next`
+                  URL of a glance v2 page
+    """
+    if not links:
+        return None
+    if isinstance(links, list):
+        links = [link['href'] for link in links if link.get('rel') == 'next']
+        if not links:
+            return None
+        links = links[0]
+    query = urllib.parse_qs(urllib.urlparse(links).query)
+    return query.get('marker', [None])[0]
+
+
+def select_fields(item, fields):
+    """Returns only the given fields of an item, or all if fields is None."""
+    if not fields:
+        return item
+    return dict((field, item[field]) for field in fields if field in item)
@@ -0,0 +1,351 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Shared poller multiplexing resource status waits in a single thread.
+
+The waiters in tempest.common.waiters block their caller and poll one
+resource at a time. The poller instead lets callers register any number of
+waits, returned as WaitFuture objects, and polls them from one background
+thread: all the waits for the same client and resource type are served by a
+single list call per poll.
+"""
+
+import copy
+import threading
+import time
+
+import httplib2
+from oslo_log import log as logging
+import six
+from tempest_lib.common.utils import misc as misc_utils
+from tempest_lib import exceptions as lib_exc
+
+from tempest.common import http_pool
+from tempest.common import timelines
+from tempest.common import waiters
+from tempest import config
+from tempest import exceptions
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+# Target status of a wait for the deletion of a resource
+DELETED = timelines.DELETED
+# Seconds a caller blocking on a wait gives the poller past the deadline of
+# the wait, so that the caller does not hang if the poller thread is stuck
+DEADLINE_MARGIN = 60
+
+
+class ResourceType(object):
+    """Describes how to poll one type of resource in bulk.
+
+    :param lister: callable taking a client and returning the list of all
+                   the resources, as dicts with at least an 'id' key
+    :param error_statuses: statuses on which the wait fails
+    :param error: callable taking the resource id and dict and returning
+                  the exception to raise when an error status is reached
+    :param status_key: key of the status in the resource dict
+    :param ready: callable taking the resource dict and returning whether
+                  the resource is ready once it has the status waited for
+    """
+
+    def __init__(self, lister, error_statuses=(), error=None,
+                 status_key='status', ready=None):
+        self.lister = lister
+        self.error_statuses = error_statuses
+        self.error = error
+        self.status_key = status_key
+        self.ready = ready or (lambda body: True)
+
+    def list(self, client):
+        return dict((resource['id'], resource)
+                    for resource in self.lister(client))
+
+
+def _server_error(server_id, body):
+    # As wait_for_server_status, with the fault of the server if any
+    if 'fault' in body:
+        return exceptions.BuildErrorException(body['fault'],
+                                              server_id=server_id)
+    return exceptions.BuildErrorException(server_id=server_id)
+
+
+RESOURCE_TYPES = {
+    'server': ResourceType(
+        lambda client: client.list_servers(detail=True)['servers'],
+        error_statuses=('ERROR',),
+        error=_server_error,
+        # As wait_for_server_status, no task must be in progress
+        ready=lambda body: body.get('OS-EXT-STS:task_state') is None),
+    'volume': ResourceType(
+        lambda client: client.list_volumes(detail=True),
+        error_statuses=('error', 'error_restoring'),
+        error=lambda id, body: exceptions.VolumeBuildErrorException(
+            volume_id=id)),
+    'snapshot': ResourceType(
+        lambda client: client.list_snapshots(detail=True),
+        error_statuses=('error',),
+        error=lambda id, body: exceptions.SnapshotBuildErrorException(
+            snapshot_id=id)),
+    'image': ResourceType(
+        lambda client: client.list_images(detail=True),
+        error_statuses=('killed', 'ERROR'),
+        error=lambda id, body: exceptions.AddImageException(image_id=id)),
+    'floatingip': ResourceType(
+        lambda client: client.list_floatingips()['floatingips']),
+    'port': ResourceType(
+        lambda client: client.list_ports()['ports']),
+}
+
+
+class WaitFuture(object):
+    """The pending result of a wait registered with the poller."""
+
+    def __init__(self, client, resource_type, resource_id, status, deadline):
+        self.client = client
+        self.resource_type = resource_type
+        self.resource_id = resource_id
+        self.status = status
+        self.deadline = deadline
+        self.current_status = None
+        self.timeline = timelines.start(resource_type, resource_id)
+        self._event = threading.Event()
+        self._result = None
+        self._exception = None
+
+    def __repr__(self):
+        return '<WaitFuture %s %s to %s>' % (self.resource_type,
+                                             self.resource_id, self.status)
+
+    def done(self):
+        return self._event.is_set()
+
+    def set_result(self, result):
+        self._result = result
+        self._event.set()
+
+    def set_exception(self, exception):
+        self._exception = exception
+        self._event.set()
+
+    def result(self, timeout=None):
+        """Blocks until the wait is over and returns the last resource body.
+
+        The body is None for deletion waits. Raises the error of the wait,
+        or TimeoutException if the wait is not over within timeout seconds.
+        """
+        if not self._event.wait(timeout):
+            message = ('%s %s failed to reach %s status (current %s) within '
+                       'the required time.' %
+                       (self.resource_type, self.resource_id, self.status,
+                        self.current_status))
+            caller = misc_utils.find_test_caller()
+            if caller:
+                message = '(%s) %s' % (caller, message)
+            raise exceptions.TimeoutException(message)
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def remaining(self):
+        """Returns the seconds to block on the result of the wait.
+
+        That is until its deadline, with DEADLINE_MARGIN seconds for the
+        poller to notice it.
+        """
+        return max(self.deadline - time.time(), 0) + DEADLINE_MARGIN
+
+
+def _copy_client(client):
+    # The test goes on using the client while the poller thread lists the
+    # resources, and an httplib2.Http is not thread safe, so the poller
+    # uses a copy of the client with its own Http object
+    client = copy.copy(client)
+    http_obj = getattr(client, 'http_obj', None)
+    if (isinstance(http_obj, httplib2.Http) and
+            not isinstance(http_obj, http_pool.PooledHttp)):
+        client.http_obj = copy.copy(http_obj)
+        client.http_obj.connections = {}
+    return client
+
+
+class _PollGroup(object):
+    """The waits served by the same list call."""
+
+    def __init__(self, client, resource_type):
+        self.client = _copy_client(client)
+        self.resource_type = resource_type
+        # A group lives as long as it has waits, so its polling policy has
+        # no deadline of its own, each wait has its deadline instead.
+        policy_class = waiters.POLLING_POLICIES[CONF.waiter.polling_policy]
+        self.policy = policy_class(client.build_interval)
+        self.futures = []
+        self.next_poll = time.time()
+
+
+class Poller(object):
+    """Polls the registered waits from a single daemon thread."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._groups = {}
+        self._thread = None
+
+    def wait_for(self, client, resource_type, resource_id, status,
+                 timeout=None):
+        """Registers a wait and returns its WaitFuture.
+
+        :param client: the client used to list the resources, it should
+                       have build_interval and build_timeout attributes
+        :param resource_type: one of the keys of RESOURCE_TYPES
+        :param resource_id: the id of the resource to wait for
+        :param status: the status to wait for, or DELETED
+        :param timeout: defaults to the client build_timeout
+        """
+        if resource_type not in RESOURCE_TYPES:
+            raise exceptions.InvalidConfiguration(
+                'Unknown resource type %s' % resource_type)
+        if timeout is None:
+            timeout = client.build_timeout
+        future = WaitFuture(client, resource_type, resource_id, status,
+                            time.time() + timeout)
+        key = (id(client), resource_type)
+        with self._cond:
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = _PollGroup(client, resource_type)
+            group.futures.append(future)
+            self._ensure_thread()
+            self._cond.notify()
+        return future
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run,
+                                            name='tempest-poller')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._groups:
+                    self._cond.wait()
+                now = time.time()
+                due = [group for group in self._groups.values()
+                       if group.next_poll <= now]
+                if not due:
+                    next_poll = min(group.next_poll
+                                    for group in self._groups.values())
+                    self._cond.wait(next_poll - now)
+                    continue
+            for group in due:
+                try:
+                    self._poll(group)
+                except Exception as exc:
+                    # Fails the waits of the group rather than leaving them,
+                    # and all the next waits, pending with a dead thread
+                    LOG.exception('Polling %s resources failed',
+                                  group.resource_type)
+                    self._fail(group, exc)
+            with self._cond:
+                for key, group in list(self._groups.items()):
+                    group.futures = [f for f in group.futures
+                                     if not f.done()]
+                    if not group.futures:
+                        del self._groups[key]
+
+    def _fail(self, group, exception):
+        with self._cond:
+            futures = list(group.futures)
+        for future in futures:
+            if not future.done():
+                future.set_exception(exception)
+
+    def _poll(self, group):
+        resource_type = RESOURCE_TYPES[group.resource_type]
+        with self._cond:
+            futures = list(group.futures)
+        start = time.time()
+        resources = resource_type.list(group.client)
+        now = time.time()
+        for future in futures:
+            future.timeline.add_poll(now - start)
+            body = resources.get(future.resource_id)
+            if body is None:
+                if future.status == DELETED:
+                    future.timeline.record(DELETED)
+                    future.set_result(None)
+                    continue
+                # As show would, rather than polling until the deadline
+                future.set_exception(lib_exc.NotFound(
+                    '%s %s not found' % (group.resource_type,
+                                         future.resource_id)))
+                continue
+            status = body[resource_type.status_key]
+            future.timeline.record(status)
+            if status != future.current_status:
+                LOG.info('%s %s status transition "%s" ==> "%s"',
+                         group.resource_type, future.resource_id,
+                         future.current_status, status)
+                future.current_status = status
+            if status == future.status and resource_type.ready(body):
+                future.set_result(body)
+            elif status in resource_type.error_statuses:
+                future.set_exception(resource_type.error(future.resource_id,
+                                                         body))
+            elif now >= future.deadline:
+                message = ('%s %s failed to reach %s status (current %s) '
+                           'within the required time.' %
+                           (group.resource_type, future.resource_id,
+                            future.status, status))
+                future.set_exception(exceptions.TimeoutException(message))
+        group.next_poll = time.time() + group.policy.tick()
+
+
+_poller = None
+_poller_lock = threading.Lock()
+
+
+def get_poller():
+    """Returns the process wide poller."""
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            _poller = Poller()
+    return _poller
+
+
+def wait_for_all(futures, timeout=None):
+    """Waits for a set of futures sharing a single deadline.
+
+    Waits for all the futures to complete, even when some of them failed,
+    and then raises the first failure, so that no resource is left behind
+    unwaited. Returns the list of results otherwise.
+    """
+    deadline = None if timeout is None else time.time() + timeout
+    results = []
+    errors = []
+    for future in futures:
+        remaining = None
+        if deadline is not None:
+            remaining = max(deadline - time.time(), 0)
+        try:
+            results.append(future.result(remaining))
+        except Exception as exc:
+            errors.append(exc)
+    if errors:
+        if len(errors) > 1:
+            LOG.error('%d waits failed: %s', len(errors),
+                      '; '.join(six.text_type(e) for e in errors))
+        raise errors[0]
+    return results
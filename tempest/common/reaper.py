@@ -0,0 +1,252 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Deferred and concurrent deletion of the isolated credentials.
+
+When [auth]/deferred_isolated_creds_cleanup is set, IsolatedCreds hands the
+resources of its credentials over to the process wide Reaper instead of
+deleting them in tearDownClass. The Reaper deletes them concurrently in the
+background, and waits for all the deletions to complete when the process
+exits.
+
+Every set of resources handed over is first written to a journal file, and
+marked as done once deleted. The journal is removed when everything was
+deleted, otherwise the resources left, for instance when the worker died,
+can be deleted later with ``tempest cleanup --journal <file>``.
+"""
+
+import atexit
+import collections
+import os
+import tempfile
+import threading
+
+from oslo_log import log as logging
+from oslo_serialization import jsonutils as json
+
+from tempest.common import tasks
+from tempest import config
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+
+def read_journal(path):
+    """Returns the records of a journal not deleted yet, by entry id."""
+    pending = collections.OrderedDict()
+    with open(path) as journal_file:
+        for line in journal_file:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # The last line is truncated if the worker died writing it
+                continue
+            if entry.get('done'):
+                pending.pop(entry['id'], None)
+            else:
+                pending[entry['id']] = entry['record']
+    return pending
+
+
+class Journal(object):
+    """Append only file of the records handed over to a Reaper.
+
+    Each line is a JSON entry, either a record with its entry id or the
+    mark that the record with that id was deleted.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._next_id = 0
+        if os.path.exists(path):
+            self._next_id = max(list(read_journal(path)) + [-1]) + 1
+        self._file = None
+
+    def _write(self, entry):
+        if self._file is None:
+            self._file = open(self.path, 'a')
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+
+    def add(self, record):
+        """Writes a record and returns its entry id."""
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._write({'id': entry_id, 'record': record})
+        return entry_id
+
+    def done(self, entry_id):
+        with self._lock:
+            self._write({'id': entry_id, 'done': True})
+
+    def close(self, remove=False):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if remove and os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class Reaper(object):
+    """Deletes the journaled resources in a pool of worker threads.
+
+    A record describes the resources of one set of credentials, as returned
+    by IsolatedCreds._get_cleanup_record. The resources of different records
+    are deleted concurrently, and those of a record in dependency order.
+
+    :param journal: the Journal of the records
+    :param workers: number of worker threads
+    """
+
+    def __init__(self, journal, workers):
+        self.journal = journal
+        self._pool = tasks.TaskPool(workers, name='isolated-creds-reaper')
+        self._lock = threading.Lock()
+        self._pending = []
+
+    def reap(self, provider, records):
+        """Journals the records and submits their deletion.
+
+        :param provider: the IsolatedCreds used to delete the resources
+        :param records: list of records
+        """
+        for record in records:
+            self.submit(provider, self.journal.add(record), record)
+
+    def submit(self, provider, entry_id, record):
+        """Submits the deletion of a record already journaled."""
+        pool = self._pool
+        leaves = []
+        network_task = None
+        subnet_after = []
+        router = record.get('router')
+        if router:
+            interface_task = pool.submit(
+                provider._clear_isolated_router_interface, router['id'],
+                router['subnet_id'], router['name'])
+            leaves.append(pool.submit(
+                lambda _: provider._clear_isolated_router(router['id'],
+                                                          router['name']),
+                after=[interface_task]))
+            subnet_after.append(interface_task)
+        subnet = record.get('subnet')
+        if subnet:
+            subnet_task = pool.submit(
+                lambda *_: provider._clear_isolated_subnet(subnet['id'],
+                                                           subnet['name']),
+                after=subnet_after)
+            subnet_after = [subnet_task]
+            leaves.append(subnet_task)
+        network = record.get('network')
+        if network:
+            network_task = pool.submit(
+                lambda *_: provider._clear_isolated_network(network['id'],
+                                                            network['name']),
+                after=subnet_after)
+            leaves.append(network_task)
+        leaves.append(pool.submit(provider._clear_isolated_user,
+                                  record['user_id'], record['username']))
+        # The default security group of the project is deleted with it,
+        # once the ports of its network are gone
+        leaves.append(pool.submit(
+            lambda *_: provider._clear_isolated_project(
+                record['project_id'], record['project_name']),
+            after=[network_task] if network_task else []))
+        done_task = pool.submit(lambda *_: self.journal.done(entry_id),
+                                after=leaves)
+        with self._lock:
+            self._pending = [(task, pending_record)
+                             for task, pending_record in self._pending
+                             if not task.done() or task.failed()]
+            self._pending.append((done_task, record))
+
+    def wait(self):
+        """Waits for all the deletions and returns the number of failures.
+
+        The journal is removed if all the deletions succeeded.
+        """
+        with self._lock:
+            pending = list(self._pending)
+            self._pending = []
+        failures = 0
+        for task, record in pending:
+            try:
+                task.result()
+            except Exception:
+                failures += 1
+                LOG.exception('Failed to delete the isolated credentials %s',
+                              record)
+        if failures:
+            LOG.warning('%d isolated credentials could not be deleted, run '
+                        'tempest cleanup --journal %s to retry',
+                        failures, self.journal.path)
+        self.journal.close(remove=not failures)
+        return failures
+
+
+def reap_journal(path, provider, workers=None):
+    """Deletes the resources left in a journal.
+
+    Returns the number of records whose deletion failed.
+    """
+    pending = read_journal(path)
+    LOG.info('Deleting the %d isolated credentials left in %s',
+             len(pending), path)
+    journal_reaper = Reaper(Journal(path),
+                            workers or CONF.auth.isolated_creds_reaper_workers)
+    for entry_id, record in pending.items():
+        journal_reaper.submit(provider, entry_id, record)
+    return journal_reaper.wait()
+
+
+_reaper = None
+_reaper_stopped = False
+_reaper_lock = threading.Lock()
+
+
+def get_journal_path():
+    """Returns the journal path of this worker."""
+    return os.path.join(
+        CONF.auth.isolated_creds_journal_dir or tempfile.gettempdir(),
+        'tempest-isolated-creds-%d.journal' % os.getpid())
+
+
+def get_reaper():
+    """Returns the process wide reaper.
+
+    Returns None when the deferred cleanup is disabled, or once the reaper
+    was stopped at exit, the credentials are then deleted synchronously.
+    """
+    global _reaper
+    if not CONF.auth.deferred_isolated_creds_cleanup:
+        return None
+    with _reaper_lock:
+        if _reaper_stopped:
+            return None
+        if _reaper is None:
+            _reaper = Reaper(Journal(get_journal_path()),
+                             CONF.auth.isolated_creds_reaper_workers)
+            atexit.register(stop_reaper)
+    return _reaper
+
+
+def stop_reaper():
+    """Waits for the reaper to complete the deletions."""
+    global _reaper, _reaper_stopped
+    with _reaper_lock:
+        current, _reaper = _reaper, None
+        _reaper_stopped = True
+    if current is not None:
+        current.wait()
@@ -0,0 +1,88 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Cached jsonschema validators of the API responses.
+
+jsonschema.validate checks the schema against the meta-schema and builds a
+new validator on every call. The validators are instead built and checked
+once per distinct schema, on first use, and cached by the JSON dump of the
+schema. The schemas of tempest/api_schema are module level dicts which never
+change, so the validators are also looked up by schema identity first, to
+save the dump. That lookup only keeps up to MAX_SCHEMAS schemas, since some
+clients, like the image v2 ones, fetch an equal schema per instance.
+
+The stress driver can also only validate a sample of the responses, see
+[stress]/response_validation_sample_rate.
+"""
+
+import random
+import threading
+
+import jsonschema
+from oslo_serialization import jsonutils as json
+
+JSONSCHEMA_VALIDATOR = jsonschema.Draft4Validator
+FORMAT_CHECKER = jsonschema.draft4_format_checker
+
+# Schema identities kept by the lookup by identity
+MAX_SCHEMAS = 1000
+
+_validators = {}
+_validators_by_id = {}
+_validators_lock = threading.Lock()
+_sample_rate = 1.0
+
+
+def get_validator(schema, format_checker=FORMAT_CHECKER):
+    """Returns the cached validator of a schema.
+
+    :raises jsonschema.SchemaError: if the schema is invalid
+    """
+    key = (id(schema), format_checker is not None)
+    try:
+        return _validators_by_id[key][1]
+    except KeyError:
+        pass
+    dump_key = (json.dumps(schema, sort_keys=True),
+                format_checker is not None)
+    validator = _validators.get(dump_key)
+    if validator is None:
+        JSONSCHEMA_VALIDATOR.check_schema(schema)
+        validator = JSONSCHEMA_VALIDATOR(schema,
+                                         format_checker=format_checker)
+    with _validators_lock:
+        validator = _validators.setdefault(dump_key, validator)
+        if len(_validators_by_id) >= MAX_SCHEMAS:
+            _validators_by_id.clear()
+        # The schema is kept alongside its validator, so that its id is
+        # not reused by another schema
+        _validators_by_id[key] = (schema, validator)
+    return validator
+
+
+def validate(instance, schema, format_checker=FORMAT_CHECKER):
+    """Validates an instance with the cached validator of the schema.
+
+    :raises jsonschema.ValidationError: if the instance is invalid
+    """
+    get_validator(schema, format_checker).validate(instance)
+
+
+def set_sample_rate(rate):
+    """Sets the fraction of the responses validated by should_validate."""
+    global _sample_rate
+    _sample_rate = rate
+
+
+def should_validate():
+    """Returns whether to validate the current response."""
+    return _sample_rate >= 1.0 or random.random() < _sample_rate
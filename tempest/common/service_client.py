@@ -12,7 +12,17 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import time
+
+import jsonschema
 from tempest_lib.common import rest_client
+from tempest_lib import exceptions as lib_exc
+
+from tempest.common import api_latency
+from tempest.common import cassette
+from tempest.common import governor
+from tempest.common import http_pool
+from tempest.common import response_validation
 
 
 class ServiceClient(rest_client.RestClient):
@@ -37,6 +47,74 @@ class ServiceClient(rest_client.RestClient):
             params.update({'build_timeout': build_timeout})
         super(ServiceClient, self).__init__(auth_provider, service, region,
                                             **params)
+        pool = http_pool.get_pool()
+        if pool is not None:
+            self.http_obj = http_pool.PooledHttp(
+                pool, disable_ssl_certificate_validation=dscv,
+                ca_certs=ca_certs)
+        cassette.install(self, service)
+
+    def raw_request(self, url, method, headers=None, body=None):
+        # Limits and retries the request, see governor
+        gov = governor.get_governor()
+        if gov is None:
+            return self._timed_request(url, method, headers, body)
+        return gov.request(method, url, body, lambda: self._timed_request(
+            url, method, headers, body))
+
+    def _timed_request(self, url, method, headers, body):
+        # Records the latency of the request, see api_latency
+        recorder = api_latency.get_recorder()
+        if recorder is None:
+            return super(ServiceClient, self).raw_request(
+                url, method, headers=headers, body=body)
+        status = 'error'
+        start = time.time()
+        try:
+            resp, resp_body = super(ServiceClient, self).raw_request(
+                url, method, headers=headers, body=body)
+            status = resp.status
+            return resp, resp_body
+        finally:
+            recorder.record(self.service, method, url, status,
+                            time.time() - start)
+
+    @classmethod
+    def validate_response(cls, schema, resp, body):
+        """Validates a response with the cached validators of the schema.
+
+        Same as RestClient.validate_response, only the validators are
+        built once per schema, and only a sample of the response bodies
+        and headers may be validated, see response_validation.
+        """
+        # Only check the response if the status code is a success code
+        if resp.status not in rest_client.HTTP_SUCCESS:
+            return
+        cls.expected_success(schema['status_code'], resp.status)
+        if not response_validation.should_validate():
+            return
+
+        # Check the body of a response
+        body_schema = schema.get('response_body')
+        if body_schema:
+            try:
+                response_validation.validate(body, body_schema)
+            except jsonschema.ValidationError as ex:
+                msg = ("HTTP response body is invalid (%s)") % ex
+                raise lib_exc.InvalidHTTPResponseBody(msg)
+        else:
+            if body:
+                msg = ("HTTP response body should not exist (%s)") % body
+                raise lib_exc.InvalidHTTPResponseBody(msg)
+
+        # Check the header of a response
+        header_schema = schema.get('response_header')
+        if header_schema:
+            try:
+                response_validation.validate(resp, header_schema)
+            except jsonschema.ValidationError as ex:
+                msg = ("HTTP response header is invalid (%s)") % ex
+                raise lib_exc.InvalidHTTPResponseHeader(msg)
 
 
 class ResponseBody(dict):
@@ -0,0 +1,146 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Bounded pool of worker threads running tasks in dependency order.
+
+A task may depend on other tasks: it only runs once they are all done, and
+it is called with their results appended to its arguments. When one of them
+failed the task fails with the same exception without being run. A chain of
+dependent calls can so be submitted at once, and independent chains run
+concurrently.
+
+Tasks are queued in submission order, and a task can only depend on tasks
+submitted before it, so a worker always picks a task whose dependencies are
+done or being run by other workers: a bounded pool cannot deadlock as long
+as the tasks do not wait for other tasks themselves.
+"""
+
+import sys
+import threading
+
+import six
+from six import moves
+from tempest_lib.common.utils import misc as misc_utils
+
+from tempest import exceptions
+
+
+class Task(object):
+    """The pending result of a task submitted to a TaskPool."""
+
+    def __init__(self, func, args, after):
+        self.func = func
+        self.args = args
+        self.after = after
+        self._event = threading.Event()
+        self._result = None
+        self._exc_info = None
+
+    def __repr__(self):
+        return '<Task %s>' % getattr(self.func, '__name__', self.func)
+
+    def done(self):
+        return self._event.is_set()
+
+    def failed(self):
+        return self._exc_info is not None
+
+    def result(self, timeout=None):
+        """Blocks until the task is done and returns its result.
+
+        Raises the exception raised by the task, or TimeoutException if the
+        task is not done within timeout seconds.
+        """
+        if not self._event.wait(timeout):
+            message = '%r not done within %s seconds.' % (self, timeout)
+            caller = misc_utils.find_test_caller()
+            if caller:
+                message = '(%s) %s' % (caller, message)
+            raise exceptions.TimeoutException(message)
+        if self._exc_info is not None:
+            six.reraise(*self._exc_info)
+        return self._result
+
+    def run(self):
+        try:
+            results = tuple(task.result() for task in self.after)
+            self._result = self.func(*(self.args + results))
+        except Exception:
+            self._exc_info = sys.exc_info()
+        self._event.set()
+
+
+class TaskPool(object):
+    """Runs the submitted tasks with at most size daemon worker threads.
+
+    The workers are started on demand and live as long as the process.
+    """
+
+    def __init__(self, size, name='tempest-tasks'):
+        self.size = size
+        self.name = name
+        self._queue = moves.queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+
+    def submit(self, func, *args, **kwargs):
+        """Submits a call of func and returns its Task.
+
+        :param after: keyword only, the tasks to run func after, func is
+                      called with their results appended to args
+        """
+        after = tuple(kwargs.pop('after', ()))
+        if kwargs:
+            raise TypeError('Unexpected arguments %s' % ', '.join(kwargs))
+        task = Task(func, args, after)
+        with self._lock:
+            # Queued under the lock, so that the dependencies of a task are
+            # always ahead of it in the queue
+            self._queue.put(task)
+            if len(self._workers) < self.size:
+                worker = threading.Thread(
+                    target=self._work,
+                    name='%s-%d' % (self.name, len(self._workers)))
+                worker.daemon = True
+                worker.start()
+                self._workers.append(worker)
+        return task
+
+    def shutdown(self):
+        """Stops the workers once the tasks already submitted are done.
+
+        Workers are started again by the next submit.
+        """
+        with self._lock:
+            workers, self._workers = self._workers, []
+            for _ in workers:
+                self._queue.put(None)
+        for worker in workers:
+            worker.join()
+
+    def _work(self):
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            task.run()
+
+
+def wait_all(tasks):
+    """Waits for all the tasks, even when some of them failed.
+
+    Raises the first failure once they are all done, so that no task is
+    left running behind the caller. Returns the list of results otherwise.
+    """
+    for task in tasks:
+        task._event.wait()
+    return [task.result() for task in tasks]
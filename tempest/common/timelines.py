@@ -0,0 +1,109 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Structured state transition timelines recorded by the waiters.
+
+Every wait started by tempest.common.waiters or tempest.common.poller, and
+by the status waiters of the orchestration, volume snapshot and backup, and
+network clients, records a Timeline of the states the resource went
+through, with the number of polls and the time spent in the polling
+requests. The waits for a deletion record DELETED as their last state. The
+waits of tempest_lib, like RestClient.wait_for_resource_deletion, are not
+recorded. The timelines recorded
+since the last call to pop_records() are attached by BaseTestCase to each
+test result as the DETAIL_NAME subunit detail, and
+tempest.cmd.waiter_report aggregates them over a whole run.
+"""
+
+import threading
+import time
+
+DETAIL_NAME = 'waiter-timelines'
+# The state recorded once a resource is deleted
+DELETED = 'DELETED'
+# Bounds the memory used when nothing pops the records, e.g. in the stress
+# runner or javelin
+MAX_RECORDS = 1000
+
+_records = []
+_records_lock = threading.Lock()
+
+
+class Timeline(object):
+    """The timeline of a wait for one resource."""
+
+    def __init__(self, resource_type, resource_id):
+        self.resource_type = resource_type
+        self.resource_id = resource_id
+        self.start_time = time.time()
+        self.end_time = self.start_time
+        self.polls = 0
+        self.request_time = 0.0
+        # List of [seconds since start, status, task state]
+        self.states = []
+
+    def add_poll(self, latency):
+        self.polls += 1
+        self.request_time += latency
+
+    def fetch(self, func, *args, **kwargs):
+        """Calls func to poll the resource, accounting for its latency."""
+        start = time.time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.add_poll(time.time() - start)
+
+    def record(self, status, task_state=None):
+        """Records the state observed by the last poll."""
+        self.end_time = time.time()
+        if not self.states or self.states[-1][1:] != [status, task_state]:
+            self.states.append([round(self.end_time - self.start_time, 3),
+                                status, task_state])
+
+    def to_dict(self):
+        return {'resource_type': self.resource_type,
+                'resource_id': self.resource_id,
+                'start_time': self.start_time,
+                'duration': round(self.end_time - self.start_time, 3),
+                'polls': self.polls,
+                'request_time': round(self.request_time, 3),
+                'states': self.states}
+
+
+def start(resource_type, resource_id):
+    """Starts and returns the timeline of a new wait."""
+    timeline = Timeline(resource_type, resource_id)
+    with _records_lock:
+        _records.append(timeline)
+        del _records[:-MAX_RECORDS]
+    return timeline
+
+
+def pop_records():
+    """Returns the timelines recorded so far as dicts and forgets them."""
+    with _records_lock:
+        records = [timeline.to_dict() for timeline in _records]
+        del _records[:]
+    return records
+
+
+def time_in_states(record):
+    """Yields (state, seconds) for every state left during a recorded wait.
+
+    The state is formatted as status/task state. The last state of the
+    timeline is the one the wait ended on and is not yielded.
+    """
+    states = record['states']
+    for state, next_state in zip(states, states[1:]):
+        offset, status, task_state = state
+        yield '%s/%s' % (status, task_state), next_state[0] - offset
@@ -0,0 +1,199 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""On-disk cache of the Keystone tokens shared across processes.
+
+When [identity]/token_cache_dir is set, the auth providers created by
+tempest.manager.get_auth_provider look up their token in the cache before
+requesting one from Keystone, so that the test workers and the tempest
+commands using the same credentials share their tokens instead of each of
+them authenticating on its own.
+
+Each token is stored in its own file, keyed by a hash of the credentials
+and of the auth URL prefixed by a hash of the username, so that the tokens
+of a deleted user are removed with delete_user. Requesting a new token is
+serialized per key with an external lock, so that concurrent processes
+missing the same entry only request it once.
+"""
+
+import datetime
+import errno
+import glob
+import hashlib
+import os
+import tempfile
+import threading
+
+from oslo_concurrency import lockutils
+from oslo_log import log as logging
+from oslo_serialization import jsonutils as json
+import six
+from tempest_lib import auth
+
+from tempest import config
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+
+class TokenCache(object):
+    """Stores auth data as JSON files in a directory.
+
+    The directory is only accessible to its owner, and the entries are
+    written to a temporary file renamed over the previous one, so that a
+    reader never sees a partially written entry.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            os.makedirs(path, 0o700)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, '%s.json' % key)
+
+    def get(self, key):
+        """Returns the cached (token, auth_data), or None."""
+        try:
+            with open(self._entry_path(key)) as entry_file:
+                entry = json.load(entry_file)
+            return entry['token'], entry['auth_data']
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def set(self, key, auth_data):
+        token, data = auth_data
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix='.%s' % key)
+        try:
+            with os.fdopen(fd, 'w') as entry_file:
+                json.dump({'token': token, 'auth_data': data}, entry_file)
+            os.rename(tmp_path, self._entry_path(key))
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    def delete(self, key):
+        try:
+            os.remove(self._entry_path(key))
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+
+    def delete_user(self, username):
+        """Removes the entries, and their lock files, of a user."""
+        pattern = '*%s-*' % get_user_key(username)
+        for path in glob.glob(os.path.join(self.path, pattern)):
+            try:
+                os.remove(path)
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    raise
+
+    def lock(self, key):
+        """Returns the external lock of an entry."""
+        return lockutils.lock(key, lock_file_prefix='token-', external=True,
+                              lock_path=self.path)
+
+
+def get_user_key(username):
+    """Returns the prefix of the cache keys of a user."""
+    return hashlib.sha256(
+        six.text_type(username).encode('utf-8')).hexdigest()[:16]
+
+
+def get_cache_key(auth_provider_class, auth_url, auth_params, username):
+    """Returns the cache key of the auth parameters of a provider."""
+    key = json.dumps([auth_provider_class.__name__, auth_url,
+                      sorted(auth_params.items())])
+    return '%s-%s' % (get_user_key(username),
+                      hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+
+_token_caches = {}
+_token_caches_lock = threading.Lock()
+
+
+def get_token_cache():
+    """Returns the TokenCache of [identity]/token_cache_dir, or None."""
+    path = CONF.identity.token_cache_dir
+    if not path:
+        return None
+    with _token_caches_lock:
+        if path not in _token_caches:
+            _token_caches[path] = TokenCache(path)
+        return _token_caches[path]
+
+
+class CachedAuthProviderMixin(object):
+    """Gets the tokens of a KeystoneAuthProvider through the TokenCache."""
+
+    def __init__(self, credentials, auth_url, **kwargs):
+        super(CachedAuthProviderMixin, self).__init__(credentials, auth_url,
+                                                      **kwargs)
+        self.token_cache = get_token_cache()
+        self.token_expiry_threshold = datetime.timedelta(
+            seconds=CONF.identity.token_cache_expiry_margin)
+        # Computed once, as the credentials are filled in after the first
+        # authentication
+        self.cache_key = get_cache_key(type(self), auth_url,
+                                       self._auth_params(),
+                                       self.credentials.username)
+
+    def _get_cached_auth(self):
+        auth_data = self.token_cache.get(self.cache_key)
+        if auth_data is not None and not self.is_expired(auth_data):
+            return auth_data
+        return None
+
+    def _store_auth(self):
+        auth_data = self._get_auth()
+        self.token_cache.set(self.cache_key, auth_data)
+        return auth_data
+
+    def get_auth(self):
+        """Returns auth from memory or from disk, else auth first."""
+        if self.cache is None or self.is_expired(self.cache):
+            auth_data = self._get_cached_auth()
+            if auth_data is None:
+                with self.token_cache.lock(self.cache_key):
+                    # Another process may have stored a token meanwhile
+                    auth_data = self._get_cached_auth()
+                    if auth_data is None:
+                        LOG.debug('Token cache miss for %s', self.credentials)
+                        auth_data = self._store_auth()
+            self.cache = auth_data
+            self._fill_credentials(self.cache[1])
+        return self.cache
+
+    def set_auth(self):
+        """Forces setting auth, and replaces the token on disk."""
+        with self.token_cache.lock(self.cache_key):
+            self.cache = self._store_auth()
+        self._fill_credentials(self.cache[1])
+
+    def clear_auth(self):
+        """Clears the token from memory and from disk."""
+        super(CachedAuthProviderMixin, self).clear_auth()
+        self.token_cache.delete(self.cache_key)
+
+
+class CachedKeystoneV2AuthProvider(CachedAuthProviderMixin,
+                                   auth.KeystoneV2AuthProvider):
+    pass
+
+
+class CachedKeystoneV3AuthProvider(CachedAuthProviderMixin,
+                                   auth.KeystoneV3AuthProvider):
+    pass
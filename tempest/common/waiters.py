@@ -11,11 +11,14 @@
 #    under the License.
 
 
+import random
 import time
 
 from oslo_log import log as logging
+import six
 from tempest_lib.common.utils import misc as misc_utils
 
+from tempest.common import timelines
 from tempest import config
 from tempest import exceptions
 
@@ -23,6 +26,90 @@ CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
 
+class FixedIntervalPolicy(object):
+    """Polling policy sleeping a fixed interval between polls.
+
+    A polling policy is created when a wait starts and its sleep() method
+    is called between two polls of the resource.
+    """
+
+    def __init__(self, interval, timeout=None):
+        self.interval = interval
+        self.timeout = timeout
+        self.start_time = time.time()
+        self.polls = 0
+
+    def next_interval(self):
+        return self.interval
+
+    def tick(self):
+        """Accounts for a poll and returns the time until the next one."""
+        interval = self.next_interval()
+        self.polls += 1
+        return interval
+
+    def sleep(self):
+        time.sleep(self.tick())
+
+
+class BackoffPolicy(FixedIntervalPolicy):
+    """Polling policy with fast initial probes and exponential backoff.
+
+    The first fast_probes polls are done every initial_interval seconds,
+    after that the interval grows by backoff_factor from the base interval
+    up to max_interval. A random jitter is applied to every interval and
+    no sleep goes past the deadline given by the timeout, so that the last
+    poll happens right when the wait would time out.
+    """
+
+    def __init__(self, interval, timeout=None, fast_probes=None,
+                 initial_interval=None, backoff_factor=None,
+                 max_interval=None, jitter=None):
+        super(BackoffPolicy, self).__init__(interval, timeout=timeout)
+        self.fast_probes = (CONF.waiter.fast_probes if fast_probes is None
+                            else fast_probes)
+        self.initial_interval = (CONF.waiter.initial_interval
+                                 if initial_interval is None
+                                 else initial_interval)
+        self.backoff_factor = (CONF.waiter.backoff_factor
+                               if backoff_factor is None else backoff_factor)
+        self.max_interval = (CONF.waiter.max_interval if max_interval is None
+                             else max_interval)
+        self.jitter = CONF.waiter.jitter if jitter is None else jitter
+
+    def next_interval(self):
+        if self.polls < self.fast_probes:
+            interval = self.initial_interval
+        else:
+            exponent = self.polls - self.fast_probes
+            interval = min(self.interval * self.backoff_factor ** exponent,
+                           self.max_interval)
+        interval *= 1 + random.uniform(-self.jitter, self.jitter)
+        if self.timeout is not None:
+            remaining = self.start_time + self.timeout - time.time()
+            interval = min(interval, remaining)
+        return max(interval, 0)
+
+
+POLLING_POLICIES = {
+    'fixed': FixedIntervalPolicy,
+    'backoff': BackoffPolicy,
+}
+
+
+def get_polling_policy(client, timeout=None):
+    """Returns the configured polling policy for a new wait.
+
+    The client should have build_interval and build_timeout attributes,
+    build_interval is the base interval between polls and build_timeout
+    is used as deadline unless an explicit timeout is given.
+    """
+    if timeout is None:
+        timeout = getattr(client, 'build_timeout', None)
+    policy_class = POLLING_POLICIES[CONF.waiter.polling_policy]
+    return policy_class(client.build_interval, timeout=timeout)
+
+
 # NOTE(afazekas): This function needs to know a token and a subject.
 def wait_for_server_status(client, server_id, status, ready_wait=True,
                            extra_timeout=0, raise_on_error=True):
@@ -33,11 +120,14 @@ def wait_for_server_status(client, server_id, status, ready_wait=True,
 
     # NOTE(afazekas): UNKNOWN status possible on ERROR
     # or in a very early stage.
-    body = client.show_server(server_id)
+    timeline = timelines.start('server', server_id)
+    body = timeline.fetch(client.show_server, server_id)
     old_status = server_status = body['status']
     old_task_state = task_state = _get_task_state(body)
+    timeline.record(server_status, task_state)
     start_time = int(time.time())
     timeout = client.build_timeout + extra_timeout
+    poller = get_polling_policy(client, timeout)
     while True:
         # NOTE(afazekas): Now the BUILD status only reached
         # between the UNKNOWN->ACTIVE transition.
@@ -59,10 +149,11 @@ def wait_for_server_status(client, server_id, status, ready_wait=True,
             else:
                 return
 
-        time.sleep(client.build_interval)
-        body = client.show_server(server_id)
+        poller.sleep()
+        body = timeline.fetch(client.show_server, server_id)
         server_status = body['status']
         task_state = _get_task_state(body)
+        timeline.record(server_status, task_state)
         if (server_status != old_status) or (task_state != old_task_state):
             LOG.info('State transition "%s" ==> "%s" after %d second wait',
                      '/'.join((old_status, str(old_task_state))),
@@ -96,19 +187,112 @@ def wait_for_server_status(client, server_id, status, ready_wait=True,
         old_task_state = task_state
 
 
+def wait_for_servers_status(client, server_ids, status, ready_wait=True,
+                            extra_timeout=0, raise_on_error=True, **params):
+    """Waits for a set of servers to reach a given status.
+
+    Instead of polling every server with show_server this issues a single
+    list_servers(detail=True) call per build_interval and tracks all the
+    servers from it. Extra keyword arguments (e.g. name or changes-since)
+    are passed as filters to list_servers to keep the listing small.
+    """
+
+    def _get_task_state(body):
+        return body.get('OS-EXT-STS:task_state', None)
+
+    def _is_done(server_status, task_state):
+        # NOTE(afazekas): Now the BUILD status only reached
+        # between the UNKNOWN->ACTIVE transition.
+        if status == 'BUILD':
+            return server_status != 'UNKNOWN'
+        if server_status != status:
+            return False
+        return not ready_wait or str(task_state) == "None"
+
+    def _list_servers():
+        start = time.time()
+        body = client.list_servers(detail=True, **params)
+        latency = time.time() - start
+        for server_id in pending:
+            server_timelines[server_id].add_poll(latency)
+        return dict((server['id'], server) for server in body['servers']
+                    if server['id'] in pending)
+
+    pending = set(server_ids)
+    server_timelines = dict((server_id, timelines.start('server', server_id))
+                            for server_id in server_ids)
+    old_states = {}
+    start_time = int(time.time())
+    timeout = client.build_timeout + extra_timeout
+    poller = get_polling_policy(client, timeout)
+    while True:
+        for server_id, body in six.iteritems(_list_servers()):
+            server_status = body['status']
+            task_state = _get_task_state(body)
+            server_timelines[server_id].record(server_status, task_state)
+            old_state = old_states.get(server_id)
+            if old_state and old_state != (server_status, task_state):
+                LOG.info('Server %s state transition "%s" ==> "%s" after %d '
+                         'second wait', server_id,
+                         '/'.join((old_state[0], str(old_state[1]))),
+                         '/'.join((server_status, str(task_state))),
+                         time.time() - start_time)
+            old_states[server_id] = (server_status, task_state)
+            if (server_status == 'ERROR') and raise_on_error:
+                if 'fault' in body:
+                    raise exceptions.BuildErrorException(body['fault'],
+                                                         server_id=server_id)
+                else:
+                    raise exceptions.BuildErrorException(server_id=server_id)
+            if _is_done(server_status, task_state):
+                pending.discard(server_id)
+
+        if not pending:
+            if ready_wait and status != 'BUILD':
+                # without state api extension 3 sec usually enough
+                time.sleep(CONF.compute.ready_wait)
+            return
+
+        timed_out = int(time.time()) - start_time >= timeout
+
+        if timed_out:
+            expected_task_state = 'None' if ready_wait else 'n/a'
+            message = ('Servers %(server_ids)s failed to reach %(status)s '
+                       'status and task state "%(expected_task_state)s" '
+                       'within the required time (%(timeout)s s).' %
+                       {'server_ids': ', '.join(sorted(pending)),
+                        'status': status,
+                        'expected_task_state': expected_task_state,
+                        'timeout': timeout})
+            current = ['%s: %s/%s' % ((server_id,) +
+                                      old_states.get(server_id,
+                                                     ('UNKNOWN', None)))
+                       for server_id in sorted(pending)]
+            message += ' Current status/task state: %s.' % ', '.join(current)
+            caller = misc_utils.find_test_caller()
+            if caller:
+                message = '(%s) %s' % (caller, message)
+            raise exceptions.TimeoutException(message)
+        poller.sleep()
+
+
 def wait_for_image_status(client, image_id, status):
     """Waits for an image to reach a given status.
 
     The client should have a show_image(image_id) method to get the image.
     The client should also have build_interval and build_timeout attributes.
     """
-    image = client.show_image(image_id)
+    timeline = timelines.start('image', image_id)
+    image = timeline.fetch(client.show_image, image_id)
+    timeline.record(image['status'])
     start = int(time.time())
+    poller = get_polling_policy(client)
 
     while image['status'] != status:
-        time.sleep(client.build_interval)
-        image = client.show_image(image_id)
+        poller.sleep()
+        image = timeline.fetch(client.show_image, image_id)
         status_curr = image['status']
+        timeline.record(status_curr)
         if status_curr == 'ERROR':
             raise exceptions.AddImageException(image_id=image_id)
 
@@ -134,14 +318,18 @@ def wait_for_image_status(client, image_id, status):
 
 def wait_for_volume_status(client, volume_id, status):
     """Waits for a Volume to reach a given status."""
-    body = client.show_volume(volume_id)
+    timeline = timelines.start('volume', volume_id)
+    body = timeline.fetch(client.show_volume, volume_id)
     volume_status = body['status']
+    timeline.record(volume_status)
     start = int(time.time())
+    poller = get_polling_policy(client)
 
     while volume_status != status:
-        time.sleep(client.build_interval)
-        body = client.show_volume(volume_id)
+        poller.sleep()
+        body = timeline.fetch(client.show_volume, volume_id)
         volume_status = body['status']
+        timeline.record(volume_status)
         if volume_status == 'error':
             raise exceptions.VolumeBuildErrorException(volume_id=volume_id)
         if volume_status == 'error_restoring':
@@ -160,13 +348,17 @@ def wait_for_bm_node_status(client, node_id, attr, status):
 
     The client should have a show_node(node_uuid) method to get the node.
     """
-    _, node = client.show_node(node_id)
+    timeline = timelines.start('baremetal-node', node_id)
+    _, node = timeline.fetch(client.show_node, node_id)
+    timeline.record(node[attr])
     start = int(time.time())
+    poller = get_polling_policy(client)
 
     while node[attr] != status:
-        time.sleep(client.build_interval)
-        _, node = client.show_node(node_id)
+        poller.sleep()
+        _, node = timeline.fetch(client.show_node, node_id)
         status_curr = node[attr]
+        timeline.record(status_curr)
         if status_curr == status:
             return
 
@@ -64,6 +64,21 @@ AuthGroup = [
                                                    group='compute'),
                                  cfg.DeprecatedOpt('allow_tenant_isolation',
                                                    group='orchestration')]),
+    cfg.StrOpt('test_accounts_allocator',
+               default='files',
+               choices=['files', 'database'],
+               help="How the workers allocate the accounts of the "
+                    "test_accounts_file between them. 'files' creates a "
+                    "lock file per account in use under a global lock. "
+                    "'database' claims them in a sqlite database in the "
+                    "lock path, waits for an account to be freed when all "
+                    "are in use, and reclaims the accounts of dead "
+                    "workers."),
+    cfg.IntOpt('test_accounts_wait_timeout',
+               default=300,
+               help="Time in seconds to wait for a matching account to be "
+                    "freed when all of them are in use, with the "
+                    "'database' allocator."),
     cfg.ListOpt('tempest_roles',
                 help="Roles to assign to all users created by tempest",
                 default=[]),
@@ -82,6 +97,41 @@ AuthGroup = [
                      "creates. However in some neutron configurations, like "
                      "with VLAN provider networks, this doesn't work. So if "
                      "set to False the isolated networks will not be created"),
+    cfg.IntOpt('isolated_creds_pool_size',
+               default=0,
+               help="Number of non admin isolated credentials, with their "
+                    "network resources, that each test worker provisions "
+                    "ahead of demand in a background thread. Credentials "
+                    "are then handed out to the test classes as primary or "
+                    "alt credentials, renamed after the test class, and the "
+                    "pool is refilled asynchronously. 0 disables the "
+                    "pool."),
+    cfg.IntOpt('isolated_creds_workers',
+               default=0,
+               help="Number of threads creating the isolated credentials "
+                    "and network resources concurrently, as far as their "
+                    "dependencies allow, instead of one request at a time. "
+                    "The primary, alt and admin credentials of a test class "
+                    "are then also created concurrently. 0 creates them "
+                    "sequentially."),
+    cfg.BoolOpt('deferred_isolated_creds_cleanup',
+                default=False,
+                help="Hand the isolated credentials and their network "
+                     "resources over to a background reaper at the end of "
+                     "each test class, instead of deleting them in "
+                     "tearDownClass. The reaper deletes them concurrently "
+                     "and waits for all the deletions when the test worker "
+                     "exits. The resources handed over are written to a "
+                     "journal file, which can be passed to tempest cleanup "
+                     "--journal if the worker died."),
+    cfg.IntOpt('isolated_creds_reaper_workers',
+               default=4,
+               help="Number of threads of the reaper deleting the isolated "
+                    "credentials when the deferred cleanup is enabled."),
+    cfg.StrOpt('isolated_creds_journal_dir',
+               help="Directory of the journal files of the isolated "
+                    "credentials reaper, one per test worker. Defaults to "
+                    "the system temporary directory."),
 ]
 
 identity_group = cfg.OptGroup(name='identity',
@@ -176,6 +226,18 @@ IdentityGroup = [
     cfg.StrOpt('default_domain_id',
                default='default',
                help="ID of the default domain"),
+    cfg.StrOpt('token_cache_dir',
+               default=None,
+               help="Directory where the tokens issued by Keystone are "
+                    "cached, so that they are shared by the auth providers "
+                    "of all the test workers and tempest commands using "
+                    "the same credentials. Each token is stored in a file "
+                    "readable only by its owner. The cache is disabled if "
+                    "not set."),
+    cfg.IntOpt('token_cache_expiry_margin',
+               default=300,
+               help="Cached tokens expiring within this number of seconds "
+                    "are not used, and a new token is requested instead."),
 ]
 
 identity_feature_group = cfg.OptGroup(name='identity-feature-enabled',
@@ -473,7 +535,11 @@ ImageGroup = [
     cfg.IntOpt('build_interval',
                default=1,
                help="Time in seconds between image operation status "
-                    "checks.")
+                    "checks."),
+    cfg.IntOpt('http_chunk_size',
+               default=65536,
+               help="Size in bytes of the chunks the image data is sent "
+                    "and read in by the image HTTP client."),
 ]
 
 image_feature_group = cfg.OptGroup(name='image-feature-enabled',
@@ -783,6 +849,10 @@ ObjectStoreGroup = [
                help="One name of cluster which is set in the realm whose name "
                     "is set in 'realm_name' item in this file. Set the "
                     "same cluster name as Swift's container-sync-realms.conf"),
+    cfg.IntOpt('large_object_workers',
+               default=4,
+               help="Number of segments the large object helper uploads, "
+                    "or of ranges it downloads, concurrently."),
 ]
 
 object_storage_feature_group = cfg.OptGroup(
@@ -1000,9 +1070,28 @@ StressGroup = [
     cfg.IntOpt('log_check_interval',
                default=60,
                help='time (in seconds) between log file error checks.'),
+    cfg.ListOpt('log_error_patterns',
+                default=['ERROR', 'TRACE'],
+                help='Extended regular expressions of the log lines '
+                     'reported as errors by the log file checks.'),
+    cfg.IntOpt('log_check_workers',
+               default=16,
+               help='Number of nodes whose log files are checked '
+                    'concurrently, each over an SSH connection kept open '
+                    'between the checks.'),
     cfg.IntOpt('default_thread_number_per_action',
                default=4,
                help='The number of threads created while stress test.'),
+    cfg.IntOpt('virtual_user_processes',
+               default=4,
+               help='Number of worker processes the virtual users of an '
+                    'action are spread over, unless set by its "processes".'),
+    cfg.StrOpt('virtual_user_backend',
+               default='thread',
+               choices=['thread', 'green'],
+               help='Whether the virtual users of a worker process are '
+                    'native threads, or green threads, which requires '
+                    'eventlet to be installed.'),
     cfg.BoolOpt('leave_dirty_stack',
                 default=False,
                 help='Prevent the cleaning (tearDownClass()) between'
@@ -1012,7 +1101,37 @@ StressGroup = [
                 default=False,
                 help='Allows a full cleaning process after a stress test.'
                      ' Caution : this cleanup will remove every objects of'
-                     ' every tenant.')
+                     ' every tenant.'),
+    cfg.FloatOpt('response_validation_sample_rate',
+                 default=1.0,
+                 help='Fraction of the API responses whose body and headers '
+                      'are validated against their schema during a stress '
+                      'test, between 0 and 1. The status codes are always '
+                      'checked.'),
+    cfg.IntOpt('sample_interval',
+               default=10,
+               help='time (in seconds) between two samples of the offered '
+                    'and achieved rates, error rate and queueing delay of '
+                    'the actions run in open loop, and of the metrics '
+                    'exported to the metrics_file and metrics_address.'),
+    cfg.StrOpt('metrics_file',
+               help='File the throughput, error count and latency '
+                    'percentiles of each action are appended to every '
+                    'sample_interval, as CSV if its name ends with .csv, '
+                    'else as JSON lines. Not written if unset.'),
+    cfg.StrOpt('metrics_address',
+               help='host:port of a StatsD (UDP) or Graphite (TCP) '
+                    'server the metrics are also sent to. Not sent if '
+                    'unset.'),
+    cfg.StrOpt('metrics_protocol',
+               default='statsd',
+               choices=['statsd', 'graphite'],
+               help='Line protocol of the metrics sent to the '
+                    'metrics_address.'),
+    cfg.StrOpt('metrics_prefix',
+               default='tempest.stress',
+               help='Prefix of the names of the metrics sent to the '
+                    'metrics_address.'),
 ]
 
 
@@ -1129,6 +1248,114 @@ specify .* as the regex.
 """)
 ]
 
+waiter_group = cfg.OptGroup(name="waiter",
+                            title="Resource status waiter options")
+
+WaiterGroup = [
+    cfg.StrOpt('polling_policy',
+               default='fixed',
+               choices=['fixed', 'backoff'],
+               help="Policy used by the status waiters to space out their "
+                    "polls. 'fixed' sleeps the client build_interval between "
+                    "each poll. 'backoff' starts with a few fast probes and "
+                    "then backs off exponentially, with jitter, from the "
+                    "client build_interval up to max_interval, never "
+                    "sleeping past the wait deadline."),
+    cfg.IntOpt('fast_probes',
+               default=3,
+               help="Number of polls done at initial_interval before "
+                    "backing off. Only used by the 'backoff' policy."),
+    cfg.FloatOpt('initial_interval',
+                 default=0.5,
+                 help="Seconds between the fast initial probes. Only used "
+                      "by the 'backoff' policy."),
+    cfg.FloatOpt('backoff_factor',
+                 default=2.0,
+                 help="Multiplier applied to the polling interval after "
+                      "each poll. Only used by the 'backoff' policy."),
+    cfg.FloatOpt('max_interval',
+                 default=10.0,
+                 help="Upper bound, in seconds, of the polling interval. "
+                      "Only used by the 'backoff' policy."),
+    cfg.FloatOpt('jitter',
+                 default=0.1,
+                 help="Fraction of random jitter applied to each polling "
+                      "interval, to avoid concurrent waiters polling in "
+                      "lockstep. Only used by the 'backoff' policy."),
+    cfg.BoolOpt('record_timelines',
+                default=True,
+                help="Attach the timelines of the resource states observed "
+                     "by the waiters to each test result as a subunit "
+                     "detail, they can be aggregated over a run with "
+                     "tempest-waiter-report."),
+]
+
+http_group = cfg.OptGroup(name="http",
+                          title="HTTP client options")
+
+HttpGroup = [
+    cfg.BoolOpt('connection_pool',
+                default=False,
+                help="Keep the connections of the service clients and of "
+                     "the image HTTP client open after each request, in a "
+                     "pool shared by all the clients of a process, instead "
+                     "of opening a new connection, and doing a new TLS "
+                     "handshake, for every request."),
+    cfg.IntOpt('max_idle_connections',
+               default=10,
+               help="Maximum number of idle connections kept open per "
+                    "endpoint and TLS settings by the connection pool, the "
+                    "connections beyond it are closed once used."),
+    cfg.StrOpt('latency_stats_dir',
+               default=None,
+               help="Directory where each worker process writes, at exit, "
+                    "the latency histograms of the REST, image and boto "
+                    "calls it made, per service, method, URL template and "
+                    "status. The files are merged and reported by "
+                    "tempest-latency-report. Not recorded if unset."),
+    cfg.StrOpt('cassette_mode',
+               default=None,
+               choices=['record', 'replay'],
+               help="Either record the requests of the clients and their "
+                    "responses to the cassette file, or replay the recorded "
+                    "responses instead of sending the requests, to run the "
+                    "tests offline. Neither if unset."),
+    cfg.StrOpt('cassette_path',
+               default=None,
+               help="Cassette file the responses are recorded to, or "
+                    "replayed from."),
+    cfg.BoolOpt('cassette_replay_latency',
+                default=False,
+                help="Wait for the recorded latency of the responses when "
+                     "replaying them, rather than returning them "
+                     "immediately."),
+    cfg.IntOpt('max_in_flight_per_endpoint',
+               default=0,
+               help="Maximum number of requests the service clients of a "
+                    "process send concurrently to an endpoint, the others "
+                    "wait for one of them to complete. Unlimited if 0."),
+    cfg.FloatOpt('max_requests_per_second',
+                 default=0.0,
+                 help="Maximum number of requests per second the service "
+                      "clients of a process send to an endpoint, the "
+                      "requests beyond it are delayed. Unlimited if 0."),
+    cfg.IntOpt('overload_retries',
+               default=0,
+               help="Number of times the service clients retry an "
+                    "idempotent request which got a 429 or 503 response, "
+                    "after its Retry-After delay, or else after a "
+                    "jittered exponential backoff."),
+    cfg.FloatOpt('overload_backoff',
+                 default=1.0,
+                 help="Initial backoff in seconds of the overload retries, "
+                      "doubled at each retry. Every delay is drawn at "
+                      "random between 0 and the backoff."),
+    cfg.FloatOpt('max_overload_backoff',
+                 default=60.0,
+                 help="Maximum backoff in seconds of the overload retries, "
+                      "and maximum Retry-After delay honored."),
+]
+
 input_scenario_group = cfg.OptGroup(name="input-scenario",
                                     title="Filters and values for"
                                           " input scenarios")
@@ -1240,6 +1467,8 @@ _opts = [
     (scenario_group, ScenarioGroup),
     (service_available_group, ServiceAvailableGroup),
     (debug_group, DebugGroup),
+    (waiter_group, WaiterGroup),
+    (http_group, HttpGroup),
     (baremetal_group, BaremetalGroup),
     (input_scenario_group, InputScenarioGroup),
     (negative_group, NegativeGroup),
@@ -1312,6 +1541,8 @@ class TempestConfigPrivate(object):
         self.scenario = _CONF.scenario
         self.service_available = _CONF.service_available
         self.debug = _CONF.debug
+        self.waiter = _CONF.waiter
+        self.http = _CONF.http
         self.baremetal = _CONF.baremetal
         self.input_scenario = _CONF['input-scenario']
         self.negative = _CONF.negative
@@ -140,6 +140,16 @@ class TearDownException(TempestException):
     message = "%(num)d cleanUp operation failed"
 
 
+class ChecksumMismatch(TempestException):
+    message = ("Checksum of %(name)s is %(actual)s instead of "
+               "%(expected)s")
+
+
+class CassetteMiss(TempestException):
+    message = ("No %(method)s %(url)s request of the %(service)s service "
+               "recorded in the cassette for %(test)s")
+
+
 class RFCViolation(RestClientException):
     message = "RFC Violation"
 
@@ -15,7 +15,9 @@
 
 from tempest_lib import auth
 
+from tempest.common import cassette
 from tempest.common import cred_provider
+from tempest.common import token_cache
 from tempest import config
 from tempest import exceptions
 
@@ -60,9 +62,16 @@ class Manager(object):
 
 
 def get_auth_provider_class(credentials):
+    # The tokens are shared through the token cache when it is enabled
+    cached = CONF.identity.token_cache_dir
     if isinstance(credentials, auth.KeystoneV3Credentials):
+        if cached:
+            return (token_cache.CachedKeystoneV3AuthProvider,
+                    CONF.identity.uri_v3)
         return auth.KeystoneV3AuthProvider, CONF.identity.uri_v3
     else:
+        if cached:
+            return token_cache.CachedKeystoneV2AuthProvider, CONF.identity.uri
         return auth.KeystoneV2AuthProvider, CONF.identity.uri
 
 
@@ -78,4 +87,7 @@ def get_auth_provider(credentials):
             'Credentials must be specified')
     auth_provider_class, auth_url = get_auth_provider_class(
         credentials)
-    return auth_provider_class(credentials, auth_url, **default_params)
+    auth_provider = auth_provider_class(credentials, auth_url,
+                                        **default_params)
+    cassette.install(auth_provider.auth_client, 'identity')
+    return auth_provider
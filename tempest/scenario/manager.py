@@ -15,6 +15,7 @@
 #    under the License.
 
 import subprocess
+import time
 
 import netaddr
 from oslo_log import log
@@ -23,6 +24,7 @@ from tempest_lib.common.utils import misc as misc_utils
 from tempest_lib import exceptions as lib_exc
 
 from tempest.common import fixed_network
+from tempest.common import poller
 from tempest.common.utils import data_utils
 from tempest.common.utils.linux import remote_client
 from tempest.common import waiters
@@ -96,7 +98,7 @@ class ScenarioTest(tempest.test.BaseTestCase):
 
     def addCleanup_with_wait(self, waiter_callable, thing_id, thing_id_param,
                              cleanup_callable, cleanup_args=None,
-                             cleanup_kwargs=None):
+                             cleanup_kwargs=None, resource_type=None):
         """Adds wait for async resource deletion at the end of cleanups
 
         @param waiter_callable: callable to wait for the resource to delete
@@ -105,16 +107,27 @@ class ScenarioTest(tempest.test.BaseTestCase):
         @param cleanup_callable: method to load pass to self.addCleanup with
             the following *cleanup_args, **cleanup_kwargs.
             usually a delete method.
+        @param resource_type: when set to one of the resource types known
+            by tempest.common.poller, the deletion is waited for through the
+            shared poller, concurrently with the other deletions, using the
+            client waiter_callable is bound to.
         """
         if cleanup_args is None:
             cleanup_args = []
         if cleanup_kwargs is None:
             cleanup_kwargs = {}
         self.addCleanup(cleanup_callable, *cleanup_args, **cleanup_kwargs)
-        wait_dict = {
-            'waiter_callable': waiter_callable,
-            thing_id_param: thing_id
-        }
+        if resource_type is None:
+            wait_dict = {
+                'waiter_callable': waiter_callable,
+                thing_id_param: thing_id
+            }
+        else:
+            wait_dict = {
+                'waiter_callable': waiter_callable,
+                'resource_type': resource_type,
+                'resource_id': thing_id
+            }
         self.cleanup_waits.append(wait_dict)
 
     def _wait_for_cleanups(self):
@@ -125,10 +138,41 @@ class ScenarioTest(tempest.test.BaseTestCase):
         successful. This is the same basic approach used in the api tests to
         limit cleanup execution time except here it is multi-resource,
         because of the nature of the scenario tests.
+
+        The waits which can be served by the shared poller are registered
+        first, so that they all progress concurrently while the other waits
+        are run.
         """
+        futures = []
+        other_waits = []
         for wait in self.cleanup_waits:
             waiter_callable = wait.pop('waiter_callable')
+            if 'resource_type' in wait:
+                futures.append(poller.get_poller().wait_for(
+                    six.get_method_self(waiter_callable),
+                    wait['resource_type'], wait['resource_id'],
+                    poller.DELETED))
+            else:
+                other_waits.append((waiter_callable, wait))
+        for waiter_callable, wait in other_waits:
             waiter_callable(**wait)
+        if futures:
+            poller.wait_for_all(futures, max(future.remaining()
+                                             for future in futures))
+
+    def _wait_for_status(self, client, resource_type, resource_id, status):
+        """Waits for a resource to reach a status through the shared poller.
+
+        The list calls of the poller are shared with the other waits of the
+        process, like the pending cleanup waits. Returns the resource.
+        """
+        future = poller.get_poller().wait_for(client, resource_type,
+                                              resource_id, status)
+        body = future.result(future.remaining())
+        if resource_type == 'server':
+            # As wait_for_server_status, once no task is in progress
+            time.sleep(CONF.compute.ready_wait)
+        return body
 
     # ## Test functions library
     #
@@ -178,11 +222,11 @@ class ScenarioTest(tempest.test.BaseTestCase):
             waiter_callable=self.servers_client.wait_for_server_termination,
             thing_id=server['id'], thing_id_param='server_id',
             cleanup_callable=self.delete_wrapper,
-            cleanup_args=[self.servers_client.delete_server, server['id']])
+            cleanup_args=[self.servers_client.delete_server, server['id']],
+            resource_type='server')
         if wait_on_boot:
-            waiters.wait_for_server_status(self.servers_client,
-                                           server_id=server['id'],
-                                           status='ACTIVE')
+            self._wait_for_status(self.servers_client, 'server',
+                                  server['id'], 'ACTIVE')
         # The instance retrieved on creation is missing network
         # details, necessitating retrieval after it becomes active to
         # ensure correct details.
@@ -208,10 +252,12 @@ class ScenarioTest(tempest.test.BaseTestCase):
                 waiter_callable=self.volumes_client.wait_for_resource_deletion,
                 thing_id=volume['id'], thing_id_param='id',
                 cleanup_callable=self.delete_wrapper,
-                cleanup_args=[self.volumes_client.delete_volume, volume['id']])
+                cleanup_args=[self.volumes_client.delete_volume, volume['id']],
+                resource_type='volume')
 
         self.assertEqual(name, volume['display_name'])
-        self.volumes_client.wait_for_volume_status(volume['id'], 'available')
+        self._wait_for_status(self.volumes_client, 'volume', volume['id'],
+                              'available')
         # The volume retrieved on creation has a non-up-to-date status.
         # Retrieval after it becomes active ensures correct details.
         volume = self.volumes_client.show_volume(volume['id'])
@@ -409,7 +455,8 @@ class ScenarioTest(tempest.test.BaseTestCase):
             waiter_callable=_image_client.wait_for_resource_deletion,
             thing_id=image_id, thing_id_param='id',
             cleanup_callable=self.delete_wrapper,
-            cleanup_args=[_image_client.delete_image, image_id])
+            cleanup_args=[_image_client.delete_image, image_id],
+            resource_type='image')
         snapshot_image = _image_client.get_image_meta(image_id)
         image_name = snapshot_image['name']
         self.assertEqual(name, image_name)
@@ -422,14 +469,15 @@ class ScenarioTest(tempest.test.BaseTestCase):
             self.server['id'], self.volume['id'], '/dev/%s'
             % CONF.compute.volume_device_name)
         self.assertEqual(self.volume['id'], volume['id'])
-        self.volumes_client.wait_for_volume_status(volume['id'], 'in-use')
+        self._wait_for_status(self.volumes_client, 'volume', volume['id'],
+                              'in-use')
         # Refresh the volume after the attachment
         self.volume = self.volumes_client.show_volume(volume['id'])
 
     def nova_volume_detach(self):
         self.servers_client.detach_volume(self.server['id'], self.volume['id'])
-        self.volumes_client.wait_for_volume_status(self.volume['id'],
-                                                   'available')
+        self._wait_for_status(self.volumes_client, 'volume',
+                              self.volume['id'], 'available')
 
         volume = self.volumes_client.show_volume(self.volume['id'])
         self.assertEqual('available', volume['status'])
@@ -448,8 +496,8 @@ class ScenarioTest(tempest.test.BaseTestCase):
                                     preserve_ephemeral=preserve_ephemeral,
                                     **rebuild_kwargs)
         if wait:
-            waiters.wait_for_server_status(self.servers_client,
-                                           server_id, 'ACTIVE')
+            self._wait_for_status(self.servers_client, 'server', server_id,
+                                  'ACTIVE')
 
     def ping_ip_address(self, ip_address, should_succeed=True,
                         ping_timeout=None):
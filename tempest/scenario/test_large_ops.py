@@ -73,12 +73,13 @@ class TestLargeOpsScenario(manager.ScenarioTest):
     def addCleanupClass(cls, function, *arguments, **keywordArguments):
         cls._cleanup_resources.append((function, arguments, keywordArguments))
 
-    def _wait_for_server_status(self, status):
-        for server in self.servers:
-            # Make sure nova list keeps working throughout the build process
-            self.servers_client.list_servers()
-            waiters.wait_for_server_status(self.servers_client,
-                                           server['id'], status)
+    def _wait_for_server_status(self, status, name):
+        # The batched waiter polls with nova list, which also makes sure
+        # nova list keeps working throughout the build process
+        waiters.wait_for_servers_status(self.servers_client,
+                                        [server['id']
+                                         for server in self.servers],
+                                        status, name=name)
 
     def nova_boot(self):
         name = data_utils.rand_name('scenario-server')
@@ -116,7 +117,7 @@ class TestLargeOpsScenario(manager.ScenarioTest):
         for server in self.servers:
             self.addCleanupClass(self.servers_client.delete_server,
                                  server['id'])
-        self._wait_for_server_status('ACTIVE')
+        self._wait_for_server_status('ACTIVE', name)
 
     def _large_ops_scenario(self):
         #self.glance_image_create()
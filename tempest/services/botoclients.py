@@ -14,6 +14,7 @@
 #    under the License.
 
 import contextlib
+import time
 import types
 
 import boto
@@ -23,6 +24,7 @@ from six.moves import configparser as ConfigParser
 from six.moves.urllib import parse as urlparse
 from tempest_lib import exceptions as lib_exc
 
+from tempest.common import api_latency
 from tempest import config
 
 CONF = config.CONF
@@ -31,6 +33,7 @@ CONF = config.CONF
 class BotoClientBase(object):
 
     ALLOWED_METHODS = set()
+    SERVICE = None
 
     def __init__(self, identity_client):
         self.identity_client = identity_client
@@ -65,7 +68,19 @@ class BotoClientBase(object):
         if name in self.ALLOWED_METHODS:
             def func(self, *args, **kwargs):
                 with contextlib.closing(self.get_connection()) as conn:
-                    return getattr(conn, name)(*args, **kwargs)
+                    recorder = api_latency.get_recorder()
+                    if recorder is None:
+                        return getattr(conn, name)(*args, **kwargs)
+                    status = 'ok'
+                    start = time.time()
+                    try:
+                        return getattr(conn, name)(*args, **kwargs)
+                    except Exception as e:
+                        status = getattr(e, 'status', None) or 'error'
+                        raise
+                    finally:
+                        recorder.record(self.SERVICE, name, '', status,
+                                        time.time() - start)
 
             func.__name__ = name
             setattr(self, name, types.MethodType(func, self, self.__class__))
@@ -113,6 +128,8 @@ class BotoClientBase(object):
 
 class APIClientEC2(BotoClientBase):
 
+    SERVICE = 'ec2'
+
     def connect_method(self, *args, **kwargs):
         return boto.connect_ec2(*args, **kwargs)
 
@@ -189,6 +206,8 @@ class APIClientEC2(BotoClientBase):
 
 class ObjectClientS3(BotoClientBase):
 
+    SERVICE = 's3'
+
     def connect_method(self, *args, **kwargs):
         return boto.connect_s3(*args, **kwargs)
 
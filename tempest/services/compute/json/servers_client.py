@@ -23,6 +23,7 @@ from tempest_lib import exceptions as lib_exc
 
 from tempest.services.volume.json import boot_from_vol_client
 from tempest.api_schema.response.compute.v2_1 import servers as schema
+from tempest.common import pagination
 from tempest.common import service_client
 from tempest import exceptions
 from tempest import config
@@ -188,6 +189,32 @@ class ServersClient(service_client.ServiceClient):
         self.validate_response(_schema, resp, body)
         return service_client.ResponseBody(resp, body)
 
+    def iter_servers(self, detail=False, fields=None,
+                     limit=pagination.DEFAULT_PAGE_SIZE, **params):
+        """Yields all the servers of a user, one page at a time.
+
+        :param fields: if set, only these fields of the servers are yielded
+        :param limit: number of servers requested per page
+        """
+        url = 'servers'
+        _schema = schema.list_servers
+        if detail:
+            url += '/detail'
+            _schema = schema.list_servers_detail
+        params['limit'] = limit
+
+        while True:
+            resp, body = self.get('%s?%s' % (url, urllib.urlencode(params)))
+            body = json.loads(body)
+            self.validate_response(_schema, resp, body)
+            for server in body['servers']:
+                yield pagination.select_fields(server, fields)
+            # Nova only links the next page when this one is full
+            marker = pagination.get_next_marker(body.get('servers_links'))
+            if marker is None or not body['servers']:
+                return
+            params['marker'] = marker
+
     def wait_for_server_termination(self, server_id, ignore_error=False):
         """Waits for server to reach termination."""
         start_time = int(time.time())
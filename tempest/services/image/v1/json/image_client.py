@@ -16,6 +16,7 @@
 import copy
 import errno
 import os
+import stat
 import time
 
 from oslo_log import log as logging
@@ -27,8 +28,10 @@ from tempest_lib import exceptions as lib_exc
 
 from tempest.common import glance_http
 from tempest.common import service_client
+from tempest import config
 from tempest import exceptions
 
+CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
 
@@ -97,6 +100,13 @@ class ImageClient(service_client.ServiceClient):
         """
         # For large images, we need to supply the size of the
         # image file. See LP Bugs #827660 and #845788.
+        try:
+            # The size of a real file is known without seeking it
+            st = os.fstat(obj.fileno())
+            if stat.S_ISREG(st.st_mode):
+                return st.st_size
+        except (AttributeError, IOError, OSError, ValueError):
+            pass
         if hasattr(obj, 'seek') and hasattr(obj, 'tell'):
             try:
                 obj.seek(0, os.SEEK_END)
@@ -122,7 +132,8 @@ class ImageClient(service_client.ServiceClient):
         return glance_http.HTTPClient(auth_provider=self.auth_provider,
                                       filters=self.filters,
                                       insecure=self.dscv,
-                                      ca_certs=self.ca_certs)
+                                      ca_certs=self.ca_certs,
+                                      chunk_size=CONF.image.http_chunk_size)
 
     def _create_with_data(self, headers, data):
         resp, body_iter = self.http.raw_request('POST', '/v1/images',
@@ -238,6 +249,22 @@ class ImageClient(service_client.ServiceClient):
         self.expected_success(200, resp.status)
         return service_client.ResponseBodyData(resp, body)
 
+    def stream_image(self, image_id, checksum='md5'):
+        """Returns an iterator over the data of an image.
+
+        The data is read in [image]/http_chunk_size chunks as it is
+        iterated, instead of in memory at once like show_image, and its
+        checksum computed along, see ResponseBodyIterator.checksum.
+        """
+        url = '/v1/images/%s' % image_id
+        resp, body_iter = self.http.raw_request('GET', url,
+                                                checksum=checksum)
+        if resp.status >= 400:
+            self._error_checker('GET', url, {}, None, resp,
+                                ''.join(body_iter))
+        self.expected_success(200, resp.status)
+        return body_iter
+
     def is_resource_deleted(self, id):
         try:
             self.get_image_meta(id)
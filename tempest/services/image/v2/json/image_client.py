@@ -13,13 +13,17 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import jsonschema
 from oslo_serialization import jsonutils as json
 from six.moves.urllib import parse as urllib
 from tempest_lib import exceptions as lib_exc
 
 from tempest.common import glance_http
+from tempest.common import pagination
+from tempest.common import response_validation
 from tempest.common import service_client
+from tempest import config
+
+CONF = config.CONF
 
 
 class ImageClientV2(service_client.ServiceClient):
@@ -40,6 +44,7 @@ class ImageClientV2(service_client.ServiceClient):
             ca_certs=ca_certs,
             trace_requests=trace_requests)
         self._http = None
+        self._schemas = {}
         self.dscv = disable_ssl_certificate_validation
         self.ca_certs = ca_certs
 
@@ -47,15 +52,18 @@ class ImageClientV2(service_client.ServiceClient):
         return glance_http.HTTPClient(auth_provider=self.auth_provider,
                                       filters=self.filters,
                                       insecure=self.dscv,
-                                      ca_certs=self.ca_certs)
+                                      ca_certs=self.ca_certs,
+                                      chunk_size=CONF.image.http_chunk_size)
 
     def _validate_schema(self, body, type='image'):
-        if type in ['image', 'images']:
-            schema = self.show_schema(type)
-        else:
+        if type not in ['image', 'images']:
             raise ValueError("%s is not a valid schema type" % type)
+        # The schemas are only fetched once, and their validators cached
+        if type not in self._schemas:
+            self._schemas[type] = self.show_schema(type)
 
-        jsonschema.validate(body, schema)
+        response_validation.validate(body, self._schemas[type],
+                                     format_checker=None)
 
     @property
     def http(self):
@@ -125,6 +133,30 @@ class ImageClientV2(service_client.ServiceClient):
         self._validate_schema(body, type='images')
         return service_client.ResponseBodyList(resp, body['images'])
 
+    def iter_images(self, fields=None, limit=pagination.DEFAULT_PAGE_SIZE,
+                    params=None):
+        """Yields all the images, one page at a time.
+
+        :param fields: if set, only these fields of the images are yielded
+        :param limit: number of images requested per page
+        :param params: dictionary of the other query parameters
+        """
+        params = dict(params or {})
+        # A limit given in params is the page size
+        params.setdefault('limit', limit)
+
+        while True:
+            resp, body = self.get('v2/images?%s' % urllib.urlencode(params))
+            self.expected_success(200, resp.status)
+            body = json.loads(body)
+            self._validate_schema(body, type='images')
+            for image in body['images']:
+                yield pagination.select_fields(image, fields)
+            marker = pagination.get_next_marker(body.get('next'))
+            if marker is None or not body['images']:
+                return
+            params['marker'] = marker
+
     def show_image(self, image_id):
         url = 'v2/images/%s' % image_id
         resp, body = self.get(url)
@@ -159,6 +191,22 @@ class ImageClientV2(service_client.ServiceClient):
         self.expected_success(200, resp.status)
         return service_client.ResponseBodyData(resp, body)
 
+    def stream_image_file(self, image_id, checksum='md5'):
+        """Returns an iterator over the data of an image.
+
+        The data is read in [image]/http_chunk_size chunks as it is
+        iterated, instead of in memory at once like load_image_file, and
+        its checksum computed along, see ResponseBodyIterator.checksum.
+        """
+        url = '/v2/images/%s/file' % image_id
+        resp, body_iter = self.http.raw_request('GET', url,
+                                                checksum=checksum)
+        if resp.status >= 400:
+            self._error_checker('GET', url, {}, None, resp,
+                                ''.join(body_iter))
+        self.expected_success(200, resp.status)
+        return body_iter
+
     def add_image_tag(self, image_id, tag):
         url = 'v2/images/%s/tags/%s' % (image_id, tag)
         resp, body = self.put(url, body=None)
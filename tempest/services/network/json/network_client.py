@@ -17,7 +17,10 @@ from six.moves.urllib import parse as urllib
 from tempest_lib.common.utils import misc
 from tempest_lib import exceptions as lib_exc
 
+from tempest.common import pagination
 from tempest.common import service_client
+from tempest.common import timelines
+from tempest.common import waiters
 from tempest import exceptions
 
 
@@ -48,6 +51,25 @@ class NetworkClient(service_client.ServiceClient):
         self.expected_success(200, resp.status)
         return service_client.ResponseBody(resp, body)
 
+    def _iter_resources(self, uri, fields=None,
+                        limit=pagination.DEFAULT_PAGE_SIZE, **filters):
+        # Yields the resources one page at a time. Only the given fields,
+        # and the id used as marker, are requested to the server.
+        key = uri.rsplit('/', 1)[-1].replace('-', '_')
+        if fields:
+            filters['fields'] = list(fields) + ['id']
+        filters['limit'] = limit
+        while True:
+            body = self._list_resources(uri, **filters)
+            for resource in body[key]:
+                yield pagination.select_fields(resource, fields)
+            # No links if the pagination is disabled on the server, the
+            # whole listing was then returned
+            marker = pagination.get_next_marker(body.get(key + '_links'))
+            if marker is None or not body[key]:
+                return
+            filters['marker'] = marker
+
     def _delete_resource(self, uri):
         req_uri = self.uri_prefix + uri
         resp, body = self.delete(req_uri)
@@ -104,6 +126,10 @@ class NetworkClient(service_client.ServiceClient):
         uri = '/networks'
         return self._list_resources(uri, **filters)
 
+    def iter_networks(self, fields=None, **filters):
+        uri = '/networks'
+        return self._iter_resources(uri, fields=fields, **filters)
+
     def create_subnet(self, **kwargs):
         uri = '/subnets'
         post_data = {'subnet': kwargs}
@@ -126,6 +152,10 @@ class NetworkClient(service_client.ServiceClient):
         uri = '/subnets'
         return self._list_resources(uri, **filters)
 
+    def iter_subnets(self, fields=None, **filters):
+        uri = '/subnets'
+        return self._iter_resources(uri, fields=fields, **filters)
+
     def create_port(self, **kwargs):
         uri = '/ports'
         post_data = {'port': kwargs}
@@ -148,6 +178,10 @@ class NetworkClient(service_client.ServiceClient):
         uri = '/ports'
         return self._list_resources(uri, **filters)
 
+    def iter_ports(self, fields=None, **filters):
+        uri = '/ports'
+        return self._iter_resources(uri, fields=fields, **filters)
+
     def create_floatingip(self, **kwargs):
         uri = '/floatingips'
         post_data = {'floatingip': kwargs}
@@ -170,6 +204,10 @@ class NetworkClient(service_client.ServiceClient):
         uri = '/floatingips'
         return self._list_resources(uri, **filters)
 
+    def iter_floatingips(self, fields=None, **filters):
+        uri = '/floatingips'
+        return self._iter_resources(uri, fields=fields, **filters)
+
     def create_metering_label(self, **kwargs):
         uri = '/metering/metering-labels'
         post_data = {'metering_label': kwargs}
@@ -269,13 +307,16 @@ class NetworkClient(service_client.ServiceClient):
 
     def wait_for_resource_deletion(self, resource_type, id):
         """Waits for a resource to be deleted."""
+        timeline = timelines.start(resource_type, id)
         start_time = int(time.time())
+        poller = waiters.get_polling_policy(self)
         while True:
-            if self.is_resource_deleted(resource_type, id):
+            if timeline.fetch(self.is_resource_deleted, resource_type, id):
+                timeline.record(timelines.DELETED)
                 return
             if int(time.time()) - start_time >= self.build_timeout:
                 raise exceptions.TimeoutException
-            time.sleep(self.build_interval)
+            poller.sleep()
 
     def is_resource_deleted(self, resource_type, id):
         method = 'show_' + resource_type
@@ -302,17 +343,24 @@ class NetworkClient(service_client.ServiceClient):
           to reach the desired status
         @type timeout: Integer
         """
-        if not interval:
-            interval = self.build_interval
         if not timeout:
             timeout = self.build_timeout
+        if interval:
+            # An explicit interval from the caller is always honored
+            poller = waiters.FixedIntervalPolicy(interval, timeout)
+        else:
+            poller = waiters.get_polling_policy(self, timeout)
+        # The id of the resource is only known once fetched
+        timeline = timelines.start('network-resource', None)
         start_time = time.time()
 
         while time.time() - start_time <= timeout:
-            resource = fetch()
+            resource = timeline.fetch(fetch)
+            timeline.resource_id = resource.get('id')
+            timeline.record(resource['status'])
             if resource['status'] == status:
                 return
-            time.sleep(interval)
+            poller.sleep()
 
         # At this point, the wait has timed out
         message = 'Resource %s' % (str(resource))
@@ -392,6 +440,10 @@ class NetworkClient(service_client.ServiceClient):
         uri = '/routers'
         return self._list_resources(uri, **filters)
 
+    def iter_routers(self, fields=None, **filters):
+        uri = '/routers'
+        return self._iter_resources(uri, fields=fields, **filters)
+
     def update_router_with_snat_gw_info(self, router_id, **kwargs):
         """Update a router passing also the enable_snat attribute.
 
@@ -18,6 +18,7 @@ from xml.etree import ElementTree as etree
 from oslo_serialization import jsonutils as json
 from six.moves.urllib import parse as urllib
 
+from tempest.common import pagination
 from tempest.common import service_client
 
 
@@ -106,21 +107,40 @@ class ContainerClient(service_client.ServiceClient):
             item count is beyond 10,000 item listing limit.
             Does not require any parameters aside from container name.
         """
-        # TODO(dwalleck): Rewrite using json format to avoid newlines at end of
-        # obj names. Set limit to API limit - 1 (max returned items = 9999)
-        limit = 9999
-        if params is not None:
-            if 'limit' in params:
-                limit = params['limit']
-
-            if 'marker' in params:
-                limit = params['marker']
-
-        resp, objlist = self.list_container_contents(
-            container,
-            params={'limit': limit, 'format': 'json'})
-        self.expected_success(200, resp.status)
-        return objlist
+        return list(self.iter_container_objects(container, params=params))
+
+    def iter_container_objects(self, container, fields=None,
+                               limit=pagination.DEFAULT_PAGE_SIZE,
+                               params=None):
+        """
+           Yields all the objects of a container, one page at a time.
+
+           Optional Arguments:
+           fields = list
+               Only these fields of the objects are yielded.
+
+           limit = integer
+               Number of objects requested per page, which must not exceed
+               the container listing limit of the cluster (10,000 by
+               default).
+
+           params = dict
+               The other arguments of list_container_contents, like prefix.
+        """
+        params = dict(params or {}, format='json')
+        # A limit given in params is the page size
+        limit = int(params.setdefault('limit', limit))
+        while True:
+            resp, objlist = self.list_container_contents(container,
+                                                         params=params)
+            for obj in objlist:
+                yield pagination.select_fields(obj, fields)
+            # A page shorter than the limit is the last one
+            if len(objlist) < limit:
+                return
+            # With a delimiter, the pseudo directories are listed as subdir
+            last = objlist[-1]
+            params['marker'] = last.get('name', last.get('subdir'))
 
     def list_container_contents(self, container, params=None):
         """
@@ -0,0 +1,199 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Segmented upload and ranged download of large objects.
+
+The segments of an object are uploaded, and the ranges of an object are
+downloaded, concurrently by a process wide pool of
+[object-storage]/large_object_workers threads.
+"""
+
+import collections
+import copy
+import hashlib
+import threading
+
+import httplib2
+from oslo_serialization import jsonutils as json
+
+from tempest.common import tasks
+from tempest import config
+from tempest import exceptions
+
+CONF = config.CONF
+
+
+class LargeObjectHelper(object):
+    """Uploads and downloads large objects with an ObjectClient.
+
+    :param object_client: the ObjectClient of the account
+    """
+
+    def __init__(self, object_client):
+        self.object_client = object_client
+        self._local = threading.local()
+
+    def _client(self):
+        # An httplib2.Http is not thread safe, so each thread uses a copy
+        # of the client with its own copy of the Http object
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = copy.copy(self.object_client)
+            if isinstance(client.http_obj, httplib2.Http):
+                client.http_obj = copy.copy(client.http_obj)
+                client.http_obj.connections = {}
+            self._local.client = client
+        return client
+
+    def _run(self, func, *args):
+        pool = get_task_pool()
+        if pool is None:
+            return _Done(func(*args))
+        return pool.submit(func, *args)
+
+    def _upload_segment(self, container, name, data):
+        resp, _ = self._client().create_object(container, name, data)
+        etag = hashlib.md5(data).hexdigest()
+        if resp['etag'].strip('"') != etag:
+            raise exceptions.ChecksumMismatch(
+                name='%s/%s' % (container, name), actual=resp['etag'],
+                expected=etag)
+        return {'path': '/%s/%s' % (container, name), 'etag': etag,
+                'size_bytes': len(data)}
+
+    def upload(self, container, object_name, stream, segment_size,
+               manifest='slo', segment_container=None):
+        """Uploads a stream as segments and writes their manifest.
+
+        Only as many segments as there are workers are read in memory.
+
+        :param stream: file-like object of the data of the object
+        :param segment_size: size of the segments, all but the last one
+                             must be at least 1MB for a static manifest
+        :param manifest: 'slo' for a static, or 'dlo' for a dynamic, large
+                         object manifest
+        :param segment_container: container of the segments, defaults to
+                                  the container of the object
+        :returns: dict of the segments of the manifest, none for an empty
+                  stream, the size and the md5 checksum of the whole data
+        """
+        segment_container = segment_container or container
+        workers = max(CONF.object_storage.large_object_workers, 1)
+        md5 = hashlib.md5()
+        size = 0
+        pending = collections.deque()
+        segments = []
+        index = 0
+        while True:
+            data = stream.read(segment_size)
+            if not data:
+                break
+            md5.update(data)
+            size += len(data)
+            if len(pending) >= workers:
+                segments.append(pending.popleft().result())
+            name = '%s/%08d' % (object_name, index)
+            pending.append(self._run(self._upload_segment,
+                                     segment_container, name, data))
+            index += 1
+        segments.extend(tasks.wait_all(pending))
+
+        if not segments:
+            # Swift rejects a static manifest of a single empty segment, so
+            # an empty stream is uploaded as a plain empty object
+            self.object_client.create_object(container, object_name, '')
+        elif manifest == 'slo':
+            self.object_client.create_object(
+                container, object_name, json.dumps(segments),
+                params={'multipart-manifest': 'put'})
+        else:
+            self.object_client.create_object(
+                container, object_name, '',
+                metadata={'X-Object-Manifest': '%s/%s/' % (
+                    segment_container, object_name)})
+        return {'segments': segments, 'size': size,
+                'etag': md5.hexdigest()}
+
+    def _download_range(self, container, object_name, buf, start, end):
+        resp, body = self._client().get_object(
+            container, object_name,
+            metadata={'Range': 'bytes=%d-%d' % (start, end - 1)})
+        if len(body) != end - start:
+            raise exceptions.ChecksumMismatch(
+                name='bytes %d-%d of %s/%s' % (start, end - 1, container,
+                                               object_name),
+                actual='%d bytes' % len(body),
+                expected='%d bytes' % (end - start))
+        buf[start:end] = body
+
+    def download(self, container, object_name, range_size, etag=None):
+        """Downloads an object with concurrent Range requests.
+
+        The ranges are written in place into a buffer of the size of the
+        object, whose md5 checksum is verified against etag, or against
+        the ETag of the object if it is not a large object.
+
+        :param range_size: size of the ranges requested
+        :param etag: md5 checksum of the data of the object
+        :returns: bytearray of the data of the object
+        :raises exceptions.ChecksumMismatch: if the data is not as expected
+        """
+        resp, _ = self.object_client.list_object_metadata(container,
+                                                          object_name)
+        size = int(resp['content-length'])
+        if etag is None and not ('x-static-large-object' in resp or
+                                 'x-object-manifest' in resp):
+            etag = resp['etag'].strip('"')
+        buf = bytearray(size)
+        view = memoryview(buf)
+        tasks.wait_all([self._run(self._download_range, container,
+                                  object_name, view, start,
+                                  min(start + range_size, size))
+                        for start in range(0, size, range_size)])
+        if etag is not None:
+            actual = hashlib.md5(buf).hexdigest()
+            if actual != etag:
+                raise exceptions.ChecksumMismatch(
+                    name='%s/%s' % (container, object_name), actual=actual,
+                    expected=etag)
+        return buf
+
+
+class _Done(object):
+    # A Task already run by the caller, when there is no pool
+    def __init__(self, result):
+        self._result = result
+        self._event = threading.Event()
+        self._event.set()
+
+    def result(self):
+        return self._result
+
+
+_task_pool = None
+_task_pool_lock = threading.Lock()
+
+
+def get_task_pool():
+    """Returns the process wide pool of the large object transfers.
+
+    Returns None when [object-storage]/large_object_workers is 0, the
+    segments and ranges are then transferred sequentially.
+    """
+    global _task_pool
+    workers = CONF.object_storage.large_object_workers
+    if workers <= 0:
+        return None
+    with _task_pool_lock:
+        if _task_pool is None:
+            _task_pool = tasks.TaskPool(workers, name='large-object')
+    return _task_pool
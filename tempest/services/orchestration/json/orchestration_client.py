@@ -21,6 +21,8 @@ from six.moves.urllib import parse as urllib
 from tempest_lib import exceptions as lib_exc
 
 from tempest.common import service_client
+from tempest.common import timelines
+from tempest.common import waiters
 from tempest import exceptions
 
 
@@ -154,13 +156,16 @@ class OrchestrationClient(service_client.ServiceClient):
     def wait_for_resource_status(self, stack_identifier, resource_name,
                                  status, failure_pattern='^.*_FAILED$'):
         """Waits for a Resource to reach a given status."""
+        timeline = timelines.start('stack-resource', '%s/%s' % (
+            stack_identifier, resource_name))
         start = int(time.time())
+        poller = waiters.get_polling_policy(self)
         fail_regexp = re.compile(failure_pattern)
 
         while True:
             try:
-                body = self.show_resource(
-                    stack_identifier, resource_name)
+                body = timeline.fetch(self.show_resource,
+                                      stack_identifier, resource_name)
             except lib_exc.NotFound:
                 # ignore this, as the resource may not have
                 # been created yet
@@ -168,6 +173,7 @@ class OrchestrationClient(service_client.ServiceClient):
             else:
                 resource_name = body['resource_name']
                 resource_status = body['resource_status']
+                timeline.record(resource_status)
                 if resource_status == status:
                     return
                 if fail_regexp.search(resource_status):
@@ -185,22 +191,26 @@ class OrchestrationClient(service_client.ServiceClient):
                             resource_status,
                             self.build_timeout))
                 raise exceptions.TimeoutException(message)
-            time.sleep(self.build_interval)
+            poller.sleep()
 
     def wait_for_stack_status(self, stack_identifier, status,
                               failure_pattern='^.*_FAILED$'):
         """Waits for a Stack to reach a given status."""
+        timeline = timelines.start('stack', stack_identifier)
         start = int(time.time())
+        poller = waiters.get_polling_policy(self)
         fail_regexp = re.compile(failure_pattern)
 
         while True:
             try:
-                body = self.show_stack(stack_identifier)
+                body = timeline.fetch(self.show_stack, stack_identifier)
             except lib_exc.NotFound:
                 if status == 'DELETE_COMPLETE':
+                    timeline.record(status)
                     return
             stack_name = body['stack_name']
             stack_status = body['stack_status']
+            timeline.record(stack_status)
             if stack_status == status:
                 return body
             if fail_regexp.search(stack_status):
@@ -215,7 +225,7 @@ class OrchestrationClient(service_client.ServiceClient):
                            (stack_name, status, stack_status,
                             self.build_timeout))
                 raise exceptions.TimeoutException(message)
-            time.sleep(self.build_interval)
+            poller.sleep()
 
     def show_resource_metadata(self, stack_identifier, resource_name):
         """Returns the resource's metadata."""
@@ -20,6 +20,8 @@ from oslo_serialization import jsonutils as json
 from tempest_lib import exceptions as lib_exc
 
 from tempest.common import service_client
+from tempest.common import timelines
+from tempest.common import waiters
 from tempest import exceptions
 
 
@@ -97,14 +99,18 @@ class BaseBackupsClient(service_client.ServiceClient):
 
     def wait_for_backup_status(self, backup_id, status):
         """Waits for a Backup to reach a given status."""
-        body = self.show_backup(backup_id)
+        timeline = timelines.start('backup', backup_id)
+        body = timeline.fetch(self.show_backup, backup_id)
         backup_status = body['status']
+        timeline.record(backup_status)
         start = int(time.time())
+        poller = waiters.get_polling_policy(self)
 
         while backup_status != status:
-            time.sleep(self.build_interval)
-            body = self.show_backup(backup_id)
+            poller.sleep()
+            body = timeline.fetch(self.show_backup, backup_id)
             backup_status = body['status']
+            timeline.record(backup_status)
             if backup_status == 'error':
                 raise exceptions.VolumeBackupException(backup_id=backup_id)
 
@@ -118,6 +124,7 @@ class BaseBackupsClient(service_client.ServiceClient):
     def wait_for_backup_deletion(self, backup_id):
         """Waits for backup deletion"""
         start_time = int(time.time())
+        poller = waiters.get_polling_policy(self)
         while True:
             try:
                 self.show_backup(backup_id)
@@ -125,7 +132,7 @@ class BaseBackupsClient(service_client.ServiceClient):
                 return
             if int(time.time()) - start_time >= self.build_timeout:
                 raise exceptions.TimeoutException
-            time.sleep(self.build_interval)
+            poller.sleep()
 
 
 class BackupsClient(BaseBackupsClient):
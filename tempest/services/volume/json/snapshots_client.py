@@ -18,6 +18,8 @@ from six.moves.urllib import parse as urllib
 from tempest_lib import exceptions as lib_exc
 
 from tempest.common import service_client
+from tempest.common import timelines
+from tempest.common import waiters
 from tempest import exceptions
 
 
@@ -89,11 +91,15 @@ class BaseSnapshotsClient(service_client.ServiceClient):
     # NOTE(afazkas): Wait reinvented again. It is not in the correct layer
     def wait_for_snapshot_status(self, snapshot_id, status):
         """Waits for a Snapshot to reach a given status."""
+        timeline = timelines.start('snapshot', snapshot_id)
         start_time = time.time()
-        old_value = value = self._get_snapshot_status(snapshot_id)
+        poller = waiters.get_polling_policy(self)
+        old_value = value = timeline.fetch(self._get_snapshot_status,
+                                           snapshot_id)
+        timeline.record(value)
         while True:
             dtime = time.time() - start_time
-            time.sleep(self.build_interval)
+            poller.sleep()
             if value != old_value:
                 LOG.info('Value transition from "%s" to "%s"'
                          'in %d second(s).', old_value,
@@ -107,9 +113,10 @@ class BaseSnapshotsClient(service_client.ServiceClient):
                            'but we got %s.' %
                            (self.build_timeout, status, value))
                 raise exceptions.TimeoutException(message)
-            time.sleep(self.build_interval)
+            poller.sleep()
             old_value = value
-            value = self._get_snapshot_status(snapshot_id)
+            value = timeline.fetch(self._get_snapshot_status, snapshot_id)
+            timeline.record(value)
 
     def delete_snapshot(self, snapshot_id):
         """Delete Snapshot."""
@@ -18,6 +18,7 @@ import six
 from six.moves.urllib import parse as urllib
 from tempest_lib import exceptions as lib_exc
 
+from tempest.common import pagination
 from tempest.common import service_client
 from tempest.common import waiters
 
@@ -91,6 +92,40 @@ class BaseVolumesClient(service_client.ServiceClient):
         key = None if return_body else 'volumes'
         return self._ext_get(url, key)
 
+    def iter_volumes(self, detail=False, fields=None,
+                     limit=pagination.DEFAULT_PAGE_SIZE, params=None):
+        """Yields all the volumes, one page at a time.
+
+        :param fields: if set, only these fields of the volumes are yielded
+        :param limit: number of volumes requested per page
+        :param params: dictionary of the other query parameters
+        """
+        url = 'volumes'
+        if detail:
+            url += '/detail'
+        params = dict(params or {})
+        # A limit given in params is the page size
+        limit = int(params.setdefault('limit', limit))
+
+        while True:
+            body = self._ext_get('%s?%s' % (url, self._prepare_params(params)))
+            volumes = body['volumes']
+            for volume in volumes:
+                yield pagination.select_fields(volume, fields)
+            if not volumes:
+                return
+            if 'volumes_links' in body or self.api_version == 'v2':
+                marker = pagination.get_next_marker(body.get('volumes_links'))
+                if marker is None or marker == params.get('marker'):
+                    return
+                params['marker'] = marker
+            else:
+                # The v1 API has no links and ignores the marker, it pages
+                # by offset, and a full page may be followed by another one
+                if len(volumes) < limit:
+                    return
+                params['offset'] = params.get('offset', 0) + len(volumes)
+
     def show_volume(self, volume_id):
         """Returns the details of a single volume."""
         url = "volumes/%s" % str(volume_id)
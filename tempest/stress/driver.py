@@ -26,10 +26,16 @@ from tempest_lib.common import ssh
 
 from tempest import clients
 from tempest.common import isolated_creds
+from tempest.common import response_validation
 from tempest.common.utils import data_utils
 from tempest import config
 from tempest import exceptions
 from tempest.stress import cleanup
+from tempest.stress import log_scanner
+from tempest.stress import metrics
+from tempest.stress import open_loop
+from tempest.stress import statistics
+from tempest.stress import virtual_users
 
 CONF = config.CONF
 
@@ -66,23 +72,6 @@ def _get_compute_nodes(controller, ssh_user, ssh_key=None):
     return nodes
 
 
-def _has_error_in_logs(logfiles, nodes, ssh_user, ssh_key=None,
-                       stop_on_error=False):
-    """
-    Detect errors in the nova log files on the controller and compute nodes.
-    """
-    grep = 'egrep "ERROR|TRACE" %s' % logfiles
-    ret = False
-    for node in nodes:
-        errors = do_ssh(grep, node, ssh_user, ssh_key)
-        if len(errors) > 0:
-            LOG.error('%s: %s' % (node, errors))
-            ret = True
-            if stop_on_error:
-                break
-    return ret
-
-
 def sigchld_handler(signalnum, frame):
     """
     Signal handler (only active if stop_on_error is True).
@@ -118,11 +107,91 @@ def terminate_all_processes(check_interval=20):
         process['process'].join()
 
 
+def _create_isolated_credentials(admin_manager):
+    """Returns the credentials of a new tenant and user."""
+    username = data_utils.rand_name("stress_user")
+    tenant_name = data_utils.rand_name("stress_tenant")
+    password = "pass"
+    if CONF.identity.auth_version == 'v2':
+        identity_client = admin_manager.identity_client
+    else:
+        identity_client = admin_manager.identity_v3_client
+    credentials_client = isolated_creds.get_creds_client(identity_client)
+    project = credentials_client.create_project(
+        name=tenant_name, description=tenant_name)
+    user = credentials_client.create_user(username, password,
+                                          project['id'], "email")
+    # Add roles specified in config file
+    for conf_role in CONF.auth.tempest_roles:
+        credentials_client.assign_user_role(user, project, conf_role)
+    return credentials_client.get_credentials(user, project, password)
+
+
+def _start_virtual_users(test, admin_manager, max_runs, stop_on_error):
+    """Starts the worker processes of the virtual users of an action.
+
+    The worker processes create their clients and set the action up
+    themselves, see virtual_users, and this waits until they did.
+    """
+    if test['virtual_users'] < 1:
+        raise exceptions.InvalidConfiguration(
+            'The number of virtual users of %s must be at least 1' %
+            test['action'])
+    if test.get('use_isolated_tenants', False):
+        credentials = [_create_isolated_credentials(admin_manager)
+                       for _ in moves.xrange(test.get('tenants', 1))]
+    else:
+        credentials = [None]
+    test_obj = importutils.import_class(test['action'])
+    users = virtual_users.split(
+        test['virtual_users'],
+        test.get('processes', CONF.stress.virtual_user_processes))
+    started = []
+    for p_number, process_users in enumerate(users):
+        # The tenants are spread over the processes
+        tenant_credentials = (credentials[p_number::len(users)] or
+                              [credentials[p_number % len(credentials)]])
+        shared_statistic = statistics.SharedStatistic()
+        users_run = virtual_users.VirtualUsers(
+            test_obj, tenant_credentials[:process_users], process_users,
+            shared_statistic, kwargs=test.get('kwargs', {}),
+            max_runs=max_runs, stop_on_error=stop_on_error,
+            use_admin=test.get('use_admin', False),
+            backend=CONF.stress.virtual_user_backend,
+            ramp_up=test.get('ramp_up', 0))
+        LOG.debug("calling Target Object %s with %d virtual users" %
+                  (test_obj.__name__, process_users))
+        ready, child_ready = multiprocessing.Pipe(duplex=False)
+        p = multiprocessing.Process(target=users_run.execute,
+                                    args=(child_ready,))
+        process = {'process': p,
+                   'p_number': p_number,
+                   'action': test_obj.__name__,
+                   'statistic': shared_statistic}
+        processes.append(process)
+        p.start()
+        child_ready.close()
+        started.append((process, ready))
+    for process, ready in started:
+        try:
+            action = ready.recv()
+        except EOFError:
+            action = None
+        ready.close()
+        if action is None:
+            terminate_all_processes()
+            raise exceptions.TempestException(
+                'Cannot set up the virtual users of %s' % test['action'])
+        process['action'] = action
+
+
 def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
     """
     Workload driver. Executes an action function against a nova-cluster.
     """
     admin_manager = clients.AdminManager()
+    response_validation.set_sample_rate(
+        CONF.stress.response_validation_sample_rate)
 
     ssh_user = CONF.stress.target_ssh_user
     ssh_key = CONF.stress.target_private_key_path
@@ -134,6 +203,11 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
         computes = _get_compute_nodes(controller, ssh_user, ssh_key)
         for node in computes:
             do_ssh("rm -f %s" % logfiles, node, ssh_user, ssh_key)
+        scanner = log_scanner.LogScanner(
+            computes, logfiles, ssh_user, ssh_key,
+            patterns=CONF.stress.log_error_patterns,
+            workers=CONF.stress.log_check_workers)
+    schedulers = []
     skip = False
     for test in tests:
         for service in test.get('required_services', []):
@@ -142,32 +216,25 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
                 break
         if skip:
             break
+        if 'virtual_users' in test:
+            if 'rate' in test:
+                raise exceptions.InvalidConfiguration(
+                    'Virtual users cannot run in open loop')
+            _start_virtual_users(test, admin_manager, max_runs,
+                                 stop_on_error)
+            continue
         if test.get('use_admin', False):
             manager = admin_manager
         else:
             manager = clients.Manager()
+        arrivals = None
+        if 'rate' in test:
+            arrivals = multiprocessing.Queue()
+            action_statistics = []
         for p_number in moves.xrange(test.get('threads', default_thread_num)):
             if test.get('use_isolated_tenants', False):
-                username = data_utils.rand_name("stress_user")
-                tenant_name = data_utils.rand_name("stress_tenant")
-                password = "pass"
-                if CONF.identity.auth_version == 'v2':
-                    identity_client = admin_manager.identity_client
-                else:
-                    identity_client = admin_manager.identity_v3_client
-                credentials_client = isolated_creds.get_creds_client(
-                    identity_client)
-                project = credentials_client.create_project(
-                    name=tenant_name, description=tenant_name)
-                user = credentials_client.create_user(username, password,
-                                                      project['id'], "email")
-                # Add roles specified in config file
-                for conf_role in CONF.auth.tempest_roles:
-                    credentials_client.assign_user_role(user, project,
-                                                        conf_role)
-                creds = credentials_client.get_credentials(user, project,
-                                                           password)
-                manager = clients.Manager(credentials=creds)
+                manager = clients.Manager(
+                    credentials=_create_isolated_credentials(admin_manager))
 
             test_obj = importutils.import_class(test['action'])
             test_run = test_obj(manager, max_runs, stop_on_error)
@@ -178,13 +245,10 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
             LOG.debug("calling Target Object %s" %
                       test_run.__class__.__name__)
 
-            mp_manager = multiprocessing.Manager()
-            shared_statistic = mp_manager.dict()
-            shared_statistic['runs'] = 0
-            shared_statistic['fails'] = 0
+            shared_statistic = statistics.SharedStatistic()
 
             p = multiprocessing.Process(target=test_run.execute,
-                                        args=(shared_statistic,))
+                                        args=(shared_statistic, arrivals))
 
             process = {'process': p,
                        'p_number': p_number,
@@ -193,10 +257,27 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
 
             processes.append(process)
             p.start()
+            if arrivals is not None:
+                action_statistics.append(shared_statistic)
+        if arrivals is not None and action_statistics:
+            # Runs the action in open loop, see open_loop
+            schedulers.append(open_loop.Scheduler(
+                test_run.action, open_loop.RateProfile(test['rate']),
+                arrivals, action_statistics, duration,
+                max_runs=(None if max_runs is None
+                          else max_runs * len(action_statistics)),
+                poisson=test.get('arrivals') == 'poisson',
+                interval=CONF.stress.sample_interval))
     if stop_on_error:
         # NOTE(mkoderer): only the parent should register the handler
         signal.signal(signal.SIGCHLD, sigchld_handler)
-    end_time = time.time() + duration
+    start_time = time.time()
+    end_time = start_time + duration
+    for scheduler in schedulers:
+        scheduler.start()
+    sampler = metrics.get_sampler(processes)
+    if sampler is not None:
+        sampler.start()
     had_errors = False
     try:
         while True:
@@ -222,13 +303,20 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
 
             if not logfiles:
                 continue
-            if _has_error_in_logs(logfiles, computes, ssh_user, ssh_key,
-                                  stop_on_error):
+            if scanner.has_errors():
                 had_errors = True
                 break
     except KeyboardInterrupt:
         LOG.warning("Interrupted, going to print statistics and exit ...")
 
+    elapsed = time.time() - start_time
+    for scheduler in schedulers:
+        scheduler.stop()
+        scheduler.join()
+    if sampler is not None:
+        sampler.stop()
+    if logfiles:
+        scanner.close()
     if stop_on_error:
         signal.signal(signal.SIGCHLD, signal.SIG_DFL)
     terminate_all_processes()
@@ -247,9 +335,17 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
                   process['action'],
                   process['statistic']['runs'],
                      process['statistic']['fails']))
+    LOG.info("Statistics (per action):")
+    for action in statistics.summarize(processes, elapsed):
+        LOG.info(" %s" % statistics.format_action(action))
+    if schedulers:
+        LOG.info("Open loop statistics (per interval):")
+        for scheduler in schedulers:
+            for line in scheduler.report():
+                LOG.info(" %s" % line)
     LOG.info("Summary:")
-    LOG.info("Run %d actions (%d failed)" %
-             (sum_runs, sum_fails))
+    LOG.info("Run %d actions (%d failed) in %.1f seconds" %
+             (sum_runs, sum_fails, elapsed))
 
     if not had_errors and CONF.stress.full_clean_stack:
         LOG.info("cleaning up")
@@ -0,0 +1,158 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Incremental scanning of the log files of the nodes for errors.
+
+The stress driver checks the log files of the compute nodes for errors
+every [stress]/log_check_interval seconds. Each check only scans the bytes
+appended to the files since the previous one: the size of every file is
+sent back along with its matching lines, and is the offset the next check
+starts from. A file smaller than its offset was rotated, and is scanned
+again from its start.
+
+The nodes are scanned concurrently, by [stress]/log_check_workers threads,
+each node over an SSH connection kept open between the checks.
+"""
+
+import threading
+
+from oslo_log import log as logging
+from six.moves import shlex_quote
+from tempest_lib.common import ssh
+
+from tempest.common import tasks
+
+LOG = logging.getLogger(__name__)
+
+# Start of the lines giving the name and size of a file scanned
+_MARKER = '@@tempest-log-scan@@'
+
+_SCRIPT = ('for f in %(logfiles)s; do '
+           '[ -f "$f" ] || continue; '
+           'case "$f" in %(offsets)s*) o=0;; esac; '
+           's=$(stat -c %%s "$f"); '
+           '[ "$s" -lt "$o" ] && o=0; '
+           'echo "%(marker)s $s $f"; '
+           'tail -c +$((o + 1)) "$f" | head -c $((s - o)) | '
+           'grep -E %(patterns)s; '
+           'done; true')
+
+
+class PersistentClient(ssh.Client):
+    """SSH client running all its commands over the same connection."""
+
+    def __init__(self, *args, **kwargs):
+        super(PersistentClient, self).__init__(*args, **kwargs)
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _get_ssh_connection(self, *args, **kwargs):
+        with self._lock:
+            if self._connection is not None:
+                transport = self._connection.get_transport()
+                if transport is not None and transport.is_active():
+                    return self._connection
+                self._connection.close()
+            self._connection = super(PersistentClient,
+                                     self)._get_ssh_connection(*args,
+                                                               **kwargs)
+            return self._connection
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def scan_command(logfiles, offsets, patterns):
+    """Returns the shell command scanning the log files from offsets.
+
+    :param logfiles: shell pattern of the log files
+    :param offsets: dict of the offsets of the files already scanned
+    :param patterns: extended regular expressions of the errors
+    """
+    return _SCRIPT % {
+        'logfiles': logfiles,
+        'offsets': ''.join('%s) o=%d;; ' % (shlex_quote(name), offset)
+                           for name, offset in sorted(offsets.items())),
+        'marker': _MARKER,
+        'patterns': ' '.join('-e %s' % shlex_quote(pattern)
+                             for pattern in patterns)}
+
+
+def parse_output(output):
+    """Returns the new offsets and the error lines of a scan, by file."""
+    offsets = {}
+    errors = {}
+    name = None
+    for line in output.splitlines():
+        if line.startswith(_MARKER + ' '):
+            size, name = line[len(_MARKER) + 1:].split(' ', 1)
+            offsets[name] = int(size)
+        elif name is not None and line:
+            errors.setdefault(name, []).append(line)
+    return offsets, errors
+
+
+class LogScanner(object):
+    """Scans the log files of nodes for the lines matching patterns.
+
+    :param nodes: hosts of the nodes
+    :param logfiles: shell pattern of the log files on the nodes
+    :param ssh_user: user of the SSH connections
+    :param ssh_key: private key of the SSH connections
+    :param patterns: extended regular expressions of the errors
+    :param workers: number of nodes scanned concurrently
+    """
+
+    def __init__(self, nodes, logfiles, ssh_user, ssh_key=None,
+                 patterns=('ERROR', 'TRACE'), workers=16):
+        self.logfiles = logfiles
+        self.patterns = patterns
+        self.clients = dict((node, PersistentClient(node, ssh_user,
+                                                    key_filename=ssh_key))
+                            for node in nodes)
+        self.offsets = dict((node, {}) for node in nodes)
+        self._pool = tasks.TaskPool(max(min(workers, len(nodes)), 1),
+                                    name='stress-log-scan')
+
+    def _scan_node(self, node):
+        cmd = scan_command(self.logfiles, self.offsets[node], self.patterns)
+        try:
+            output = self.clients[node].exec_command(cmd)
+        except Exception:
+            LOG.exception('Cannot scan the log files of %s' % node)
+            return {}
+        offsets, errors = parse_output(output)
+        self.offsets[node].update(offsets)
+        return errors
+
+    def scan(self):
+        """Returns the new error lines of each node, by file."""
+        nodes = sorted(self.clients)
+        results = tasks.wait_all([self._pool.submit(self._scan_node, node)
+                                  for node in nodes])
+        return dict((node, errors) for node, errors in zip(nodes, results)
+                    if errors)
+
+    def has_errors(self):
+        """Logs the new error lines, and returns whether there were any."""
+        found = self.scan()
+        for node, errors in sorted(found.items()):
+            for name, lines in sorted(errors.items()):
+                LOG.error('%s: %s: %s' % (node, name, '\n'.join(lines)))
+        return bool(found)
+
+    def close(self):
+        for client in self.clients.values():
+            client.close()
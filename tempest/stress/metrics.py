@@ -0,0 +1,230 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Time series of the metrics of a stress run.
+
+Every [stress]/sample_interval seconds, a MetricsSampler thread of the
+driver reads the shared statistics of the worker processes, and appends
+the throughput, error count and latency percentiles of each action over
+the interval to [stress]/metrics_file. The metrics are also sent to the
+StatsD or Graphite server at [stress]/metrics_address, if set, so that
+long runs can be plotted while they go.
+"""
+
+import csv
+import re
+import socket
+import threading
+import time
+
+from oslo_log import log as logging
+from oslo_serialization import jsonutils as json
+
+from tempest.common import api_latency
+from tempest import config
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+FIELDS = ('time', 'elapsed', 'action', 'runs', 'fails', 'throughput',
+          'p50', 'p95', 'p99')
+
+_NAME_RE = re.compile(r'[^A-Za-z0-9_-]')
+
+
+def interval_histogram(current, previous):
+    """Returns the histogram of the values recorded since previous."""
+    histogram = api_latency.Histogram()
+    for bucket, count in current.counts.items():
+        count -= previous.counts.get(bucket, 0)
+        if count:
+            histogram.counts[bucket] = count
+    histogram.count = current.count - previous.count
+    histogram.total = current.total - previous.total
+    if histogram.count:
+        # Bounds of the percentiles, not of the values of the interval
+        histogram.min = current.min
+        histogram.max = current.max
+    return histogram
+
+
+def _ms(microseconds):
+    if microseconds is None:
+        return None
+    return round(microseconds / 1000.0, 3)
+
+
+class FileWriter(object):
+    """Appends the metrics to a CSV or JSON lines file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.csv = path.endswith('.csv')
+
+    def write(self, rows):
+        with open(self.path, 'a') as f:
+            if self.csv:
+                writer = csv.DictWriter(f, FIELDS)
+                if f.tell() == 0:
+                    writer.writerow(dict(zip(FIELDS, FIELDS)))
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    f.write(json.dumps(row) + '\n')
+
+
+class LineProtocolWriter(object):
+    """Sends the metrics to a StatsD or Graphite server.
+
+    The metrics of an action are sent in a UDP datagram to StatsD, or on a
+    TCP connection to Graphite, which is opened again after an error.
+    Sending errors are logged, they do not fail the run.
+    """
+
+    def __init__(self, address, protocol='statsd', prefix='tempest.stress'):
+        host, port = address.rsplit(':', 1)
+        self.address = (host, int(port))
+        self.protocol = protocol
+        self.prefix = prefix
+        self._sock = None
+
+    def _lines(self, row):
+        name = '%s.%s' % (self.prefix, _NAME_RE.sub('_', row['action']))
+        for key in FIELDS[3:]:
+            value = row[key]
+            if value is None:
+                continue
+            if self.protocol == 'graphite':
+                yield '%s.%s %s %d' % (name, key, value, row['time'])
+            else:
+                kind = 'c' if key in ('runs', 'fails') else 'g'
+                yield '%s.%s:%s|%s' % (name, key, value, kind)
+
+    def _send(self, data):
+        if self.protocol == 'graphite':
+            if self._sock is None:
+                self._sock = socket.create_connection(self.address, 5)
+            self._sock.sendall(data)
+        else:
+            if self._sock is None:
+                self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.sendto(data, self.address)
+
+    def write(self, rows):
+        for row in rows:
+            data = ('\n'.join(self._lines(row)) + '\n').encode('utf-8')
+            try:
+                self._send(data)
+            except socket.error as e:
+                LOG.warning('Cannot send the metrics to %s:%d: %s',
+                            self.address[0], self.address[1], e)
+                self.close()
+                return
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+class MetricsSampler(threading.Thread):
+    """Samples the statistics of the worker processes per interval.
+
+    :param processes: the processes of the driver, with their action and
+                      SharedStatistic
+    :param writers: FileWriter and LineProtocolWriter of the metrics
+    :param interval: seconds between two samples
+    """
+
+    def __init__(self, processes, writers, interval=10):
+        super(MetricsSampler, self).__init__(name='stress-metrics')
+        self.daemon = True
+        self.processes = processes
+        self.writers = writers
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._previous = {}
+        self._start = None
+        self._last = None
+
+    def _totals(self):
+        totals = {}
+        for process in self.processes:
+            statistic = process['statistic']
+            total = totals.setdefault(process['action'], {
+                'runs': 0, 'fails': 0, 'histogram': api_latency.Histogram()})
+            total['runs'] += statistic['runs']
+            total['fails'] += statistic['fails']
+            total['histogram'].merge(statistic.histogram())
+        return totals
+
+    def sample(self):
+        """Writes the metrics of the interval since the previous sample."""
+        now = time.time()
+        elapsed = now - self._last
+        self._last = now
+        rows = []
+        for action, total in sorted(self._totals().items()):
+            previous = self._previous.get(action) or {
+                'runs': 0, 'fails': 0, 'histogram': api_latency.Histogram()}
+            self._previous[action] = total
+            runs = total['runs'] - previous['runs']
+            histogram = interval_histogram(total['histogram'],
+                                           previous['histogram'])
+            rows.append({
+                'time': int(now),
+                'elapsed': round(now - self._start, 3),
+                'action': action,
+                'runs': runs,
+                'fails': total['fails'] - previous['fails'],
+                'throughput': (round(runs / elapsed, 3)
+                               if elapsed > 0 else 0.0),
+                'p50': _ms(histogram.percentile(50)),
+                'p95': _ms(histogram.percentile(95)),
+                'p99': _ms(histogram.percentile(99))})
+        for writer in self.writers:
+            try:
+                writer.write(rows)
+            except Exception:
+                LOG.exception('Cannot write the metrics')
+        return rows
+
+    def start(self):
+        self._start = self._last = time.time()
+        super(MetricsSampler, self).start()
+
+    def stop(self):
+        """Stops sampling, once the last interval was sampled."""
+        self._stop_event.set()
+        self.join()
+        self.sample()
+        for writer in self.writers:
+            if hasattr(writer, 'close'):
+                writer.close()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+
+def get_sampler(processes):
+    """Returns the MetricsSampler of the driver, or None if not enabled."""
+    writers = []
+    if CONF.stress.metrics_file:
+        writers.append(FileWriter(CONF.stress.metrics_file))
+    if CONF.stress.metrics_address:
+        writers.append(LineProtocolWriter(CONF.stress.metrics_address,
+                                          CONF.stress.metrics_protocol,
+                                          CONF.stress.metrics_prefix))
+    if not writers:
+        return None
+    return MetricsSampler(processes, writers, CONF.stress.sample_interval)
@@ -0,0 +1,190 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Open loop mode of the stress actions.
+
+By default the worker processes of an action run it back to back, so the
+load they offer drops as soon as the cloud slows down. An action with a
+"rate" in the test description is instead run in open loop: a Scheduler
+thread of the driver dispatches runs at that rate, on a queue shared by
+the worker processes of the action, whatever the time they take. When the
+workers cannot keep up the runs wait in the queue, and the time they
+waited is recorded as their queueing delay.
+
+The rate is either a number of runs per second, or a ramp profile given as
+a list of [seconds, rate] points, the rate being linearly interpolated
+between them and constant after the last one::
+
+    {"action": "tempest.stress.actions.server_create_destroy.ServerCreate...",
+     "threads": 8,
+     "rate": [[0, 0.5], [600, 4]],
+     "arrivals": "poisson"}
+
+The runs are dispatched at regular intervals, or with exponentially
+distributed intervals when "arrivals" is "poisson".
+"""
+
+import random
+import threading
+import time
+
+# Time the scheduler waits before checking again a rate of 0
+IDLE_STEP = 0.1
+
+
+class RateProfile(object):
+    """Target rate of the runs of an action, in runs per second.
+
+    :param rate: a rate, or a list of [seconds, rate] points
+    """
+
+    def __init__(self, rate):
+        if isinstance(rate, (list, tuple)):
+            self.points = sorted((float(t), float(r)) for t, r in rate)
+        else:
+            self.points = [(0.0, float(rate))]
+        if not self.points or any(r < 0 for _, r in self.points):
+            raise ValueError('Invalid rate %r' % (rate,))
+
+    def rate_at(self, seconds):
+        previous = None
+        for point in self.points:
+            if seconds < point[0]:
+                if previous is None:
+                    return point[1]
+                t0, r0 = previous
+                t1, r1 = point
+                return r0 + (r1 - r0) * (seconds - t0) / (t1 - t0)
+            previous = point
+        return previous[1]
+
+
+def arrival_times(profile, poisson=False, rng=random):
+    """Yields the times of the runs, in seconds since the start.
+
+    Stops once the rate stays at 0.
+    """
+    seconds = 0.0
+    while True:
+        rate = profile.rate_at(seconds)
+        if rate <= 0:
+            if seconds >= profile.points[-1][0]:
+                return
+            seconds += IDLE_STEP
+            continue
+        seconds += rng.expovariate(rate) if poisson else 1.0 / rate
+        yield seconds
+
+
+class Scheduler(threading.Thread):
+    """Dispatches the runs of an action to its worker processes.
+
+    The time a run is due is put on the queue, and a worker takes it once
+    done with its previous run. Every interval seconds the scheduler also
+    samples the statistics of the workers, to report the offered and
+    achieved rates, the error rate and the mean queueing delay over time.
+
+    :param action: name of the action
+    :param profile: RateProfile of the action
+    :param queue: multiprocessing.Queue of the runs
+    :param statistics: SharedStatistic of each worker process
+    :param duration: seconds the runs are dispatched for
+    :param max_runs: maximum number of runs dispatched, or None
+    :param poisson: whether the arrivals are a Poisson process
+    :param interval: seconds between two samples
+    """
+
+    def __init__(self, action, profile, queue, statistics, duration,
+                 max_runs=None, poisson=False, interval=10):
+        super(Scheduler, self).__init__(name='stress-scheduler-%s' % action)
+        self.daemon = True
+        self.action = action
+        self.profile = profile
+        self.queue = queue
+        self.statistics = statistics
+        self.duration = duration
+        self.max_runs = max_runs
+        self.poisson = poisson
+        self.interval = interval
+        self.offered = 0
+        self.samples = []
+        self._stop_event = threading.Event()
+        self._last = None
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _totals(self):
+        totals = {'runs': 0, 'fails': 0, 'delay_count': 0, 'delay_total': 0}
+        for statistic in self.statistics:
+            totals['runs'] += statistic['runs']
+            totals['fails'] += statistic['fails']
+            totals['delay_count'] += statistic.delay['count']
+            totals['delay_total'] += statistic.delay['total']
+        return totals
+
+    def sample(self, seconds):
+        """Records the sample of the interval ending at seconds."""
+        totals = dict(self._totals(), offered=self.offered, seconds=seconds)
+        last = self._last or dict.fromkeys(totals, 0)
+        self._last = totals
+        elapsed = seconds - last['seconds']
+        if elapsed <= 0:
+            return
+        runs = totals['runs'] - last['runs']
+        fails = totals['fails'] - last['fails']
+        delays = totals['delay_count'] - last['delay_count']
+        self.samples.append({
+            'seconds': round(seconds, 3),
+            'offered': (totals['offered'] - last['offered']) / elapsed,
+            'achieved': runs / elapsed,
+            'errors': fails,
+            'error_rate': float(fails) / runs if runs else 0.0,
+            'queueing_delay': ((totals['delay_total'] - last['delay_total']) /
+                               1000.0 / delays if delays else None)})
+
+    def run(self):
+        start = time.time()
+        next_sample = self.interval
+        arrivals = arrival_times(self.profile, self.poisson)
+        due = next(arrivals, None)
+        while not self._stop_event.is_set():
+            if (due is None or due >= self.duration or
+                    self.offered == self.max_runs):
+                break
+            now = time.time() - start
+            if next_sample <= min(now, due):
+                self.sample(next_sample)
+                next_sample += self.interval
+            elif due <= now:
+                self.queue.put(start + due)
+                self.offered += 1
+                due = next(arrivals, None)
+            else:
+                self._stop_event.wait(min(due, next_sample) - now)
+        # The workers exit once they got all the runs
+        for _ in self.statistics:
+            self.queue.put(None)
+        self.sample(min(time.time() - start, self.duration))
+
+    def report(self):
+        """Returns the lines of the report of the run."""
+        lines = ['%s: offered %d runs' % (self.action, self.offered)]
+        for sample in self.samples:
+            delay = sample['queueing_delay']
+            lines.append(
+                '  %8.1fs: offered %.2f runs/s, achieved %.2f runs/s, '
+                '%d errors (%.1f%%), queueing delay %s' % (
+                    sample['seconds'], sample['offered'], sample['achieved'],
+                    sample['errors'], sample['error_rate'] * 100,
+                    'n/a' if delay is None else '%.1f ms' % delay))
+        return lines
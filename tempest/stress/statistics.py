@@ -0,0 +1,146 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Statistics of the stress worker processes, in shared memory.
+
+Each worker process counts its runs and failures, and records the latency
+of its runs in a histogram, in arrays shared with the parent process. The
+worker is their only writer, so they are updated without locking or IPC,
+and the parent reads them at any time, even once the worker was killed.
+"""
+
+import collections
+import ctypes
+import multiprocessing
+
+from tempest.common import api_latency
+
+# Latencies up to 2 ** 36 microseconds, that is 19 hours, have a bucket
+MAX_BUCKETS = 30 << api_latency.SUB_BUCKET_BITS
+
+_COUNTERS = ('runs', 'fails')
+_HISTOGRAM_COUNTERS = ('count', 'total', 'min', 'max')
+
+
+class SharedHistogram(object):
+    """Latency histogram, in microseconds, in shared memory."""
+
+    def __init__(self):
+        self._counters = multiprocessing.RawArray(ctypes.c_int64,
+                                                  len(_HISTOGRAM_COUNTERS))
+        self._buckets = multiprocessing.RawArray(ctypes.c_int64, MAX_BUCKETS)
+
+    def __getitem__(self, key):
+        return self._counters[_HISTOGRAM_COUNTERS.index(key)]
+
+    def __setitem__(self, key, value):
+        self._counters[_HISTOGRAM_COUNTERS.index(key)] = value
+
+    def record(self, seconds):
+        value = max(int(seconds * 1000000), 0)
+        bucket = min(api_latency.bucket_index(value), MAX_BUCKETS - 1)
+        self._buckets[bucket] += 1
+        if not self['count'] or value < self['min']:
+            self['min'] = value
+        if value > self['max']:
+            self['max'] = value
+        self['total'] += value
+        self['count'] += 1
+
+    def histogram(self):
+        """Returns a copy of the histogram."""
+        histogram = api_latency.Histogram()
+        histogram.counts = dict((bucket, count) for bucket, count
+                                in enumerate(self._buckets) if count)
+        histogram.count = self['count']
+        histogram.total = self['total']
+        if histogram.count:
+            histogram.min = self['min']
+            histogram.max = self['max']
+        return histogram
+
+
+class SharedStatistic(object):
+    """Counters and latency histograms of the runs of a worker process.
+
+    The runs and fails counters are accessed like the keys of a dict. The
+    queueing delay of the runs is only recorded in open loop mode, see
+    open_loop.
+    """
+
+    def __init__(self):
+        self._counters = multiprocessing.RawArray(ctypes.c_int64,
+                                                  len(_COUNTERS))
+        self.latency = SharedHistogram()
+        self.delay = SharedHistogram()
+
+    def __getitem__(self, key):
+        return self._counters[_COUNTERS.index(key)]
+
+    def __setitem__(self, key, value):
+        self._counters[_COUNTERS.index(key)] = value
+
+    def record(self, seconds, delay=None):
+        """Records the latency, and queueing delay, of a run."""
+        self.latency.record(seconds)
+        if delay is not None:
+            self.delay.record(delay)
+
+    def histogram(self):
+        """Returns a copy of the latency histogram."""
+        return self.latency.histogram()
+
+
+def _ms(microseconds):
+    if microseconds is None:
+        return None
+    return microseconds / 1000.0
+
+
+def summarize(processes, seconds):
+    """Aggregates the statistics of the worker processes per action.
+
+    :param processes: the processes of the driver, with their action and
+                      SharedStatistic
+    :param seconds: duration of the run
+    :returns: list of dicts of the action, runs, fails, throughput in runs
+              per second, and p50, p95 and p99 latencies in milliseconds
+    """
+    actions = collections.OrderedDict()
+    for process in processes:
+        action = actions.setdefault(process['action'], {
+            'runs': 0, 'fails': 0, 'histogram': api_latency.Histogram()})
+        statistic = process['statistic']
+        action['runs'] += statistic['runs']
+        action['fails'] += statistic['fails']
+        action['histogram'].merge(statistic.histogram())
+    summary = []
+    for name, action in actions.items():
+        histogram = action.pop('histogram')
+        action.update({'action': name,
+                       'throughput': (action['runs'] / float(seconds)
+                                      if seconds > 0 else 0.0),
+                       'p50': _ms(histogram.percentile(50)),
+                       'p95': _ms(histogram.percentile(95)),
+                       'p99': _ms(histogram.percentile(99))})
+        summary.append(action)
+    return summary
+
+
+def format_action(action):
+    """Returns a line of the summary of an action."""
+    latencies = ', '.join(
+        '%s %s' % (key, 'n/a' if action[key] is None
+                   else '%.1f ms' % action[key])
+        for key in ('p50', 'p95', 'p99'))
+    return ('%(action)s: %(runs)d runs (%(fails)d failed), '
+            '%(throughput).2f runs/s, latency ' % action + latencies)
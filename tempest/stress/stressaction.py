@@ -15,11 +15,14 @@
 import abc
 import signal
 import sys
+import time
 
 import six
 
 from oslo_log import log as logging
 
+from tempest.common import api_latency
+
 
 @six.add_metaclass(abc.ABCMeta)
 class StressAction(object):
@@ -61,31 +64,58 @@ class StressAction(object):
         """
         self.logger.debug("tearDown")
 
-    def execute(self, shared_statistic):
+    def execute(self, shared_statistic, arrivals=None):
         """This is the main execution entry point called
         by the driver.   We register a signal handler to
         allow us to tearDown gracefully, and then exit.
         We also keep track of how many runs we do.
+
+        In open loop mode, arrivals is the queue of the times the runs are
+        due, see open_loop.
         """
         signal.signal(signal.SIGHUP, self._shutdown_handler)
         signal.signal(signal.SIGTERM, self._shutdown_handler)
 
-        while self.max_runs is None or (shared_statistic['runs'] <
-                                        self.max_runs):
-            self.logger.debug("Trigger new run (run %d)" %
-                              shared_statistic['runs'])
-            try:
-                self.run()
-            except Exception:
-                shared_statistic['fails'] += 1
-                self.logger.exception("Failure in run")
-            finally:
-                shared_statistic['runs'] += 1
-                if self.stop_on_error and (shared_statistic['fails'] > 1):
-                    self.logger.warn("Stop process due to"
-                                     "\"stop-on-error\" argument")
-                    self.tearDown()
-                    sys.exit(1)
+        try:
+            self._execute(shared_statistic, arrivals)
+        finally:
+            # The worker processes exit without running the atexit handlers
+            api_latency.dump()
+
+    def _execute(self, shared_statistic, arrivals=None):
+        while True:
+            if arrivals is None:
+                if (self.max_runs is not None and
+                        shared_statistic['runs'] >= self.max_runs):
+                    break
+                due = None
+            else:
+                due = arrivals.get()
+                if due is None:
+                    break
+            self._run_once(shared_statistic, due)
+
+    def _run_once(self, shared_statistic, due=None):
+        self.logger.debug("Trigger new run (run %d)" %
+                          shared_statistic['runs'])
+        start = time.time()
+        try:
+            self.run()
+        except Exception:
+            shared_statistic['fails'] += 1
+            self.logger.exception("Failure in run")
+        finally:
+            # A plain dict of the counters has no latency histogram
+            if hasattr(shared_statistic, 'record'):
+                shared_statistic.record(
+                    time.time() - start,
+                    delay=None if due is None else max(start - due, 0))
+            shared_statistic['runs'] += 1
+            if self.stop_on_error and (shared_statistic['fails'] > 1):
+                self.logger.warn("Stop process due to"
+                                 "\"stop-on-error\" argument")
+                self.tearDown()
+                sys.exit(1)
 
     @abc.abstractmethod
     def run(self):
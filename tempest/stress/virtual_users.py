@@ -0,0 +1,234 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Virtual users running a stress action in a few worker processes.
+
+By default each thread of an action is a worker process, with its own
+clients. An action given a number of "virtual_users" in the test
+description is instead run by that many virtual users, spread over a few
+worker processes ([stress]/virtual_user_processes, or "processes")::
+
+    {"action": "tempest.stress.actions.unit_test.UnitTest",
+     "kwargs": {"test_method": "..."},
+     "virtual_users": 2000,
+     "processes": 4,
+     "use_isolated_tenants": true,
+     "tenants": 20,
+     "ramp_up": 60}
+
+Each worker process creates the clients of its tenants and sets the action
+up once per tenant, and each of its virtual users runs a shallow copy of
+the action of its tenant in closed loop: the users of a tenant share its
+clients, and so its token. The HTTP connections of a worker process are
+pooled, see http_pool, whatever [http]/connection_pool is. The driver waits
+for the worker processes to be set up before starting the run.
+
+The virtual users of a process are native threads with a small stack, or
+green threads when [stress]/virtual_user_backend is 'green', which
+requires eventlet. The worker process then monkey patches the standard
+library before creating any client, so that their locks and thread local
+connections, and the per process pool and governor, are green ones. The
+module locks created before the patch, like that of http_pool.get_pool,
+are never held across a call which could switch to another green thread,
+so they are safe to keep. The start of the users is spread over
+"ramp_up" seconds.
+"""
+
+import copy
+import signal
+import sys
+import threading
+import time
+
+from oslo_log import log as logging
+from oslo_utils import importutils
+import six
+
+from tempest import clients
+from tempest.common import api_latency
+from tempest import config
+from tempest import exceptions
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+# Stack size of the native threads of the virtual users
+THREAD_STACK_SIZE = 512 * 1024
+
+
+class UserStatistic(object):
+    """Counters of a virtual user, added to those of its process.
+
+    The SharedStatistic of the process is updated under a lock, since its
+    virtual users run concurrently.
+    """
+
+    def __init__(self, statistic, lock):
+        self.statistic = statistic
+        self.lock = lock
+        self.counts = {'runs': 0, 'fails': 0}
+
+    def __getitem__(self, key):
+        return self.counts[key]
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            self.statistic[key] += value - self.counts[key]
+        self.counts[key] = value
+
+    def record(self, seconds, delay=None):
+        with self.lock:
+            self.statistic.record(seconds, delay)
+
+
+def split(users, processes):
+    """Returns the number of virtual users of each process."""
+    processes = max(min(processes, users), 1)
+    return [users // processes + (1 if i < users % processes else 0)
+            for i in range(processes)]
+
+
+class VirtualUsers(object):
+    """The virtual users of a worker process.
+
+    :param action_class: StressAction class of the action
+    :param credentials: credentials of the tenants the users are spread
+                        over, None for the default credentials
+    :param users: number of virtual users
+    :param statistic: SharedStatistic of the process
+    :param kwargs: arguments of the setUp of the action
+    :param use_admin: whether the default credentials are the admin ones
+    :param backend: 'thread' or 'green'
+    :param ramp_up: seconds over which the start of the users is spread
+    """
+
+    def __init__(self, action_class, credentials, users, statistic,
+                 kwargs=None, max_runs=None, stop_on_error=False,
+                 use_admin=False, backend='thread', ramp_up=0):
+        self.action_class = action_class
+        self.credentials = credentials
+        self.users = users
+        self.statistic = statistic
+        self.kwargs = kwargs or {}
+        self.max_runs = max_runs
+        self.stop_on_error = stop_on_error
+        self.use_admin = use_admin
+        self.backend = backend
+        self.ramp_up = ramp_up
+        self.actions = []
+
+    def _manager(self, credentials):
+        if credentials is not None:
+            return clients.Manager(credentials=credentials)
+        if self.use_admin:
+            return clients.AdminManager()
+        return clients.Manager()
+
+    def set_up(self):
+        """Creates the clients of the tenants, and sets the action up."""
+        # The users of a tenant share its clients, whose plain httplib2
+        # connections cannot be used by two threads at a time. Only the
+        # configuration of this worker process is changed
+        CONF.set_override('connection_pool', True, group='http')
+        for credentials in self.credentials:
+            manager = self._manager(credentials)
+            action = self.action_class(manager, self.max_runs,
+                                       self.stop_on_error)
+            self.actions.append(action)
+            action.setUp(**dict(six.iteritems(self.kwargs)))
+            # Once per tenant, rather than by all its users at once
+            try:
+                manager.auth_provider.set_auth()
+            except Exception:
+                LOG.exception('Cannot authenticate the virtual users')
+
+    def _run_user(self, index, lock):
+        if self.ramp_up:
+            time.sleep(self.ramp_up * index / float(self.users))
+        action = copy.copy(self.actions[index % len(self.actions)])
+        try:
+            action._execute(UserStatistic(self.statistic, lock))
+        except SystemExit:
+            # Stopped on error, the driver stops the other processes
+            pass
+
+    def _run_green(self, eventlet):
+        lock = threading.Lock()
+        pool = eventlet.GreenPool(self.users)
+        for index in range(self.users):
+            pool.spawn(self._run_user, index, lock)
+        pool.waitall()
+
+    def _run_threads(self):
+        lock = threading.Lock()
+        stack_size = threading.stack_size(THREAD_STACK_SIZE)
+        try:
+            threads = [threading.Thread(target=self._run_user,
+                                        args=(index, lock))
+                       for index in range(self.users)]
+            for thread in threads:
+                thread.daemon = True
+                thread.start()
+        finally:
+            threading.stack_size(stack_size)
+        for thread in threads:
+            # The signal handlers, and so the tearDown of the actions, only
+            # run once a join without timeout returns
+            while thread.is_alive():
+                thread.join(1)
+
+    def run(self, ready=None):
+        """Sets the action up and runs the virtual users.
+
+        :param ready: connection the name of the action is sent to once
+                      set up, or None if it could not be
+        """
+        eventlet = None
+        try:
+            if self.backend == 'green':
+                eventlet = importutils.try_import('eventlet')
+                if eventlet is None:
+                    raise exceptions.InvalidConfiguration(
+                        'The green virtual users require eventlet')
+                eventlet.monkey_patch()
+            self.set_up()
+        except Exception:
+            LOG.exception('Cannot set up the virtual users')
+            if ready is not None:
+                ready.send(None)
+            raise
+        if ready is not None:
+            ready.send(self.actions[0].action)
+            ready.close()
+        if eventlet is not None:
+            self._run_green(eventlet)
+        else:
+            self._run_threads()
+
+    def _shutdown_handler(self, signum, frame):
+        for action in self.actions:
+            try:
+                action.tearDown()
+            except Exception:
+                LOG.exception("Error while tearDown")
+        api_latency.dump()
+        sys.exit(0)
+
+    def execute(self, ready=None):
+        """The entry point of the worker process, see run."""
+        signal.signal(signal.SIGHUP, self._shutdown_handler)
+        signal.signal(signal.SIGTERM, self._shutdown_handler)
+        try:
+            self.run(ready)
+        finally:
+            # The worker processes exit without running the atexit handlers
+            api_latency.dump()
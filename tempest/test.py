@@ -29,11 +29,13 @@ from oslo_utils import importutils
 import six
 import testscenarios
 import testtools
+from testtools import content
 
 from tempest import clients
 from tempest.common import credentials
 from tempest.common import fixed_network
 import tempest.common.generator.valid_generator as valid
+from tempest.common import timelines
 import tempest.common.validation_resources as vresources
 from tempest import config
 from tempest import exceptions
@@ -342,6 +344,9 @@ class BaseTestCase(testtools.testcase.WithAttributes,
         setup_credentials and defined the required resources before super
         is invoked.
         """
+        if cls.credentials:
+            cred_provider = cls._get_credentials_provider()
+            cred_provider.prefetch_credentials(cls.credentials)
         for credentials_type in cls.credentials:
             # This may raise an exception in case credentials are not available
             # In that case we want to let the exception through and the test
@@ -427,6 +432,15 @@ class BaseTestCase(testtools.testcase.WithAttributes,
             self.useFixture(fixtures.LoggerFixture(nuke_handlers=False,
                                                    format=self.log_format,
                                                    level=None))
+        if CONF.waiter.record_timelines:
+            self.addCleanup(self._attach_waiter_timelines)
+
+    def _attach_waiter_timelines(self):
+        """Attaches the timelines recorded by the waiters to the result."""
+        records = timelines.pop_records()
+        if records:
+            self.addDetail(timelines.DETAIL_NAME,
+                           content.json_content(records))
 
     @property
     def credentials_provider(self):
@@ -0,0 +1,57 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+
+import fixtures
+
+from tempest.cmd import latency_report
+from tempest.common import api_latency
+from tempest.tests import base
+
+
+class TestLatencyReport(base.TestCase):
+
+    def setUp(self):
+        super(TestLatencyReport, self).setUp()
+        self.stats_dir = self.useFixture(fixtures.TempDir()).path
+        # The histograms of two workers
+        for pid, seconds in ((1, 0.1), (2, 0.3)):
+            recorder = api_latency.Recorder()
+            for _ in range(10):
+                recorder.record('compute', 'GET', 'servers/1', 200, seconds)
+            recorder.record('image', 'DELETE', '/v2/images/2', 204, 0.01)
+            recorder.dump(os.path.join(self.stats_dir,
+                                       'latency-%d.json' % pid))
+
+    def test_summarize(self):
+        histograms = api_latency.load(
+            latency_report.find_files([self.stats_dir]))
+        summary = latency_report.summarize(histograms)
+        self.assertEqual(['servers/{id}', '/v2/images/{id}'],
+                         [row['url'] for row in summary])
+        servers = summary[0]
+        self.assertEqual(20, servers['count'])
+        self.assertAlmostEqual(4000, servers['total'])
+        self.assertAlmostEqual(100, servers['p50'], delta=1)
+        self.assertAlmostEqual(300, servers['p95'], delta=3)
+        self.assertEqual(300, servers['max'])
+        self.assertEqual(1, len(latency_report.summarize(histograms,
+                                                         top=1)))
+
+    def test_format_summary(self):
+        histograms = api_latency.load(
+            latency_report.find_files([self.stats_dir]))
+        lines = latency_report.format_summary(
+            latency_report.summarize(histograms)).splitlines()
+        self.assertEqual(3, len(lines))
+        self.assertIn('servers/{id}', lines[1])
@@ -0,0 +1,61 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import io
+
+from oslo_serialization import jsonutils as json
+import subunit
+
+from tempest.cmd import waiter_report
+from tempest.common import timelines
+from tempest.tests import base
+
+
+class TestWaiterReport(base.TestCase):
+
+    def _record(self, resource_id, *states):
+        return {'resource_type': 'server', 'resource_id': resource_id,
+                'start_time': 0, 'duration': states[-1][0], 'polls': 3,
+                'request_time': 0.3, 'states': [list(s) for s in states]}
+
+    def _stream(self, records):
+        stream = io.BytesIO()
+        output = subunit.StreamResultToBytes(stream)
+        data = json.dumps(records).encode('utf-8')
+        output.status(test_id='fake.test', test_status='inprogress')
+        output.status(test_id='fake.test', file_name=timelines.DETAIL_NAME,
+                      file_bytes=data[:10], mime_type='application/json')
+        output.status(test_id='fake.test', file_name=timelines.DETAIL_NAME,
+                      file_bytes=data[10:], eof=True)
+        output.status(test_id='fake.test', test_status='success')
+        stream.seek(0)
+        return stream
+
+    def test_read_records(self):
+        records = [self._record('s1', (0, 'BUILD', 'spawning'),
+                                (5, 'ACTIVE', None))]
+        self.assertEqual(records,
+                         waiter_report.read_records([self._stream(records)]))
+
+    def test_summarize(self):
+        records = [self._record('s%d' % i, (0, 'BUILD', 'spawning'),
+                                (i, 'ACTIVE', None))
+                   for i in range(1, 21)]
+        summary = dict((row['state'], row)
+                       for row in waiter_report.summarize(records))
+        build = summary['BUILD/spawning']
+        self.assertEqual(20, build['count'])
+        self.assertEqual(10, build['p50'])
+        self.assertEqual(19, build['p95'])
+        self.assertEqual(20, build['max'])
+        self.assertEqual(60, summary['polls']['total'])
+        self.assertNotIn('ACTIVE/None', summary)
@@ -14,7 +14,9 @@
 
 import hashlib
 import os
+import threading
 
+import fixtures
 import mock
 from oslo_concurrency.fixture import lockutils as lockutils_fixtures
 from oslo_concurrency import lockutils
@@ -284,6 +286,39 @@ class TestAccount(base.TestCase):
         for i in admin_hashes:
             self.assertNotIn(i, args)
 
+    def test_get_hash_invalid_creds(self):
+        test_account_class = accounts.Accounts('v2', 'test_name')
+        test_creds = auth.get_credentials(fake_identity.FAKE_AUTH_URL,
+                                          username='test_user1',
+                                          tenant_name='test_tenant1',
+                                          password='wrong')
+        self.assertRaises(AttributeError, test_account_class.get_hash,
+                          test_creds)
+
+    def test_get_hash_with_default_domain(self):
+        test_account_class = accounts.Accounts('v2', 'test_name')
+        hash_list = self._get_hash_list(self.test_accounts)
+        test_creds = mock.Mock(
+            username='test_user2', tenant_name='test_tenant2', password='p',
+            user_domain_name=cfg.CONF.auth.default_credentials_domain_name)
+        test_creds.get_init_attributes.return_value = [
+            'username', 'tenant_name', 'password', 'user_domain_name']
+        self.assertEqual(hash_list[1], test_account_class.get_hash(test_creds))
+
+    def test_get_match_hash_list_is_cached(self):
+        test_accounts_class = accounts.Accounts('v2', 'test_name')
+        hash_list = self._get_hash_list(self.test_accounts)
+        hashes = test_accounts_class._get_match_hash_list(['role1', 'role2'])
+        self.assertEqual(sorted([hash_list[5], hash_list[8], hash_list[9]]),
+                         sorted(hashes))
+        self.assertIs(hashes, test_accounts_class._get_match_hash_list(
+            ['role2', 'role1']))
+        # A missing role is reported on every request
+        for _ in range(2):
+            self.assertRaises(exceptions.InvalidConfiguration,
+                              test_accounts_class._get_match_hash_list,
+                              ['role1', 'fake_role'])
+
     def test_networks_returned_with_creds(self):
         test_accounts = [
             {'username': 'test_user13', 'tenant_name': 'test_tenant13',
@@ -335,3 +370,105 @@ class TestNotLockingAccount(base.TestCase):
         self.assertRaises(exceptions.InvalidConfiguration,
                           test_accounts_class.get_creds_by_roles,
                           ['fake_role'])
+
+
+class TestAccountAllocator(base.TestCase):
+
+    def setUp(self):
+        super(TestAccountAllocator, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'test_accounts.db')
+        admin_role = cfg.CONF.identity.admin_role
+        self.hash_dict = {
+            'creds': dict((name, {'username': name})
+                          for name in ('user1', 'user2', 'roles1', 'roles2',
+                                       'admin')),
+            'roles': {'role1': ['roles1', 'roles2'], 'role2': ['roles2'],
+                      admin_role: ['admin']},
+            'networks': {}}
+        self.allocator = accounts.AccountAllocator(self.path, self.hash_dict)
+
+    def test_claim_excludes_admin(self):
+        claimed = [self.allocator.claim(name='test') for _ in range(4)]
+        self.assertEqual(['roles1', 'roles2', 'user1', 'user2'],
+                         sorted(claimed))
+        cfg.CONF.set_default('test_accounts_wait_timeout', 0, group='auth')
+        self.assertRaises(exceptions.InvalidConfiguration,
+                          self.allocator.claim, name='test')
+
+    def test_claim_by_roles(self):
+        self.assertEqual('roles2',
+                         self.allocator.claim(['role1', 'role2'], 'test'))
+        self.assertEqual('roles1', self.allocator.claim(['role1'], 'test'))
+        self.assertEqual(
+            'admin', self.allocator.claim([cfg.CONF.identity.admin_role]))
+
+    def test_claims_are_shared_between_allocators(self):
+        other = accounts.AccountAllocator(self.path, self.hash_dict)
+        self.assertEqual('roles2',
+                         self.allocator.claim(['role2'], 'worker1'))
+        cfg.CONF.set_default('test_accounts_wait_timeout', 0, group='auth')
+        exc = self.assertRaises(exceptions.InvalidConfiguration,
+                                other.claim, ['role2'], 'worker2')
+        self.assertIn('worker1', str(exc))
+        self.allocator.release('roles2')
+        self.assertEqual('roles2', other.claim(['role2'], 'worker2'))
+
+    def test_accounts_written_once(self):
+        with mock.patch.object(accounts.AccountAllocator, '_fill') as fill:
+            accounts.AccountAllocator(self.path, self.hash_dict)
+        self.assertFalse(fill.called)
+
+    def test_roles_changed(self):
+        self.hash_dict['roles']['role2'] = ['roles1']
+        other = accounts.AccountAllocator(self.path, self.hash_dict)
+        self.assertEqual('roles1', other.claim(['role2'], 'test'))
+
+    def test_claim_waits_for_release(self):
+        self.allocator.claim(['role2'], 'test')
+        threading.Timer(0.1, self.allocator.release, ['roles2']).start()
+        self.assertEqual('roles2', self.allocator.claim(['role2'], 'test'))
+
+    def test_older_request_is_served_first(self):
+        account_hash, ticket = self.allocator._try_claim(['role2'], 'old',
+                                                         None)
+        self.assertEqual('roles2', account_hash)
+        account_hash, ticket = self.allocator._try_claim(['role2'], 'old',
+                                                         None)
+        self.assertIsNone(account_hash)
+        self.allocator.release('roles2')
+        # The new request has to wait for the ticket of the old one
+        self.assertIsNone(self.allocator._try_claim(['role2'], 'new',
+                                                    None)[0])
+        self.assertEqual('roles2', self.allocator._try_claim(['role2'], 'old',
+                                                             ticket)[0])
+
+    def test_accounts_of_dead_workers_are_reclaimed(self):
+        self.allocator.claim(['role2'], 'dead')
+        cfg.CONF.set_default('test_accounts_wait_timeout', 0, group='auth')
+        self.useFixture(mockpatch.Patch(
+            'tempest.common.accounts._pid_alive', return_value=False))
+        self.assertEqual('roles2', self.allocator.claim(['role2'], 'test'))
+
+    def test_accounts_get_creds_with_allocator(self):
+        cfg.CONF.set_default('test_accounts_allocator', 'database',
+                             group='auth')
+        cfg.CONF.set_default('test_accounts_file', 'fake_path', group='auth')
+        self.useFixture(mockpatch.Patch('os.path.isfile', return_value=True))
+        self.useFixture(mockpatch.Patch(
+            'tempest.common.accounts.read_accounts_yaml',
+            return_value=[{'username': 'user1', 'tenant_name': 'tenant1',
+                           'password': 'p'}]))
+        self.useFixture(mockpatch.Patch(
+            'oslo_concurrency.lockutils.get_lock_path',
+            return_value=os.path.dirname(self.path)))
+        wrap_mock = self.useFixture(mockpatch.PatchObject(
+            accounts.Accounts, '_wrap_creds_with_network')).mock
+        test_accounts_class = accounts.Accounts('v2', 'test_name')
+        self.assertIsNotNone(test_accounts_class.allocator)
+        test_accounts_class.get_primary_creds()
+        free_hash = wrap_mock.call_args[0][0]
+        self.assertIn(free_hash, test_accounts_class.hash_dict['creds'])
+        self.assertEqual(['test_name'],
+                         test_accounts_class.allocator.owners())
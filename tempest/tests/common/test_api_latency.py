@@ -0,0 +1,134 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import socket
+
+import fixtures
+import httplib2
+import mock
+from oslo_config import cfg
+from oslotest import mockpatch
+
+from tempest.common import api_latency
+from tempest.common import service_client
+from tempest.tests import base
+from tempest.tests import fake_auth_provider
+from tempest.tests import fake_config
+
+
+class TestHistogram(base.TestCase):
+    def test_percentiles(self):
+        histogram = api_latency.Histogram()
+        for value in range(1, 10001):
+            histogram.record(value)
+        self.assertEqual(10000, histogram.count)
+        self.assertEqual(1, histogram.min)
+        self.assertEqual(10000, histogram.max)
+        for percent in (50, 95, 99):
+            expected = percent * 100
+            self.assertAlmostEqual(expected, histogram.percentile(percent),
+                                   delta=expected / 100.0)
+        self.assertEqual(1, histogram.percentile(0))
+        self.assertEqual(10000, histogram.percentile(100))
+        self.assertIsNone(api_latency.Histogram().percentile(50))
+
+    def test_small_values_are_exact(self):
+        histogram = api_latency.Histogram()
+        for value in (3, 3, 100):
+            histogram.record(value)
+        self.assertEqual(3, histogram.percentile(50))
+        self.assertEqual(100, histogram.percentile(99))
+
+    def test_merge(self):
+        first, second = api_latency.Histogram(), api_latency.Histogram()
+        for value in range(1, 101):
+            first.record(value)
+            second.record(value * 1000)
+        first.merge(api_latency.Histogram.from_dict(second.to_dict()))
+        self.assertEqual(200, first.count)
+        self.assertEqual(1, first.min)
+        self.assertEqual(100000, first.max)
+        self.assertEqual(100, first.percentile(50))
+        self.assertAlmostEqual(50000, first.percentile(75), delta=500)
+
+
+class TestRecorder(base.TestCase):
+    def setUp(self):
+        super(TestRecorder, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.useFixture(fixtures.MonkeyPatch(
+            'tempest.common.api_latency._recorder', None))
+        self.stats_dir = self.useFixture(fixtures.TempDir()).path
+        cfg.CONF.set_default('latency_stats_dir', self.stats_dir,
+                             group='http')
+        self.useFixture(mockpatch.Patch('atexit.register'))
+
+    def test_url_template(self):
+        self.assertEqual(
+            '/v2.1/{id}/servers/{id}/action',
+            api_latency.url_template(
+                'http://fake_url.com/v2.1/2f4aa8ae71a546a2b6e8d3a0a6c2d39b/'
+                'servers/9d1b8f0c-3a34-4d2b-9c5e-0d4f41e7b5a2/action?a=b'))
+        self.assertEqual('os-quota-sets/{id}/detail',
+                         api_latency.url_template('os-quota-sets/12/detail'))
+        self.assertEqual(
+            '/v1/AUTH_{id}/{name}/{name}',
+            api_latency.url_template(
+                '/v1/AUTH_2f4aa8ae71a546a2b6e8d3a0a6c2d39b/'
+                'TestContainer-1308607012/tempest-object-154876201.txt'))
+        self.assertEqual('/v2.1/os-keypairs/{name}',
+                         api_latency.url_template(
+                             '/v2.1/os-keypairs/keypair-21-1308607012'))
+        self.assertEqual('/v2/images/cirros-0.3.4',
+                         api_latency.url_template('/v2/images/cirros-0.3.4'))
+
+    def test_query_template(self):
+        self.assertEqual('name={name}&limit={id}',
+                         api_latency.query_template(
+                             '/v2/servers?name=server-1308607012&limit=10'))
+        self.assertEqual('', api_latency.query_template('/v2/servers'))
+
+    def test_service_client_requests_recorded(self):
+        client = service_client.ServiceClient(
+            fake_auth_provider.FakeAuthProvider(), 'compute', 'regionOne')
+        client.http_obj = mock.Mock()
+        client.http_obj.request.side_effect = [
+            (httplib2.Response({'status': 200}), '{}'),
+            (httplib2.Response({'status': 200}), '{}'),
+            socket.timeout()]
+        for server_id in ('1', '2'):
+            client.raw_request('http://fake_url.com/servers/%s' % server_id,
+                               'GET')
+        self.assertRaises(socket.timeout, client.raw_request,
+                          'http://fake_url.com/servers/3', 'GET')
+        histograms = api_latency.get_recorder().histograms
+        self.assertEqual(2, histograms[('compute', 'GET', '/servers/{id}',
+                                        '200')].count)
+        self.assertEqual(1, histograms[('compute', 'GET', '/servers/{id}',
+                                        'error')].count)
+
+    def test_dump_and_load(self):
+        api_latency.record('compute', 'GET', 'servers', 200, 0.5)
+        api_latency.dump()
+        path = os.path.join(self.stats_dir, 'latency-%d.json' % os.getpid())
+        histograms = api_latency.load([path, path])
+        histogram = histograms[('compute', 'GET', 'servers', '200')]
+        self.assertEqual(2, histogram.count)
+        self.assertEqual(500000, histogram.max)
+
+    def test_not_recording(self):
+        cfg.CONF.set_default('latency_stats_dir', None, group='http')
+        self.assertIsNone(api_latency.get_recorder())
+        api_latency.record('compute', 'GET', 'servers', 200, 0.5)
+        api_latency.dump()
+        self.assertEqual([], os.listdir(self.stats_dir))
@@ -0,0 +1,172 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+
+import fixtures
+import httplib2
+import mock
+from oslo_config import cfg
+from oslotest import mockpatch
+import six
+from six.moves import http_client as httplib
+from tempest_lib import auth
+
+from tempest.common import cassette
+from tempest.common import glance_http
+from tempest.common import service_client
+from tempest import exceptions
+from tempest import manager
+from tempest.tests import base
+from tempest.tests import fake_auth_provider
+from tempest.tests import fake_config
+from tempest.tests import fake_http
+from tempest.tests import fake_identity
+
+
+class TestCassette(base.TestCase):
+    def setUp(self):
+        super(TestCassette, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'cassette')
+        cfg.CONF.set_default('cassette_path', self.path, group='http')
+        self.fake_auth = fake_auth_provider.FakeAuthProvider()
+
+    def _set_mode(self, mode):
+        cfg.CONF.set_default('cassette_mode', mode, group='http')
+        self.useFixture(fixtures.MonkeyPatch(
+            'tempest.common.cassette._cassette', None))
+
+    def _service_client(self):
+        return service_client.ServiceClient(self.fake_auth, 'compute',
+                                            'regionOne')
+
+    def test_service_client_record_and_replay(self):
+        self._set_mode('record')
+        client = self._service_client()
+        client.http_obj.http = mock.Mock()
+        client.http_obj.http.request.side_effect = [
+            (httplib2.Response({'status': 200}), '{"status": "BUILD"}'),
+            (httplib2.Response({'status': 200}), '{"status": "ACTIVE"}'),
+            (httplib2.Response({'status': 404}), b'\xff')]
+        url = 'http://fake_url.com/v2/servers/fake'
+        for _ in range(2):
+            client.raw_request(url, 'GET')
+        client.raw_request('http://fake_url.com/v2/servers/gone', 'GET')
+
+        self._set_mode('replay')
+        client = self._service_client()
+        self.assertIsInstance(client.http_obj, cassette.ReplayHttp)
+        # Replayed from another endpoint, in order, repeating the last one
+        url = 'http://other_url.com/v2/servers/fake'
+        for status in ('BUILD', 'ACTIVE', 'ACTIVE'):
+            resp, body = client.raw_request(url, 'GET')
+            self.assertEqual(200, resp.status)
+            self.assertEqual('{"status": "%s"}' % status, body)
+        resp, body = client.raw_request('http://fake_url.com/v2/servers/gone',
+                                        'GET')
+        self.assertEqual((404, b'\xff'), (resp.status, body))
+        self.assertRaises(exceptions.CassetteMiss, client.raw_request,
+                          url, 'DELETE')
+
+    def test_replay_latency(self):
+        cfg.CONF.set_default('cassette_replay_latency', True, group='http')
+        self._set_mode('record')
+        cassette.get_cassette().record('compute', 'GET', 'servers', 200, {},
+                                       '', 0.25)
+        self._set_mode('replay')
+        with mock.patch('time.sleep') as sleep:
+            cassette.get_cassette().play('compute', 'GET', 'servers')
+        sleep.assert_called_once_with(0.25)
+
+    def test_replay_new_names(self):
+        self._set_mode('record')
+        cassette.get_cassette().record(
+            'object-storage', 'GET',
+            'http://fake_url.com/v1/AUTH_%s/TestContainer-1308607012'
+            '?format=json&marker=obj-154876201' % ('a' * 32),
+            200, {}, '[]', 0.1)
+        self._set_mode('replay')
+        interaction = cassette.get_cassette().play(
+            'object-storage', 'GET',
+            'http://other_url.com/v1/AUTH_%s/TestContainer-2093877127'
+            '?format=json&marker=obj-4387211' % ('b' * 32))
+        self.assertEqual(b'[]', interaction['body'])
+
+    def test_replay_per_test(self):
+        def test_first(cassette, status):
+            cassette.record('compute', 'GET', 'servers', status, {}, '', 0.1)
+
+        def test_second(cassette, status):
+            cassette.record('compute', 'GET', 'servers', status, {}, '', 0.1)
+
+        self._set_mode('record')
+        # Interleaved, as by concurrent workers
+        test_first(cassette.get_cassette(), 200)
+        test_second(cassette.get_cassette(), 404)
+        test_first(cassette.get_cassette(), 202)
+
+        def test_first(cassette):
+            return [cassette.play('compute', 'GET', 'servers')['status']
+                    for _ in range(2)]
+
+        def test_second(cassette):
+            return cassette.play('compute', 'GET', 'servers')['status']
+
+        self._set_mode('replay')
+        self.assertEqual(404, test_second(cassette.get_cassette()))
+        self.assertEqual([200, 202], test_first(cassette.get_cassette()))
+        self.assertRaises(exceptions.CassetteMiss,
+                          cassette.get_cassette().play, 'compute', 'GET',
+                          'servers')
+
+    def test_glance_record_and_replay(self):
+        self._set_mode('record')
+        self.fake_auth.base_url = mock.MagicMock(
+            return_value='http://fake_url.com')
+        responses = [
+            fake_http.fake_httplib({'content-type': 'application/json'},
+                                   body=six.StringIO('{"id": "fake"}')),
+            fake_http.fake_httplib(
+                {'content-type': 'application/octet-stream'},
+                body=six.StringIO('image data'))]
+        self.useFixture(mockpatch.PatchObject(httplib.HTTPConnection,
+                                              'request'))
+        self.useFixture(mockpatch.PatchObject(
+            httplib.HTTPConnection, 'getresponse', side_effect=responses))
+        client = glance_http.HTTPClient(self.fake_auth, {})
+        client.json_request('GET', '/v2/images/fake')
+        resp, body = client.raw_request('GET', '/v2/images/fake/file')
+        self.assertEqual('image data', ''.join(body))
+
+        self._set_mode('replay')
+        client = glance_http.HTTPClient(self.fake_auth, {})
+        resp, body = client.json_request('GET', '/v2/images/fake')
+        self.assertEqual({'id': 'fake'}, body)
+        resp, body = client.raw_request('GET', '/v2/images/fake/file')
+        self.assertEqual(200, resp.status)
+        self.assertEqual('image data', b''.join(body).decode())
+        # No request was sent
+        self.assertEqual(2, httplib.HTTPConnection.request.call_count)
+
+    def test_auth_provider_replays(self):
+        open(self.path, 'w').close()
+        self._set_mode('replay')
+        cfg.CONF.set_default('uri', fake_identity.FAKE_AUTH_URL,
+                             group='identity')
+        credentials = auth.KeystoneV2Credentials(
+            username='fake_username', password='fake_password',
+            tenant_name='fake_tenant_name')
+        auth_provider = manager.get_auth_provider(credentials)
+        self.assertIsInstance(auth_provider.auth_client.http_obj,
+                              cassette.ReplayHttp)
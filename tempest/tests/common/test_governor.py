@@ -0,0 +1,155 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+import fixtures
+import httplib2
+import mock
+from oslo_config import cfg
+from oslotest import mockpatch
+
+from tempest.common import governor
+from tempest.common import service_client
+from tempest.tests import base
+from tempest.tests import fake_auth_provider
+from tempest.tests import fake_config
+
+
+def _response(status, **headers):
+    resp = httplib2.Response(headers)
+    resp.status = status
+    return resp
+
+
+class TestRetryAfter(base.TestCase):
+    def test_seconds(self):
+        self.assertEqual(2.0, governor.retry_after({'retry-after': '2'}))
+        self.assertIsNone(governor.retry_after({}))
+
+    def test_http_date(self):
+        with mock.patch('time.time', return_value=784111767.0):
+            self.assertEqual(10.0, governor.retry_after(
+                {'retry-after': 'Sun, 06 Nov 1994 08:49:37 GMT'}))
+            self.assertEqual(0.0, governor.retry_after(
+                {'retry-after': 'Sun, 06 Nov 1994 08:48:37 GMT'}))
+
+
+class TestEndpointLimiter(base.TestCase):
+    def test_rate(self):
+        limiter = governor.EndpointLimiter(0, 10)
+        with mock.patch('time.time', return_value=100.0), \
+                mock.patch('time.sleep') as sleep:
+            waits = [limiter.acquire() for _ in range(3)]
+        self.assertEqual([0.0, 0.1, 0.2], [round(w, 6) for w in waits])
+        self.assertEqual(2, sleep.call_count)
+
+    def test_pause(self):
+        limiter = governor.EndpointLimiter(0, 0)
+        with mock.patch('time.time', return_value=100.0), \
+                mock.patch('time.sleep') as sleep:
+            limiter.pause(5)
+            self.assertEqual(5.0, limiter.acquire())
+        sleep.assert_called_once_with(5.0)
+
+    def test_max_in_flight(self):
+        limiter = governor.EndpointLimiter(2, 0)
+        limiter.acquire()
+        limiter.acquire()
+        acquired = threading.Event()
+
+        def acquire():
+            limiter.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        self.assertFalse(acquired.wait(0.05))
+        limiter.release()
+        thread.join(5)
+        self.assertTrue(acquired.is_set())
+
+
+class TestGovernor(base.TestCase):
+    def setUp(self):
+        super(TestGovernor, self).setUp()
+        self.sleep = self.useFixture(mockpatch.Patch('time.sleep')).mock
+        self.governor = governor.Governor(retries=2, backoff=1.0)
+
+    def _request(self, method, responses, body=None):
+        send = mock.Mock(side_effect=[(resp, '') for resp in responses])
+        resp, _ = self.governor.request(method, 'http://fake/v2/servers',
+                                        body, send)
+        return resp, send.call_count
+
+    def test_retries_with_backoff(self):
+        with mock.patch('random.uniform', return_value=0.5) as uniform:
+            resp, sent = self._request('GET', [_response(503),
+                                               _response(429),
+                                               _response(200)])
+        self.assertEqual((200, 3), (resp.status, sent))
+        self.assertEqual([mock.call(0, 1.0), mock.call(0, 2.0)],
+                         uniform.call_args_list)
+        self.assertEqual(2, self.governor.stats()['retries'])
+        self.assertEqual(2, self.governor.stats()['overloaded'])
+
+    def test_retry_after_pauses_the_endpoint(self):
+        resp, sent = self._request('DELETE', [
+            _response(503, **{'retry-after': '3'}), _response(204)])
+        self.assertEqual((204, 2), (resp.status, sent))
+        self.assertAlmostEqual(3.0, self.sleep.call_args[0][0], places=1)
+
+    def test_gives_up(self):
+        resp, sent = self._request('GET', [_response(503)] * 3)
+        self.assertEqual((503, 3), (resp.status, sent))
+
+    def test_no_retry_of_post(self):
+        resp, sent = self._request('POST', [_response(503)])
+        self.assertEqual((503, 1), (resp.status, sent))
+
+    def test_retry_after_is_capped(self):
+        self.governor = governor.Governor(retries=1, max_backoff=10.0)
+        resp, sent = self._request('GET', [
+            _response(429, **{'retry-after': '86400'}), _response(200)])
+        self.assertEqual((200, 2), (resp.status, sent))
+        self.assertAlmostEqual(10.0, self.sleep.call_args[0][0], places=1)
+
+    def test_413_left_to_rest_client(self):
+        resp, sent = self._request('PUT', [
+            _response(413, **{'retry-after': '1'})])
+        self.assertEqual((413, 1), (resp.status, sent))
+        self.assertEqual(0, self.governor.stats()['overloaded'])
+        self.assertFalse(self.sleep.called)
+
+
+class TestServiceClientGovernor(base.TestCase):
+    def setUp(self):
+        super(TestServiceClientGovernor, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.useFixture(fixtures.MonkeyPatch(
+            'tempest.common.governor._governor', None))
+        self.useFixture(mockpatch.Patch('time.sleep'))
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(governor.get_governor())
+
+    def test_raw_request_retried(self):
+        cfg.CONF.set_default('overload_retries', 1, group='http')
+        client = service_client.ServiceClient(
+            fake_auth_provider.FakeAuthProvider(), 'compute', 'regionOne')
+        client.http_obj = mock.Mock()
+        client.http_obj.request.side_effect = [(_response(429), ''),
+                                               (_response(200), '{}')]
+        resp, body = client.raw_request('http://fake/v2/servers', 'GET')
+        self.assertEqual((200, '{}'), (resp.status, body))
+        self.assertEqual(2, governor.get_governor().stats()['requests'])
+        self.assertIs(governor.get_governor(), governor.get_governor())
@@ -0,0 +1,222 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import socket
+
+import fixtures
+import mock
+from oslo_config import cfg
+from oslotest import mockpatch
+import six
+from six.moves import http_client as httplib
+
+from tempest.common import glance_http
+from tempest.common import http_pool
+from tempest.tests import base
+from tempest.tests import fake_auth_provider
+from tempest.tests import fake_config
+from tempest.tests import fake_http
+
+
+class FakeResponse(dict):
+    def read(self):
+        return 'body'
+
+
+class FakeConnection(object):
+    """Connection created by httplib2, closed by the server when asked."""
+
+    def __init__(self, host, timeout=None, proxy_info=None):
+        self.host = host
+        self.sock = None
+        self.requests = []
+
+    def set_debuglevel(self, level):
+        pass
+
+    def connect(self):
+        self.sock = mock.Mock()
+
+    def request(self, method, uri, body, headers):
+        self.requests.append(uri)
+        self.close_after = headers.get('connection') == 'close'
+
+    def getresponse(self):
+        if self.close_after:
+            self.close()
+        return FakeResponse(status='200', **{'content-length': '4'})
+
+    def close(self):
+        self.sock = None
+
+
+class TestConnectionPool(base.TestCase):
+    def setUp(self):
+        super(TestConnectionPool, self).setUp()
+        self.pool = http_pool.ConnectionPool(max_idle=1)
+
+    def test_get_put(self):
+        self.assertIsNone(self.pool.get('key'))
+        conn = mock.Mock()
+        self.pool.put('key', conn)
+        self.assertIsNone(self.pool.get('other key'))
+        self.assertIs(conn, self.pool.get('key'))
+        self.assertEqual({'reused': 1, 'opened': 2, 'idle': 0,
+                          'reuse_rate': 1 / 3.0}, self.pool.stats())
+
+    def test_max_idle(self):
+        first, second = mock.Mock(), mock.Mock()
+        self.pool.put('key', first)
+        self.pool.put('key', second)
+        second.close.assert_called_once_with()
+        self.assertFalse(first.close.called)
+        self.pool.clear()
+        first.close.assert_called_once_with()
+        self.assertIsNone(self.pool.get('key'))
+
+    def test_closed_connection_is_dropped(self):
+        self.pool.put('key', mock.Mock(sock=None))
+        self.assertEqual(0, self.pool.stats()['idle'])
+
+    def test_forked_child_does_not_use_parent_connections(self):
+        conn = mock.Mock()
+        self.pool.put('key', conn)
+        pid = os.fork()
+        if pid == 0:
+            # Child, which must neither reuse nor close the connection
+            try:
+                reused = self.pool.get('key') is not None
+                os._exit(1 if reused or conn.close.called else 0)
+            except BaseException:
+                os._exit(2)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(0, os.WEXITSTATUS(status))
+        self.assertIs(conn, self.pool.get('key'))
+
+
+class TestPooledHttp(base.TestCase):
+    def setUp(self):
+        super(TestPooledHttp, self).setUp()
+        self.pool = http_pool.ConnectionPool(max_idle=2)
+        self.http = http_pool.PooledHttp(self.pool)
+
+    def _request(self, uri, **kwargs):
+        return self.http.request(uri, connection_type=FakeConnection,
+                                 **kwargs)
+
+    def test_connection_reused(self):
+        self._request('http://fake_url.com/v2/servers')
+        conn = self.pool.get(self.http._pool_key('http:fake_url.com'))
+        self.assertEqual(['/v2/servers'], conn.requests)
+        self.pool.put(self.http._pool_key('http:fake_url.com'), conn)
+        resp, body = self._request('http://fake_url.com/v2/flavors')
+        self.assertEqual('body', body)
+        self.assertEqual(['/v2/servers', '/v2/flavors'], conn.requests)
+        self.assertEqual(1, self.pool.stats()['idle'])
+
+    def test_endpoints_use_different_connections(self):
+        self._request('http://fake_url.com/v2/servers')
+        self._request('http://other_url.com/v2/servers')
+        self.assertEqual(2, self.pool.stats()['idle'])
+        self.assertEqual(0, self.pool.stats()['reused'])
+
+    def test_connection_closed_by_server_is_dropped(self):
+        self._request('http://fake_url.com/v2/servers',
+                      headers={'connection': 'close'})
+        self.assertEqual(0, self.pool.stats()['idle'])
+
+    def test_connection_closed_on_failure(self):
+        self.useFixture(mockpatch.PatchObject(
+            FakeConnection, 'getresponse', side_effect=socket.timeout()))
+        self.assertRaises(socket.timeout, self._request,
+                          'http://fake_url.com/v2/servers')
+        self.assertEqual(0, self.pool.stats()['idle'])
+
+    def test_get_pool(self):
+        self.useFixture(fake_config.ConfigFixture())
+        self.useFixture(fixtures.MonkeyPatch(
+            'tempest.common.http_pool._pool', None))
+        self.assertIsNone(http_pool.get_pool())
+        cfg.CONF.set_default('connection_pool', True, group='http')
+        with mock.patch('atexit.register'):
+            pool = http_pool.get_pool()
+        self.assertIs(pool, http_pool.get_pool())
+        with mock.patch('os.getpid', return_value=-1):
+            self.assertIsNot(pool, http_pool.get_pool())
+
+
+class TestPooledGlanceHTTPClient(base.TestCase):
+    def setUp(self):
+        super(TestPooledGlanceHTTPClient, self).setUp()
+        self.pool = http_pool.ConnectionPool(max_idle=2)
+        self.useFixture(mockpatch.Patch(
+            'tempest.common.http_pool.get_pool', return_value=self.pool))
+        fake_auth = fake_auth_provider.FakeAuthProvider()
+        fake_auth.base_url = mock.MagicMock(return_value='http://fake_url.com')
+        self.client = glance_http.HTTPClient(fake_auth, {})
+        self.requests = []
+        self.errors = []
+        self.useFixture(mockpatch.PatchObject(
+            httplib.HTTPConnection, 'request', autospec=True,
+            side_effect=self._request))
+        self.useFixture(mockpatch.PatchObject(
+            httplib.HTTPConnection, 'getresponse',
+            side_effect=self._response))
+
+    def _request(self, conn, method, url, **kwargs):
+        self.requests.append(conn)
+        if self.errors:
+            raise self.errors.pop(0)
+        # Connected and kept alive by the server
+        conn.sock = mock.Mock()
+
+    def _response(self):
+        return fake_http.fake_httplib({'content-type': 'application/json'},
+                                      body=six.StringIO('{}'))
+
+    def test_connection_reused(self):
+        self.client.json_request('GET', '/images')
+        self.client.json_request('GET', '/images')
+        self.assertEqual(2, len(self.requests))
+        self.assertIs(self.requests[0], self.requests[1])
+        self.assertEqual(1, self.pool.stats()['reused'])
+        self.assertEqual(1, self.pool.stats()['idle'])
+
+    def test_closed_pooled_connection_is_replaced(self):
+        self.client.json_request('GET', '/images')
+        self.errors.append(httplib.BadStatusLine(''))
+        resp, body = self.client.json_request('GET', '/images')
+        self.assertEqual({}, body)
+        self.assertEqual(3, len(self.requests))
+        self.assertIsNot(self.requests[0], self.requests[2])
+        self.assertEqual([self.requests[2]],
+                         self.pool._idle[self.client.pool_key])
+
+    def test_chunked_body_sent_on_new_connection(self):
+        self.useFixture(mockpatch.PatchObject(
+            httplib.HTTPConnection, 'send'))
+        self.useFixture(mockpatch.PatchObject(
+            httplib.HTTPConnection, 'endheaders'))
+        self.client.json_request('GET', '/images')
+        self.client.raw_request('PUT', '/images',
+                                body=six.StringIO('image data'))
+        self.assertEqual(1, self.pool.stats()['idle'])
+        self.assertEqual(0, self.pool.stats()['reused'])
+
+    def test_post_sent_on_new_connection(self):
+        self.client.json_request('GET', '/images')
+        self.client.json_request('POST', '/images', body={'name': 'fake'})
+        self.assertIsNot(self.requests[0], self.requests[1])
+        self.assertEqual(0, self.pool.stats()['reused'])
+        # Then pooled for the next requests
+        self.assertEqual(2, self.pool.stats()['idle'])
@@ -0,0 +1,40 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import sys
+
+from tempest.common import lazy_import
+from tempest.tests import base
+
+
+class TestLazyImport(base.TestCase):
+    def test_lazy_class(self):
+        lazy = lazy_import.lazy_class('collections.OrderedDict')
+        self.assertIs(collections.OrderedDict, lazy.resolve())
+        self.assertEqual(collections.OrderedDict(a=1), lazy(a=1))
+
+    def test_lazy_classes_are_shared(self):
+        self.assertIs(lazy_import.lazy_class('collections.OrderedDict'),
+                      lazy_import.lazy_class('collections.OrderedDict'))
+
+    def test_lazy_module_imported_on_attribute_access(self):
+        self.addCleanup(sys.modules.pop, 'colorsys', None)
+        sys.modules.pop('colorsys', None)
+        lazy = lazy_import.LazyModule('colorsys')
+        self.assertNotIn('colorsys', sys.modules)
+        self.assertEqual((0.0, 0.0, 0.0), lazy.rgb_to_hsv(0, 0, 0))
+        self.assertIn('colorsys', sys.modules)
+
+    def test_unknown_class(self):
+        lazy = lazy_import.lazy_class('tempest.common.lazy_import.Missing')
+        self.assertRaises(ImportError, lazy)
@@ -0,0 +1,169 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import httplib2
+from oslo_serialization import jsonutils as json
+from oslotest import mockpatch
+from six.moves.urllib import parse as urllib
+
+from tempest.common import pagination
+from tempest.services.compute.json import servers_client
+from tempest.services.network.json import network_client
+from tempest.services.object_storage import container_client
+from tempest.services.volume.json import volumes_client
+from tempest.services.volume.v2.json import volumes_client as \
+    volumes_v2_client
+from tempest.tests import base
+from tempest.tests import fake_auth_provider
+
+
+def _next_links(url):
+    return [{'href': 'http://fake_url.com/v2/' + url, 'rel': 'next'},
+            {'href': 'http://fake_url.com/v2/prev', 'rel': 'previous'}]
+
+
+class TestPaginationHelpers(base.TestCase):
+    def test_get_next_marker(self):
+        self.assertEqual('3', pagination.get_next_marker(
+            _next_links('servers?limit=2&marker=3')))
+        self.assertEqual('3', pagination.get_next_marker(
+            '/v2/images?limit=2&marker=3'))
+        self.assertIsNone(pagination.get_next_marker(None))
+        self.assertIsNone(pagination.get_next_marker(
+            [{'href': 'http://fake_url.com/v2/prev', 'rel': 'previous'}]))
+
+    def test_select_fields(self):
+        item = {'id': '1', 'name': 'fake', 'status': 'ACTIVE'}
+        self.assertEqual(item, pagination.select_fields(item, None))
+        self.assertEqual({'id': '1'},
+                         pagination.select_fields(item, ['id', 'missing']))
+
+
+class TestIterResources(base.TestCase):
+    def setUp(self):
+        super(TestIterResources, self).setUp()
+        self.fake_auth = fake_auth_provider.FakeAuthProvider()
+        self.pages = []
+        self.urls = []
+        self.useFixture(mockpatch.Patch(
+            'tempest.common.service_client.ServiceClient.get',
+            side_effect=self._get))
+
+    def _get(self, url, headers=None):
+        self.urls.append(url)
+        return httplib2.Response({'status': 200}), json.dumps(
+            self.pages.pop(0))
+
+    def _query(self, url):
+        return dict(urllib.parse_qsl(urllib.urlparse(url).query))
+
+    def test_iter_servers(self):
+        client = servers_client.ServersClient(self.fake_auth, 'compute',
+                                              'regionOne')
+        servers = [{'id': str(i), 'name': 'server%d' % i, 'links': []}
+                   for i in range(3)]
+        self.pages = [
+            {'servers': servers[:2],
+             'servers_links': _next_links('servers?limit=2&marker=1')},
+            {'servers': servers[2:]}]
+        iterator = client.iter_servers(fields=['id'], limit=2, name='fake')
+        self.assertEqual({'id': '0'}, next(iterator))
+        # The pages are only fetched when needed
+        self.assertEqual(1, len(self.urls))
+        self.assertEqual([{'id': '1'}, {'id': '2'}], list(iterator))
+        self.assertEqual({'limit': '2', 'name': 'fake'},
+                         self._query(self.urls[0]))
+        self.assertEqual({'limit': '2', 'name': 'fake', 'marker': '1'},
+                         self._query(self.urls[1]))
+
+    def test_iter_volumes_v1(self):
+        client = volumes_client.VolumesClient(self.fake_auth, 'volume',
+                                              'regionOne')
+        # No links, the listing ends with a page which is not full
+        self.pages = [{'volumes': [{'id': '0'}, {'id': '1'}]},
+                      {'volumes': [{'id': '2'}, {'id': '3'}]},
+                      {'volumes': [{'id': '4'}]}]
+        self.assertEqual(['0', '1', '2', '3', '4'],
+                         [v['id'] for v in client.iter_volumes(limit=2)])
+        self.assertEqual({'limit': '2', 'offset': '2'},
+                         self._query(self.urls[1]))
+        self.assertEqual({'limit': '2', 'offset': '4'},
+                         self._query(self.urls[2]))
+        self.assertEqual([], self.pages)
+
+    def test_iter_volumes_v2(self):
+        client = volumes_v2_client.VolumesV2Client(self.fake_auth, 'volume',
+                                                   'regionOne')
+        self.pages = [
+            {'volumes': [{'id': '0'}, {'id': '1'}],
+             'volumes_links': _next_links('volumes?limit=2&marker=1')},
+            # A full last page has no links
+            {'volumes': [{'id': '2'}, {'id': '3'}]}]
+        self.assertEqual(['0', '1', '2', '3'],
+                         [v['id'] for v in client.iter_volumes(limit=2)])
+        self.assertEqual('1', self._query(self.urls[1])['marker'])
+        self.assertEqual(2, len(self.urls))
+
+    def test_iter_volumes_repeated_marker(self):
+        client = volumes_v2_client.VolumesV2Client(self.fake_auth, 'volume',
+                                                   'regionOne')
+        page = {'volumes': [{'id': '0'}, {'id': '1'}],
+                'volumes_links': _next_links('volumes?limit=2&marker=1')}
+        self.pages = [page, page, page]
+        self.assertEqual(['0', '1', '0', '1'],
+                         [v['id'] for v in client.iter_volumes(limit=2)])
+        self.assertEqual(2, len(self.urls))
+
+    def test_iter_networks(self):
+        client = network_client.NetworkClient(self.fake_auth, 'network',
+                                              'regionOne')
+        self.pages = [
+            {'networks': [{'id': '0', 'name': 'net0'}],
+             'networks_links': _next_links('networks?limit=1&marker=0')},
+            {'networks': [{'id': '1', 'name': 'net1'}],
+             'networks_links': [{'href': 'http://fake_url.com/v2/prev',
+                                 'rel': 'previous'}]}]
+        self.assertEqual([{'name': 'net0'}, {'name': 'net1'}],
+                         list(client.iter_networks(fields=['name'], limit=1,
+                                                   shared=False)))
+        query = urllib.parse_qs(urllib.urlparse(self.urls[1]).query)
+        self.assertEqual(['name', 'id'], query['fields'])
+        self.assertEqual(['0'], query['marker'])
+
+    def test_iter_container_objects(self):
+        client = container_client.ContainerClient(self.fake_auth,
+                                                  'object-store', 'regionOne')
+        self.pages = [[{'name': 'a'}, {'name': 'b'}], [{'name': 'c'}]]
+        objects = client.iter_container_objects('fake', limit=2)
+        self.assertEqual(['a', 'b', 'c'], [o['name'] for o in objects])
+        self.assertEqual({'limit': '2', 'format': 'json', 'marker': 'b'},
+                         self._query(self.urls[1]))
+
+    def test_iter_container_objects_with_delimiter(self):
+        client = container_client.ContainerClient(self.fake_auth,
+                                                  'object-store', 'regionOne')
+        self.pages = [[{'name': 'a'}, {'subdir': 'b/'}], [{'name': 'c'}]]
+        objects = list(client.iter_container_objects(
+            'fake', limit=2, params={'delimiter': '/'}))
+        self.assertEqual(3, len(objects))
+        self.assertEqual({'limit': '2', 'format': 'json', 'delimiter': '/',
+                          'marker': 'b/'}, self._query(self.urls[1]))
+
+    def test_iter_container_objects_limit_in_params(self):
+        client = container_client.ContainerClient(self.fake_auth,
+                                                  'object-store', 'regionOne')
+        self.pages = [[{'name': 'a'}, {'name': 'b'}], [{'name': 'c'}]]
+        objects = client.list_all_container_objects(
+            'fake', params={'limit': 2, 'prefix': 'x'})
+        self.assertEqual(['a', 'b', 'c'], [o['name'] for o in objects])
+        self.assertEqual({'limit': '2', 'prefix': 'x', 'format': 'json',
+                          'marker': 'b'}, self._query(self.urls[1]))
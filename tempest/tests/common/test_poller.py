@@ -0,0 +1,138 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+
+import httplib2
+import mock
+from tempest_lib import exceptions as lib_exc
+
+from tempest.common import http_pool
+from tempest.common import poller
+from tempest import exceptions
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class TestPoller(base.TestCase):
+    def setUp(self):
+        super(TestPoller, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.client = mock.Mock(build_interval=0.01, build_timeout=5)
+        self.poller = poller.Poller()
+
+    @staticmethod
+    def _servers(*states):
+        return {'servers': [{'id': server_id, 'status': status}
+                            for server_id, status in states]}
+
+    def test_wait_for_many_servers_with_one_list_call(self):
+        self.client.list_servers.side_effect = [
+            self._servers(('s1', 'BUILD'), ('s2', 'BUILD')),
+            self._servers(('s1', 'ACTIVE'), ('s2', 'BUILD')),
+            self._servers(('s1', 'ACTIVE'), ('s2', 'ACTIVE'))]
+        futures = [self.poller.wait_for(self.client, 'server', server_id,
+                                        'ACTIVE')
+                   for server_id in ('s1', 's2')]
+        results = poller.wait_for_all(futures, timeout=5)
+        self.assertEqual(['s1', 's2'], [r['id'] for r in results])
+        self.client.list_servers.assert_called_with(detail=True)
+        self.assertFalse(self.client.show_server.called)
+
+    def test_wait_for_server_without_task(self):
+        servers = self._servers(('s1', 'ACTIVE'))
+        servers['servers'][0]['OS-EXT-STS:task_state'] = 'rebuilding'
+        self.client.list_servers.side_effect = [
+            servers, self._servers(('s1', 'ACTIVE'))]
+        future = self.poller.wait_for(self.client, 'server', 's1', 'ACTIVE')
+        self.assertIsNone(future.result(5).get('OS-EXT-STS:task_state'))
+        self.assertEqual(2, self.client.list_servers.call_count)
+
+    def test_poller_uses_its_own_http(self):
+        client = copy.copy(self.client)
+        client.http_obj = httplib2.Http()
+        client.http_obj.connections['http:fake'] = mock.Mock()
+        group = poller._PollGroup(client, 'server')
+        self.assertIsNot(client, group.client)
+        self.assertIsNot(client.http_obj, group.client.http_obj)
+        self.assertEqual({}, group.client.http_obj.connections)
+        self.assertEqual(1, len(client.http_obj.connections))
+        pooled = http_pool.PooledHttp(http_pool.ConnectionPool(1))
+        client.http_obj = pooled
+        # A pooled Http is thread safe, and shared
+        self.assertIs(pooled, poller._PollGroup(client,
+                                                'server').client.http_obj)
+
+    def test_wait_for_deletion(self):
+        self.client.list_volumes.side_effect = [
+            [{'id': 'v1', 'status': 'deleting'}], [], []]
+        future = self.poller.wait_for(self.client, 'volume', 'v1',
+                                      poller.DELETED)
+        self.assertIsNone(future.result(5))
+
+    def test_wait_error_status(self):
+        self.client.list_servers.return_value = self._servers(
+            ('s1', 'ERROR'))
+        future = self.poller.wait_for(self.client, 'server', 's1', 'ACTIVE')
+        self.assertRaises(exceptions.BuildErrorException, future.result, 5)
+
+    def test_wait_error_status_with_fault(self):
+        servers = self._servers(('s1', 'ERROR'))
+        servers['servers'][0]['fault'] = {'message': 'No valid host'}
+        self.client.list_servers.return_value = servers
+        future = self.poller.wait_for(self.client, 'server', 's1', 'ACTIVE')
+        error = self.assertRaises(exceptions.BuildErrorException,
+                                  future.result, 5)
+        self.assertIn('No valid host', str(error))
+
+    def test_wait_for_missing_resource(self):
+        self.client.list_servers.return_value = self._servers()
+        future = self.poller.wait_for(self.client, 'server', 's1', 'ACTIVE')
+        self.assertRaises(lib_exc.NotFound, future.result, 5)
+
+    def test_unexpected_poll_error_fails_the_waits(self):
+        # No status in the listing
+        self.client.list_servers.return_value = {'servers': [{'id': 's1'}]}
+        future = self.poller.wait_for(self.client, 'server', 's1', 'ACTIVE')
+        self.assertRaises(KeyError, future.result, 5)
+        # The poller thread goes on serving the next waits
+        self.client.list_servers.return_value = self._servers(
+            ('s1', 'ACTIVE'))
+        future = self.poller.wait_for(self.client, 'server', 's1', 'ACTIVE')
+        self.assertEqual('ACTIVE', future.result(5)['status'])
+
+    def test_remaining(self):
+        future = poller.WaitFuture(self.client, 'server', 's1', 'ACTIVE',
+                                   deadline=0)
+        self.assertEqual(poller.DEADLINE_MARGIN, future.remaining())
+
+    def test_wait_timeout(self):
+        self.client.list_servers.return_value = self._servers(
+            ('s1', 'BUILD'))
+        future = self.poller.wait_for(self.client, 'server', 's1', 'ACTIVE',
+                                      timeout=0)
+        self.assertRaises(exceptions.TimeoutException, future.result, 5)
+
+    def test_wait_for_all_waits_for_every_future(self):
+        self.client.list_servers.return_value = self._servers(
+            ('s1', 'ERROR'), ('s2', 'ACTIVE'))
+        futures = [self.poller.wait_for(self.client, 'server', server_id,
+                                        'ACTIVE')
+                   for server_id in ('s1', 's2')]
+        self.assertRaises(exceptions.BuildErrorException,
+                          poller.wait_for_all, futures, 5)
+        self.assertTrue(all(f.done() for f in futures))
+
+    def test_unknown_resource_type(self):
+        self.assertRaises(exceptions.InvalidConfiguration,
+                          self.poller.wait_for, self.client, 'fake', 'id',
+                          'ACTIVE')
@@ -0,0 +1,164 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import threading
+
+import fixtures
+import mock
+from oslo_config import cfg
+
+from tempest.common import reaper
+from tempest.tests import base
+from tempest.tests import fake_config
+
+RECORD = {'user_id': 'u1', 'username': 'user',
+          'project_id': 'p1', 'project_name': 'project',
+          'router': {'id': 'r1', 'name': 'router', 'subnet_id': 's1'},
+          'subnet': {'id': 's1', 'name': 'subnet'},
+          'network': {'id': 'n1', 'name': 'network'}}
+
+
+class FakeProvider(object):
+    """Records the deletions made by the reaper."""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def _call(self, name, resource_id):
+        with self._lock:
+            self.calls.append((name, resource_id))
+        if name in self.fail:
+            raise ValueError(name)
+
+    def _clear_isolated_router_interface(self, router_id, subnet_id, name):
+        self._call('interface', router_id)
+
+    def _clear_isolated_router(self, router_id, name):
+        self._call('router', router_id)
+
+    def _clear_isolated_subnet(self, subnet_id, name):
+        self._call('subnet', subnet_id)
+
+    def _clear_isolated_network(self, network_id, name):
+        self._call('network', network_id)
+
+    def _clear_isolated_user(self, user_id, name):
+        self._call('user', user_id)
+
+    def _clear_isolated_project(self, project_id, name):
+        self._call('project', project_id)
+
+
+class TestJournal(base.TestCase):
+    def setUp(self):
+        super(TestJournal, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'worker.journal')
+
+    def test_pending_records(self):
+        journal = reaper.Journal(self.path)
+        first = journal.add({'user_id': 'u1'})
+        journal.add({'user_id': 'u2'})
+        journal.done(first)
+        journal.close()
+        self.assertEqual({1: {'user_id': 'u2'}},
+                         dict(reaper.read_journal(self.path)))
+
+    def test_truncated_entry_is_ignored(self):
+        journal = reaper.Journal(self.path)
+        journal.add({'user_id': 'u1'})
+        journal.close()
+        with open(self.path, 'a') as journal_file:
+            journal_file.write('{"id": 1, "rec')
+        self.assertEqual([0], list(reaper.read_journal(self.path)))
+
+    def test_ids_continue_in_existing_journal(self):
+        journal = reaper.Journal(self.path)
+        journal.add({'user_id': 'u1'})
+        journal.close()
+        journal = reaper.Journal(self.path)
+        self.assertEqual(1, journal.add({'user_id': 'u2'}))
+        journal.close()
+
+    def test_close_and_remove(self):
+        journal = reaper.Journal(self.path)
+        journal.add({'user_id': 'u1'})
+        journal.close(remove=True)
+        self.assertFalse(os.path.exists(self.path))
+
+
+class TestReaper(base.TestCase):
+    def setUp(self):
+        super(TestReaper, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'worker.journal')
+
+    def test_reap_in_dependency_order(self):
+        provider = FakeProvider()
+        journal_reaper = reaper.Reaper(reaper.Journal(self.path), 4)
+        journal_reaper.reap(provider, [RECORD])
+        self.assertEqual(0, journal_reaper.wait())
+        calls = [name for name, _ in provider.calls]
+        self.assertEqual(sorted(['interface', 'router', 'subnet', 'network',
+                                 'user', 'project']), sorted(calls))
+        self.assertLess(calls.index('interface'), calls.index('router'))
+        self.assertLess(calls.index('interface'), calls.index('subnet'))
+        self.assertLess(calls.index('subnet'), calls.index('network'))
+        self.assertLess(calls.index('network'), calls.index('project'))
+        # Everything was deleted, so the journal is removed
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_records_without_network_resources(self):
+        provider = FakeProvider()
+        journal_reaper = reaper.Reaper(reaper.Journal(self.path), 2)
+        journal_reaper.reap(provider, [
+            dict(user_id='u%d' % i, username='user', project_id='p%d' % i,
+                 project_name='project') for i in range(3)])
+        self.assertEqual(0, journal_reaper.wait())
+        self.assertEqual(6, len(provider.calls))
+
+    def test_failed_deletion_is_kept_in_journal(self):
+        provider = FakeProvider(fail=('subnet',))
+        journal_reaper = reaper.Reaper(reaper.Journal(self.path), 4)
+        journal_reaper.reap(provider, [RECORD])
+        self.assertEqual(1, journal_reaper.wait())
+        # The network depends on the subnet
+        self.assertNotIn(('network', 'n1'), provider.calls)
+        self.assertEqual({0: RECORD}, dict(reaper.read_journal(self.path)))
+        # The journal can then be reaped again
+        self.assertEqual(0, reaper.reap_journal(self.path, FakeProvider(),
+                                                workers=2))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_get_reaper_disabled(self):
+        self.assertIsNone(reaper.get_reaper())
+
+    @mock.patch('atexit.register')
+    def test_get_reaper_stopped_at_exit(self, mock_register):
+        self.useFixture(fixtures.MonkeyPatch(
+            'tempest.common.reaper._reaper', None))
+        self.useFixture(fixtures.MonkeyPatch(
+            'tempest.common.reaper._reaper_stopped', False))
+        cfg.CONF.set_default('deferred_isolated_creds_cleanup', True,
+                             group='auth')
+        cfg.CONF.set_default('isolated_creds_journal_dir',
+                             os.path.dirname(self.path), group='auth')
+        deferred_reaper = reaper.get_reaper()
+        self.assertIs(deferred_reaper, reaper.get_reaper())
+        mock_register.assert_called_once_with(reaper.stop_reaper)
+        reaper.stop_reaper()
+        # The credentials are then deleted synchronously
+        self.assertIsNone(reaper.get_reaper())
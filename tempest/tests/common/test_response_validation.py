@@ -0,0 +1,128 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+
+import fixtures
+import httplib2
+import jsonschema
+import mock
+from tempest_lib import exceptions as lib_exc
+
+from tempest.common import response_validation
+from tempest.common import service_client
+from tempest.tests import base
+
+SCHEMA = {
+    'status_code': [200],
+    'response_body': {
+        'type': 'object',
+        'properties': {
+            'id': {'type': 'string'},
+            'host': {'type': 'string', 'format': 'ipv4'},
+        },
+        'required': ['id']
+    },
+    'response_header': {
+        'type': 'object',
+        'properties': {'x-openstack-request-id': {'type': 'string'}},
+        'required': ['x-openstack-request-id']
+    }
+}
+
+
+class TestResponseValidation(base.TestCase):
+    def setUp(self):
+        super(TestResponseValidation, self).setUp()
+        self.useFixture(fixtures.MonkeyPatch(
+            'tempest.common.response_validation._validators', {}))
+        self.useFixture(fixtures.MonkeyPatch(
+            'tempest.common.response_validation._validators_by_id', {}))
+        self.useFixture(fixtures.MonkeyPatch(
+            'tempest.common.response_validation._sample_rate', 1.0))
+        self.resp = httplib2.Response({'status': 200,
+                                       'x-openstack-request-id': 'req'})
+
+    def test_validator_built_once(self):
+        with mock.patch.object(response_validation.JSONSCHEMA_VALIDATOR,
+                               'check_schema') as check_schema:
+            for _ in range(3):
+                service_client.ServiceClient.validate_response(
+                    SCHEMA, self.resp, {'id': 'fake'})
+        self.assertEqual(2, check_schema.call_count)
+        self.assertIs(
+            response_validation.get_validator(SCHEMA['response_body']),
+            response_validation.get_validator(SCHEMA['response_body']))
+
+    def test_validator_shared_by_equal_schemas(self):
+        schemas = [copy.deepcopy(SCHEMA['response_body']) for _ in range(3)]
+        validators = [response_validation.get_validator(schema)
+                      for schema in schemas]
+        self.assertIs(validators[0], validators[1])
+        self.assertIs(validators[0], validators[2])
+        self.assertEqual(1, len(response_validation._validators))
+
+    def test_lookup_by_identity_bounded(self):
+        self.useFixture(fixtures.MonkeyPatch(
+            'tempest.common.response_validation.MAX_SCHEMAS', 2))
+        for _ in range(5):
+            response_validation.get_validator(
+                copy.deepcopy(SCHEMA['response_body']))
+        self.assertTrue(len(response_validation._validators_by_id) <= 2)
+
+    def test_invalid_body(self):
+        self.assertRaises(lib_exc.InvalidHTTPResponseBody,
+                          service_client.ServiceClient.validate_response,
+                          SCHEMA, self.resp, {'name': 'fake'})
+
+    def test_format_checked(self):
+        self.assertRaises(lib_exc.InvalidHTTPResponseBody,
+                          service_client.ServiceClient.validate_response,
+                          SCHEMA, self.resp,
+                          {'id': 'fake', 'host': 'fake_host'})
+        # Unless disabled
+        response_validation.validate({'id': 'fake', 'host': 'fake_host'},
+                                     SCHEMA['response_body'],
+                                     format_checker=None)
+
+    def test_invalid_header(self):
+        del self.resp['x-openstack-request-id']
+        self.assertRaises(lib_exc.InvalidHTTPResponseHeader,
+                          service_client.ServiceClient.validate_response,
+                          SCHEMA, self.resp, {'id': 'fake'})
+
+    def test_unexpected_status_code(self):
+        self.resp.status = 202
+        self.assertRaises(lib_exc.InvalidHttpSuccessCode,
+                          service_client.ServiceClient.validate_response,
+                          SCHEMA, self.resp, {'id': 'fake'})
+
+    def test_invalid_schema(self):
+        self.assertRaises(jsonschema.SchemaError,
+                          response_validation.validate, {}, {'type': 1})
+
+    def test_sampled_validation(self):
+        response_validation.set_sample_rate(0.5)
+        with mock.patch('random.random', return_value=0.7):
+            # Not sampled, so not validated
+            service_client.ServiceClient.validate_response(
+                SCHEMA, self.resp, {'name': 'fake'})
+        with mock.patch('random.random', return_value=0.2):
+            self.assertRaises(lib_exc.InvalidHTTPResponseBody,
+                              service_client.ServiceClient.validate_response,
+                              SCHEMA, self.resp, {'name': 'fake'})
+        # The status code is always checked
+        response_validation.set_sample_rate(0.0)
+        self.resp.status = 202
+        self.assertRaises(lib_exc.InvalidHttpSuccessCode,
+                          service_client.ServiceClient.validate_response,
+                          SCHEMA, self.resp, {'id': 'fake'})
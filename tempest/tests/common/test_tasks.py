@@ -0,0 +1,94 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+from tempest.common import tasks
+from tempest import exceptions
+from tempest.tests import base
+
+
+class TestTaskPool(base.TestCase):
+    def setUp(self):
+        super(TestTaskPool, self).setUp()
+        self.pool = tasks.TaskPool(2)
+        self.addCleanup(self.pool.shutdown)
+
+    def test_shutdown(self):
+        task = self.pool.submit(lambda: 'done')
+        workers = list(self.pool._workers)
+        self.pool.shutdown()
+        self.assertTrue(task.done())
+        self.assertFalse(any(worker.is_alive() for worker in workers))
+        self.assertEqual('again', self.pool.submit(lambda: 'again').result(5))
+
+    def test_results_of_dependencies_are_appended(self):
+        first = self.pool.submit(lambda: 'project')
+        second = self.pool.submit(lambda name, project: (name, project),
+                                  'user', after=[first])
+        self.assertEqual(('user', 'project'), second.result(5))
+
+    def test_independent_tasks_run_concurrently(self):
+        barrier = threading.Event()
+        # Each task waits for the other one to start, which requires two
+        # workers
+        started = []
+
+        def task(name):
+            started.append(name)
+            if len(started) == 2:
+                barrier.set()
+            return barrier.wait(5)
+
+        running = [self.pool.submit(task, name) for name in ('a', 'b')]
+        self.assertEqual([True, True], tasks.wait_all(running))
+
+    def test_bounded_pool_does_not_deadlock(self):
+        root = self.pool.submit(lambda: 1)
+        leaves = [self.pool.submit(lambda value: value + 1, after=[root])
+                  for _ in range(10)]
+        total = self.pool.submit(lambda *values: sum(values), after=leaves)
+        self.assertEqual(20, total.result(5))
+        self.assertEqual(2, len(self.pool._workers))
+
+    def test_failure_propagates_to_dependents(self):
+        def fail():
+            raise ValueError()
+
+        failed = self.pool.submit(fail)
+        called = []
+        dependent = self.pool.submit(called.append, after=[failed])
+        self.assertRaises(ValueError, dependent.result, 5)
+        self.assertTrue(dependent.failed())
+        self.assertEqual([], called)
+
+    def test_wait_all_waits_for_all_tasks(self):
+        release = threading.Event()
+
+        def fail():
+            raise ValueError()
+
+        slow = self.pool.submit(release.wait, 5)
+        failed = self.pool.submit(fail)
+        threading.Timer(0.05, release.set).start()
+        self.assertRaises(ValueError, tasks.wait_all,
+                          [failed, slow])
+        self.assertTrue(slow.done())
+
+    def test_result_timeout(self):
+        release = threading.Event()
+        task = self.pool.submit(release.wait, 5)
+        self.addCleanup(release.set)
+        self.assertRaises(exceptions.TimeoutException, task.result, 0.01)
+
+    def test_unexpected_argument(self):
+        self.assertRaises(TypeError, self.pool.submit, len, before=[])
@@ -0,0 +1,145 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+import datetime
+import os
+import stat
+
+import fixtures
+import httplib2
+from oslo_config import cfg
+from oslo_serialization import jsonutils as json
+from tempest_lib import auth
+from tempest_lib.services.identity.v2 import token_client
+
+from tempest.common import token_cache
+from tempest import manager
+from tempest.tests import base
+from tempest.tests import fake_config
+from tempest.tests import fake_identity
+
+
+class TestTokenCache(base.TestCase):
+    def setUp(self):
+        super(TestTokenCache, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'tokens')
+        self.cache = token_cache.TokenCache(self.path)
+
+    def test_set_get_delete(self):
+        self.assertIsNone(self.cache.get('key'))
+        self.cache.set('key', ('token', {'token': {'id': 'token'}}))
+        self.assertEqual(('token', {'token': {'id': 'token'}}),
+                         self.cache.get('key'))
+        self.cache.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+        # Deleting a missing entry is fine
+        self.cache.delete('key')
+
+    def test_delete_user(self):
+        key = token_cache.get_cache_key(object, 'url', {}, 'user')
+        other = token_cache.get_cache_key(object, 'url', {}, 'other')
+        self.cache.set(key, ('token', {}))
+        self.cache.set(other, ('token', {}))
+        with self.cache.lock(key):
+            pass
+        self.cache.delete_user('user')
+        self.assertEqual(['%s.json' % other], os.listdir(self.path))
+
+    def test_entries_are_private(self):
+        self.cache.set('key', ('token', {}))
+        self.assertEqual(0o700, stat.S_IMODE(os.stat(self.path).st_mode))
+        self.assertEqual(0o600, stat.S_IMODE(
+            os.stat(os.path.join(self.path, 'key.json')).st_mode))
+        self.assertEqual(['key.json'], os.listdir(self.path))
+
+    def test_corrupted_entry_is_a_miss(self):
+        with open(os.path.join(self.path, 'key.json'), 'w') as entry:
+            entry.write('{"token": ')
+        self.assertIsNone(self.cache.get('key'))
+
+
+class TestCachedAuthProvider(base.TestCase):
+    def setUp(self):
+        super(TestCachedAuthProvider, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.path = self.useFixture(fixtures.TempDir()).path
+        cfg.CONF.set_default('token_cache_dir', self.path, group='identity')
+        cfg.CONF.set_default('uri', fake_identity.FAKE_AUTH_URL,
+                             group='identity')
+        self.requests = []
+        self.expires = datetime.datetime.utcnow() + datetime.timedelta(
+            hours=1)
+        self.stubs.Set(token_client.TokenClientJSON, 'raw_request',
+                       self._fake_v2_response)
+        self.credentials = auth.KeystoneV2Credentials(
+            username='fake_username', password='fake_password',
+            tenant_name='fake_tenant_name')
+
+    def _fake_v2_response(self, uri, method="GET", body=None, headers=None,
+                          redirections=5, connection_type=None):
+        self.requests.append(uri)
+        response = copy.deepcopy(fake_identity.IDENTITY_V2_RESPONSE)
+        response['access']['token']['expires'] = self.expires.strftime(
+            '%Y-%m-%dT%H:%M:%SZ')
+        response['access']['token']['id'] = 'token-%d' % len(self.requests)
+        return httplib2.Response({"status": "200"}), json.dumps(response)
+
+    def test_cached_provider_class(self):
+        self.assertIsInstance(manager.get_auth_provider(self.credentials),
+                              token_cache.CachedKeystoneV2AuthProvider)
+        cfg.CONF.set_default('token_cache_dir', None, group='identity')
+        self.assertIs(auth.KeystoneV2AuthProvider,
+                      type(manager.get_auth_provider(self.credentials)))
+
+    def test_token_shared_by_providers(self):
+        first = manager.get_auth_provider(self.credentials)
+        second = manager.get_auth_provider(copy.copy(self.credentials))
+        self.assertEqual('token-1', first.get_token())
+        self.assertEqual('token-1', second.get_token())
+        self.assertEqual(1, len(self.requests))
+        # The credentials are filled in from the cached auth data
+        self.assertEqual('fake_tenant_id', second.credentials.tenant_id)
+
+    def test_different_credentials(self):
+        manager.get_auth_provider(self.credentials).get_token()
+        other = auth.KeystoneV2Credentials(
+            username='fake_username', password='other_password',
+            tenant_name='fake_tenant_name')
+        self.assertEqual('token-2',
+                         manager.get_auth_provider(other).get_token())
+
+    def test_token_within_expiry_margin_is_replaced(self):
+        self.expires = datetime.datetime.utcnow() + datetime.timedelta(
+            seconds=60)
+        manager.get_auth_provider(self.credentials).get_token()
+        self.assertEqual('token-2',
+                         manager.get_auth_provider(
+                             self.credentials).get_token())
+
+    def test_set_auth_replaces_cached_token(self):
+        manager.get_auth_provider(self.credentials).get_token()
+        manager.get_auth_provider(self.credentials).set_auth()
+        self.assertEqual('token-2',
+                         manager.get_auth_provider(
+                             self.credentials).get_token())
+
+    def test_clear_auth_removes_cached_token(self):
+        provider = manager.get_auth_provider(self.credentials)
+        provider.get_token()
+        provider.clear_auth()
+        self.assertEqual([], [name for name in os.listdir(self.path)
+                              if name.endswith('.json')])
+        self.assertEqual('token-2',
+                         manager.get_auth_provider(
+                             self.credentials).get_token())
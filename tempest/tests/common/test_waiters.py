@@ -15,11 +15,17 @@
 import time
 
 import mock
+from oslo_config import cfg
 
+from tempest.common import timelines
 from tempest.common import waiters
 from tempest import exceptions
+from tempest.services.network.json import network_client
+from tempest.services.orchestration.json import orchestration_client
+from tempest.services.volume.json import snapshots_client
 from tempest.services.volume.json import volumes_client
 from tempest.tests import base
+from tempest.tests import fake_config
 
 
 class TestImageWaiters(base.TestCase):
@@ -66,3 +72,151 @@ class TestImageWaiters(base.TestCase):
         mock_show.assert_has_calls([mock.call(volume_id),
                                     mock.call(volume_id)])
         mock_sleep.assert_called_once_with(1)
+
+
+class TestServersWaiters(base.TestCase):
+    def setUp(self):
+        super(TestServersWaiters, self).setUp()
+        self.client = mock.MagicMock()
+        self.client.build_timeout = 1
+        self.client.build_interval = 1
+        self.patch('time.sleep')
+
+    @staticmethod
+    def _servers(*states):
+        return {'servers': [{'id': server_id, 'status': status,
+                             'OS-EXT-STS:task_state': None}
+                            for server_id, status in states]}
+
+    def test_wait_for_servers_status(self):
+        self.client.list_servers.side_effect = [
+            self._servers(('s1', 'BUILD'), ('s2', 'BUILD'), ('s3', 'BUILD')),
+            self._servers(('s1', 'ACTIVE'), ('s2', 'BUILD'), ('s3', 'BUILD')),
+            self._servers(('s1', 'ACTIVE'), ('s2', 'ACTIVE'),
+                          ('s3', 'ACTIVE'))]
+        waiters.wait_for_servers_status(self.client, ['s1', 's2'], 'ACTIVE',
+                                        name='fake')
+        self.assertEqual(3, self.client.list_servers.call_count)
+        self.client.list_servers.assert_called_with(detail=True, name='fake')
+        self.assertFalse(self.client.show_server.called)
+
+    def test_wait_for_servers_status_error(self):
+        servers = self._servers(('s1', 'ACTIVE'), ('s2', 'ERROR'))
+        servers['servers'][1]['fault'] = 'fake fault'
+        self.client.list_servers.return_value = servers
+        self.assertRaises(exceptions.BuildErrorException,
+                          waiters.wait_for_servers_status,
+                          self.client, ['s1', 's2'], 'ACTIVE')
+
+    def test_wait_for_servers_status_timeout(self):
+        self.client.build_timeout = 0
+        self.client.list_servers.return_value = self._servers(
+            ('s1', 'ACTIVE'), ('s2', 'BUILD'))
+        self.assertRaises(exceptions.TimeoutException,
+                          waiters.wait_for_servers_status,
+                          self.client, ['s1', 's2'], 'ACTIVE')
+
+
+class TestPollingPolicies(base.TestCase):
+    def setUp(self):
+        super(TestPollingPolicies, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.sleep = self.patch('time.sleep')
+
+    def test_default_policy_is_fixed(self):
+        poller = waiters.get_polling_policy(
+            mock.Mock(build_interval=3, build_timeout=60))
+        self.assertIsInstance(poller, waiters.FixedIntervalPolicy)
+        poller.sleep()
+        poller.sleep()
+        self.sleep.assert_has_calls([mock.call(3), mock.call(3)])
+
+    def test_backoff_policy(self):
+        cfg.CONF.set_default('polling_policy', 'backoff', group='waiter')
+        poller = waiters.get_polling_policy(
+            mock.Mock(build_interval=1, build_timeout=600))
+        self.assertIsInstance(poller, waiters.BackoffPolicy)
+        poller.jitter = 0
+        poller.max_interval = 4
+        for _ in range(7):
+            poller.sleep()
+        self.sleep.assert_has_calls([mock.call(0.5)] * 3 +
+                                    [mock.call(1), mock.call(2),
+                                     mock.call(4), mock.call(4)])
+
+    def test_backoff_policy_honors_deadline(self):
+        poller = waiters.BackoffPolicy(10, timeout=5, fast_probes=0,
+                                       jitter=0)
+        poller.start_time = time.time() - 4
+        self.assertTrue(poller.next_interval() <= 1)
+        poller.start_time = time.time() - 6
+        self.assertEqual(0, poller.next_interval())
+
+    def test_backoff_policy_jitter(self):
+        poller = waiters.BackoffPolicy(10, fast_probes=0, jitter=0.1)
+        for _ in range(10):
+            self.assertTrue(9 <= poller.next_interval() <= 11)
+
+
+class TestWaiterTimelines(base.TestCase):
+    def setUp(self):
+        super(TestWaiterTimelines, self).setUp()
+        self.patch('time.sleep')
+        timelines.pop_records()
+
+    def test_wait_for_volume_status_records_timeline(self):
+        client = mock.Mock(build_interval=1, build_timeout=10)
+        client.show_volume.side_effect = [{'status': 'creating'},
+                                          {'status': 'creating'},
+                                          {'status': 'available'}]
+        waiters.wait_for_volume_status(client, 'fake_id', 'available')
+        records = timelines.pop_records()
+        self.assertEqual(1, len(records))
+        self.assertEqual('volume', records[0]['resource_type'])
+        self.assertEqual(3, records[0]['polls'])
+        self.assertEqual(['creating', 'available'],
+                         [state[1] for state in records[0]['states']])
+        self.assertEqual([], timelines.pop_records())
+
+    def _states(self, resource_type, resource_id):
+        records = timelines.pop_records()
+        self.assertEqual(1, len(records))
+        self.assertEqual((resource_type, resource_id),
+                         (records[0]['resource_type'],
+                          records[0]['resource_id']))
+        return [state[1] for state in records[0]['states']]
+
+    def test_wait_for_stack_status_records_timeline(self):
+        client = mock.Mock(spec=orchestration_client.OrchestrationClient,
+                           build_interval=1, build_timeout=10)
+        client.show_stack.side_effect = [
+            {'stack_name': 'stack', 'stack_status': 'CREATE_IN_PROGRESS'},
+            {'stack_name': 'stack', 'stack_status': 'CREATE_COMPLETE'}]
+        orchestration_client.OrchestrationClient.wait_for_stack_status(
+            client, 'stack/fake_id', 'CREATE_COMPLETE')
+        self.assertEqual(['CREATE_IN_PROGRESS', 'CREATE_COMPLETE'],
+                         self._states('stack', 'stack/fake_id'))
+
+    def test_wait_for_snapshot_status_records_timeline(self):
+        client = mock.Mock(spec=snapshots_client.BaseSnapshotsClient,
+                           build_interval=1, build_timeout=10)
+        client._get_snapshot_status.side_effect = ['creating', 'available']
+        snapshots_client.BaseSnapshotsClient.wait_for_snapshot_status(
+            client, 'fake_id', 'available')
+        self.assertEqual(['creating', 'available'],
+                         self._states('snapshot', 'fake_id'))
+
+    def test_wait_for_network_resource_deletion_records_timeline(self):
+        client = mock.Mock(spec=network_client.NetworkClient,
+                           build_interval=1, build_timeout=10)
+        client.is_resource_deleted.side_effect = [False, True]
+        network_client.NetworkClient.wait_for_resource_deletion(
+            client, 'port', 'fake_id')
+        self.assertEqual([timelines.DELETED], self._states('port', 'fake_id'))
+
+    def test_time_in_states(self):
+        record = {'states': [[0, 'BUILD', 'spawning'],
+                             [4, 'ACTIVE', 'powering-off'],
+                             [6, 'SHUTOFF', None]]}
+        self.assertEqual([('BUILD/spawning', 4), ('ACTIVE/powering-off', 2)],
+                         list(timelines.time_in_states(record)))
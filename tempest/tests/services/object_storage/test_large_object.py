@@ -0,0 +1,123 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import hashlib
+import re
+
+import fixtures
+import httplib2
+from oslo_config import cfg
+from oslo_serialization import jsonutils as json
+import six
+
+from tempest import exceptions
+from tempest.services.object_storage import large_object
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class FakeObjectClient(object):
+    """ObjectClient storing the objects in memory."""
+
+    def __init__(self):
+        self.http_obj = httplib2.Http()
+        self.objects = {}
+        self.requests = []
+
+    def create_object(self, container, object_name, data, params=None,
+                      metadata=None, headers=None):
+        self.requests.append(('PUT', container, object_name, params,
+                              metadata))
+        self.objects[container, object_name] = data
+        return {'etag': '"%s"' % hashlib.md5(data).hexdigest()}, ''
+
+    def list_object_metadata(self, container, object_name):
+        data = self.objects[container, object_name]
+        return {'content-length': str(len(data)),
+                'etag': hashlib.md5(data).hexdigest()}, ''
+
+    def get_object(self, container, object_name, metadata=None):
+        start, end = re.match(r'bytes=(\d+)-(\d+)',
+                              metadata['Range']).groups()
+        data = self.objects[container, object_name]
+        return {'status': '206'}, data[int(start):int(end) + 1]
+
+
+class TestLargeObjectHelper(base.TestCase):
+    def setUp(self):
+        super(TestLargeObjectHelper, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.useFixture(fixtures.MonkeyPatch(
+            'tempest.services.object_storage.large_object._task_pool', None))
+        self.addCleanup(self._shutdown_task_pool)
+        self.client = FakeObjectClient()
+        self.helper = large_object.LargeObjectHelper(self.client)
+        self.data = b''.join(six.int2byte(i % 256) for i in range(1000))
+
+    def _shutdown_task_pool(self):
+        if large_object._task_pool is not None:
+            large_object._task_pool.shutdown()
+
+    def test_upload_empty_stream(self):
+        result = self.helper.upload('c', 'obj', six.BytesIO(), 300)
+        self.assertEqual({'segments': [], 'size': 0,
+                          'etag': hashlib.md5().hexdigest()}, result)
+        self.assertEqual([('PUT', 'c', 'obj', None, None)],
+                         self.client.requests)
+        self.assertEqual('', self.client.objects['c', 'obj'])
+
+    def test_upload_slo(self):
+        result = self.helper.upload('c', 'obj', six.BytesIO(self.data), 300)
+        self.assertEqual((1000, hashlib.md5(self.data).hexdigest()),
+                         (result['size'], result['etag']))
+        self.assertEqual(['/c/obj/%08d' % i for i in range(4)],
+                         [s['path'] for s in result['segments']])
+        self.assertEqual([300, 300, 300, 100],
+                         [s['size_bytes'] for s in result['segments']])
+        self.assertEqual(self.data[900:], self.client.objects['c',
+                                                              'obj/00000003'])
+        manifest = self.client.requests[-1]
+        self.assertEqual({'multipart-manifest': 'put'}, manifest[3])
+        self.assertEqual(result['segments'],
+                         json.loads(self.client.objects['c', 'obj']))
+
+    def test_upload_dlo_sequentially(self):
+        cfg.CONF.set_default('large_object_workers', 0,
+                             group='object-storage')
+        self.helper.upload('c', 'obj', six.BytesIO(self.data), 600,
+                           manifest='dlo', segment_container='segs')
+        self.assertEqual(self.data[:600],
+                         self.client.objects['segs', 'obj/00000000'])
+        self.assertEqual({'X-Object-Manifest': 'segs/obj/'},
+                         self.client.requests[-1][4])
+
+    def test_upload_etag_mismatch(self):
+        self.client.create_object = lambda *args, **kwargs: (
+            {'etag': 'wrong'}, '')
+        self.assertRaises(exceptions.ChecksumMismatch, self.helper.upload,
+                          'c', 'obj', six.BytesIO(self.data), 300)
+
+    def test_download(self):
+        self.client.objects['c', 'obj'] = self.data
+        self.assertEqual(self.data,
+                         bytes(self.helper.download('c', 'obj', 300)))
+
+    def test_download_checksum_mismatch(self):
+        self.client.objects['c', 'obj'] = self.data
+        self.assertRaises(exceptions.ChecksumMismatch, self.helper.download,
+                          'c', 'obj', 300, etag='0' * 32)
+
+    def test_threads_use_their_own_http(self):
+        client = self.helper._client()
+        self.assertIsNot(self.client, client)
+        self.assertIsNot(self.client.http_obj, client.http_obj)
+        self.assertIs(client, self.helper._client())
@@ -0,0 +1,101 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import subprocess
+
+import fixtures
+import mock
+from tempest_lib.common import ssh
+from tempest_lib import exceptions as lib_exc
+
+from tempest.stress import log_scanner
+from tempest.tests import base
+
+
+class FakeClient(object):
+    """Runs the commands locally, the nodes share the same files."""
+
+    def __init__(self, host, username, key_filename=None):
+        self.host = host
+        self.closed = False
+
+    def exec_command(self, cmd):
+        if self.host == 'unreachable':
+            raise lib_exc.SSHTimeout(host=self.host, user='user',
+                                     password=None)
+        return subprocess.check_output(['sh', '-c', cmd]).decode('utf-8')
+
+    def close(self):
+        self.closed = True
+
+
+class TestLogScanner(base.TestCase):
+    def setUp(self):
+        super(TestLogScanner, self).setUp()
+        self.dir = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(fixtures.MonkeyPatch(
+            'tempest.stress.log_scanner.PersistentClient', FakeClient))
+
+    def _append(self, name, *lines):
+        with open(os.path.join(self.dir, name), 'a') as f:
+            f.write(''.join(line + '\n' for line in lines))
+
+    def _scanner(self, nodes=('node1',), patterns=('ERROR', 'TRACE')):
+        return log_scanner.LogScanner(nodes, os.path.join(self.dir, '*.log'),
+                                      'user', patterns=patterns)
+
+    def test_only_new_lines_are_scanned(self):
+        self._append('api.log', 'INFO ok', 'ERROR first')
+        self._append('cpu.log', 'TRACE cpu')
+        scanner = self._scanner()
+        api = os.path.join(self.dir, 'api.log')
+        cpu = os.path.join(self.dir, 'cpu.log')
+        self.assertEqual({'node1': {api: ['ERROR first'],
+                                    cpu: ['TRACE cpu']}}, scanner.scan())
+        self.assertEqual({}, scanner.scan())
+        self._append('api.log', 'INFO ok', 'ERROR second')
+        self.assertEqual({'node1': {api: ['ERROR second']}}, scanner.scan())
+        self.assertEqual(os.path.getsize(api), scanner.offsets['node1'][api])
+
+    def test_rotated_file_is_scanned_again(self):
+        self._append('api.log', 'INFO a longer line than the next one')
+        scanner = self._scanner()
+        self.assertFalse(scanner.has_errors())
+        os.remove(os.path.join(self.dir, 'api.log'))
+        self._append('api.log', 'ERROR new')
+        self.assertTrue(scanner.has_errors())
+
+    def test_patterns_and_nodes(self):
+        self._append('api.log', 'ERROR ignored', 'CRITICAL it\'s down')
+        scanner = self._scanner(nodes=('node1', 'node2', 'unreachable'),
+                                patterns=["CRITICAL it's"])
+        found = scanner.scan()
+        self.assertEqual(['node1', 'node2'], sorted(found))
+        self.assertEqual(["CRITICAL it's down"],
+                         list(found['node2'].values())[0])
+        scanner.close()
+        self.assertTrue(scanner.clients['node1'].closed)
+
+
+class TestPersistentClient(base.TestCase):
+    @mock.patch.object(ssh.Client, '_get_ssh_connection')
+    def test_connection_reused(self, get_connection):
+        client = log_scanner.PersistentClient('node1', 'user')
+        self.assertIs(client._get_ssh_connection(),
+                      client._get_ssh_connection())
+        self.assertEqual(1, get_connection.call_count)
+        connection = get_connection.return_value
+        connection.get_transport.return_value.is_active.return_value = False
+        client._get_ssh_connection()
+        self.assertEqual(2, get_connection.call_count)
+        connection.close.assert_called_once_with()
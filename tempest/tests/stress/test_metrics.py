@@ -0,0 +1,123 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import csv
+import os
+import socket
+
+import fixtures
+from oslo_config import cfg
+from oslo_serialization import jsonutils as json
+
+from tempest.common import api_latency
+from tempest.stress import metrics
+from tempest.stress import statistics
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class TestIntervalHistogram(base.TestCase):
+    def test_interval(self):
+        previous = api_latency.Histogram()
+        for value in (1000, 2000):
+            previous.record(value)
+        current = api_latency.Histogram()
+        current.merge(previous)
+        for value in (50000, 60000, 70000):
+            current.record(value)
+        histogram = metrics.interval_histogram(current, previous)
+        self.assertEqual(3, histogram.count)
+        self.assertAlmostEqual(60000, histogram.percentile(50), delta=600)
+        self.assertIsNone(metrics.interval_histogram(
+            current, current).percentile(50))
+
+
+class TestMetricsSampler(base.TestCase):
+    def setUp(self):
+        super(TestMetricsSampler, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.dir = self.useFixture(fixtures.TempDir()).path
+        self.statistic = statistics.SharedStatistic()
+        self.processes = [{'action': 'create', 'statistic': self.statistic},
+                          {'action': 'delete',
+                           'statistic': statistics.SharedStatistic()}]
+
+    def _run(self, runs):
+        sampler = metrics.get_sampler(self.processes)
+        sampler._start = sampler._last = 0
+        for count in runs:
+            for _ in range(count):
+                self.statistic['runs'] += 1
+                self.statistic.record(0.1)
+            self.statistic['fails'] += 1
+            sampler.sample()
+
+    def test_disabled(self):
+        self.assertIsNone(metrics.get_sampler(self.processes))
+
+    def test_json_lines(self):
+        path = os.path.join(self.dir, 'metrics.json')
+        cfg.CONF.set_default('metrics_file', path, group='stress')
+        self._run([3, 0])
+        with open(path) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(['create', 'delete', 'create', 'delete'],
+                         [row['action'] for row in rows])
+        self.assertEqual((3, 1), (rows[0]['runs'], rows[0]['fails']))
+        self.assertAlmostEqual(100, rows[0]['p99'], delta=1)
+        self.assertEqual((0, 1, None), (rows[2]['runs'], rows[2]['fails'],
+                                        rows[2]['p50']))
+
+    def test_csv(self):
+        path = os.path.join(self.dir, 'metrics.csv')
+        cfg.CONF.set_default('metrics_file', path, group='stress')
+        self._run([2, 1])
+        with open(path) as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(list(metrics.FIELDS), sorted(
+            rows[0], key=metrics.FIELDS.index))
+        self.assertEqual(['2', '0', '1', '0'], [row['runs'] for row in rows])
+
+    def test_statsd(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.addCleanup(server.close)
+        server.bind(('127.0.0.1', 0))
+        server.settimeout(5)
+        cfg.CONF.set_default('metrics_address',
+                             '127.0.0.1:%d' % server.getsockname()[1],
+                             group='stress')
+        self._run([1])
+        lines = server.recv(65536).decode('utf-8').splitlines()
+        self.assertIn('tempest.stress.create.runs:1|c', lines)
+        self.assertIn('tempest.stress.create.fails:1|c', lines)
+        self.assertTrue(any(line.startswith('tempest.stress.create.p95:')
+                            and line.endswith('|g') for line in lines))
+
+    def test_graphite_lines(self):
+        writer = metrics.LineProtocolWriter('localhost:2003', 'graphite',
+                                            'soak')
+        row = dict.fromkeys(metrics.FIELDS)
+        row.update({'time': 1000, 'action': 'Server.Create', 'runs': 5,
+                    'fails': 0})
+        self.assertEqual(['soak.Server_Create.runs 5 1000',
+                          'soak.Server_Create.fails 0 1000'],
+                         list(writer._lines(row)))
+
+    def test_stop_samples_the_last_interval(self):
+        path = os.path.join(self.dir, 'metrics.json')
+        cfg.CONF.set_default('metrics_file', path, group='stress')
+        sampler = metrics.get_sampler(self.processes)
+        sampler.start()
+        sampler.stop()
+        self.assertFalse(sampler.is_alive())
+        with open(path) as f:
+            self.assertEqual(2, len(f.readlines()))
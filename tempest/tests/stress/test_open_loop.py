@@ -0,0 +1,99 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+import random
+
+from six.moves import queue
+
+from tempest.stress import open_loop
+from tempest.stress import statistics
+from tempest.tests import base
+from tempest.tests.stress import test_stressaction
+
+
+class TestRateProfile(base.TestCase):
+    def test_constant(self):
+        profile = open_loop.RateProfile(2)
+        self.assertEqual(2.0, profile.rate_at(0))
+        self.assertEqual(2.0, profile.rate_at(1000))
+
+    def test_ramp(self):
+        profile = open_loop.RateProfile([[10, 1], [20, 3]])
+        self.assertEqual(1.0, profile.rate_at(0))
+        self.assertEqual(2.0, profile.rate_at(15))
+        self.assertEqual(3.0, profile.rate_at(25))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, open_loop.RateProfile, -1)
+
+
+class TestArrivalTimes(base.TestCase):
+    def test_uniform(self):
+        times = open_loop.arrival_times(open_loop.RateProfile(4))
+        self.assertEqual([0.25, 0.5, 0.75],
+                         list(itertools.islice(times, 3)))
+
+    def test_stopped(self):
+        times = open_loop.arrival_times(open_loop.RateProfile([[0, 1],
+                                                               [2, 0]]))
+        self.assertEqual([1.0, 3.0], list(times))
+
+    def test_idle(self):
+        times = open_loop.arrival_times(open_loop.RateProfile([[0, 0],
+                                                               [1, 0],
+                                                               [1.5, 10]]))
+        self.assertGreater(next(times), 1.0)
+
+    def test_poisson(self):
+        times = list(itertools.islice(open_loop.arrival_times(
+            open_loop.RateProfile(10), poisson=True, rng=random.Random(42)),
+            1000))
+        self.assertAlmostEqual(100, times[-1], delta=10)
+        self.assertNotEqual(times[1] - times[0], times[2] - times[1])
+
+
+class TestScheduler(base.TestCase):
+    def test_dispatch(self):
+        runs = queue.Queue()
+        statistic = statistics.SharedStatistic()
+        scheduler = open_loop.Scheduler('action', open_loop.RateProfile(100),
+                                        runs, [statistic],
+                                        duration=10, max_runs=5,
+                                        interval=0.01)
+        scheduler.run()
+        self.assertEqual(5, scheduler.offered)
+        dues = [runs.get_nowait() for _ in range(6)]
+        self.assertIsNone(dues[5])
+        self.assertEqual(sorted(dues[:5]), dues[:5])
+        for due in dues:
+            runs.put(due)
+
+        # The queued runs are run by a worker, recording their delays
+        action = test_stressaction.FakeStressAction(manager=None)
+        action.execute(statistic, arrivals=runs)
+        self.assertEqual(5, statistic['runs'])
+        self.assertEqual(5, statistic.delay['count'])
+        scheduler.sample(scheduler._last['seconds'] + 1)
+        sample = scheduler.samples[-1]
+        self.assertEqual((0, 5.0), (sample['offered'], sample['achieved']))
+        self.assertIsNotNone(sample['queueing_delay'])
+        self.assertIn('achieved 5.00 runs/s', scheduler.report()[-1])
+
+    def test_stop(self):
+        scheduler = open_loop.Scheduler('action',
+                                        open_loop.RateProfile(0.001),
+                                        queue.Queue(), [], duration=10000)
+        scheduler.start()
+        scheduler.stop()
+        scheduler.join(5)
+        self.assertFalse(scheduler.is_alive())
@@ -0,0 +1,64 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import multiprocessing
+
+from tempest.stress import statistics
+from tempest.tests import base
+from tempest.tests.stress import test_stressaction
+
+
+class TestSharedStatistic(base.TestCase):
+    def test_counters(self):
+        statistic = statistics.SharedStatistic()
+        statistic['runs'] += 2
+        statistic['fails'] += 1
+        self.assertEqual((2, 1), (statistic['runs'], statistic['fails']))
+
+    def test_histogram(self):
+        statistic = statistics.SharedStatistic()
+        self.assertIsNone(statistic.histogram().percentile(50))
+        for seconds in (0.1, 0.2, 0.3, 1.0):
+            statistic.record(seconds)
+        histogram = statistic.histogram()
+        self.assertEqual(4, histogram.count)
+        self.assertEqual((100000, 1000000), (histogram.min, histogram.max))
+        self.assertAlmostEqual(200000, histogram.percentile(50), delta=2000)
+        self.assertEqual(1000000, histogram.percentile(99))
+
+    def test_shared_with_worker_process(self):
+        statistic = statistics.SharedStatistic()
+        action = test_stressaction.FakeStressAction(manager=None, max_runs=3)
+        process = multiprocessing.Process(target=action.execute,
+                                          args=(statistic,))
+        process.start()
+        process.join()
+        self.assertEqual(3, statistic['runs'])
+        self.assertEqual(3, statistic.histogram().count)
+
+    def test_summarize(self):
+        processes = []
+        for action, fails in (('a', 0), ('a', 1), ('b', 0)):
+            statistic = statistics.SharedStatistic()
+            statistic['runs'] = 10
+            statistic['fails'] = fails
+            statistic.record(0.05)
+            processes.append({'action': action, 'statistic': statistic})
+        summary = statistics.summarize(processes, 4)
+        self.assertEqual(['a', 'b'], [action['action'] for action in summary])
+        self.assertEqual((20, 1, 5.0), (summary[0]['runs'],
+                                        summary[0]['fails'],
+                                        summary[0]['throughput']))
+        self.assertAlmostEqual(50.0, summary[0]['p99'], delta=0.5)
+        self.assertEqual('b: 10 runs (0 failed), 2.50 runs/s, latency '
+                         'p50 50.0 ms, p95 50.0 ms, p99 50.0 ms',
+                         statistics.format_action(summary[1]))
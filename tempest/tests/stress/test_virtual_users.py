@@ -0,0 +1,199 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+import fixtures
+import mock
+from oslo_config import cfg
+from oslo_utils import importutils
+from oslotest import mockpatch
+
+from tempest import exceptions
+from tempest.stress import driver
+from tempest.stress import statistics
+from tempest.stress import stressaction
+from tempest.stress import virtual_users
+from tempest.tests import base
+from tempest.tests import fake_config
+from tempest.tests.stress import test_stressaction
+
+
+class TestSplit(base.TestCase):
+    def test_split(self):
+        self.assertEqual([4, 3, 3], virtual_users.split(10, 3))
+        self.assertEqual([1, 1], virtual_users.split(2, 4))
+        self.assertEqual([5], virtual_users.split(5, 0))
+
+
+class FakeStressActionSetUpFailing(stressaction.StressAction):
+    def setUp(self, **kwargs):
+        raise ValueError('FakeStressActionSetUpFailing raise exception')
+
+    def run(self):
+        pass
+
+
+class FakeStressActionTearDown(stressaction.StressAction):
+    def setUp(self, path=None):
+        self.path = path
+
+    def run(self):
+        time.sleep(0.01)
+
+    def tearDown(self):
+        open(self.path, 'w').close()
+
+
+class TestVirtualUsers(base.TestCase):
+    def setUp(self):
+        super(TestVirtualUsers, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.managers = []
+        self.useFixture(mockpatch.PatchObject(
+            virtual_users.VirtualUsers, '_manager',
+            side_effect=self._manager))
+        self.ready = mock.Mock()
+
+    def _manager(self, credentials):
+        manager = mock.Mock()
+        self.managers.append(manager)
+        return manager
+
+    def test_user_statistic(self):
+        statistic = statistics.SharedStatistic()
+        lock = threading.Lock()
+        first = virtual_users.UserStatistic(statistic, lock)
+        second = virtual_users.UserStatistic(statistic, lock)
+        first['runs'] += 2
+        second['runs'] += 1
+        second['fails'] += 1
+        second.record(0.1)
+        self.assertEqual((2, 1), (first['runs'], second['runs']))
+        self.assertEqual((3, 1), (statistic['runs'], statistic['fails']))
+        self.assertEqual(1, statistic.histogram().count)
+
+    def test_threads(self):
+        statistic = statistics.SharedStatistic()
+        users = virtual_users.VirtualUsers(
+            test_stressaction.FakeStressAction, [None] * 3, 10, statistic,
+            max_runs=5)
+        users.run(self.ready)
+        self.ready.send.assert_called_once_with('FakeStressAction')
+        self.assertTrue(cfg.CONF.http.connection_pool)
+        self.assertEqual((50, 0), (statistic['runs'], statistic['fails']))
+        self.assertEqual(50, statistic.histogram().count)
+        self.assertEqual(3, len(users.actions))
+        for action, manager in zip(users.actions, self.managers):
+            self.assertIs(manager, action.manager)
+            manager.auth_provider.set_auth.assert_called_once_with()
+            # Each user runs a copy of the action of its tenant
+            self.assertFalse(action.run_called)
+
+    def test_stop_on_error(self):
+        statistic = statistics.SharedStatistic()
+        virtual_users.VirtualUsers(
+            test_stressaction.FakeStressActionFailing, [None], 4, statistic,
+            max_runs=5, stop_on_error=True).run()
+        self.assertEqual((8, 8), (statistic['runs'], statistic['fails']))
+
+    def test_set_up_failure(self):
+        users = virtual_users.VirtualUsers(FakeStressActionSetUpFailing,
+                                           [None], 1,
+                                           statistics.SharedStatistic())
+        self.assertRaises(ValueError, users.run, self.ready)
+        self.ready.send.assert_called_once_with(None)
+
+    def test_sigterm_tears_the_actions_down(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'torn-down')
+        users = virtual_users.VirtualUsers(
+            FakeStressActionTearDown, [None], 2,
+            statistics.SharedStatistic(), kwargs={'path': path})
+        ready, child_ready = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=users.execute,
+                                          args=(child_ready,))
+        process.start()
+        self.addCleanup(lambda: process.is_alive() and
+                        os.kill(process.pid, signal.SIGKILL))
+        self.assertEqual('FakeStressActionTearDown', ready.recv())
+        # Once the main thread of the process waits for the users
+        time.sleep(0.5)
+        process.terminate()
+        process.join(10)
+        self.assertEqual(0, process.exitcode)
+        self.assertTrue(os.path.exists(path))
+
+    def test_green_without_eventlet(self):
+        self.patch('oslo_utils.importutils.try_import', return_value=None)
+        users = virtual_users.VirtualUsers(
+            test_stressaction.FakeStressAction, [None], 1,
+            statistics.SharedStatistic(), backend='green')
+        self.assertRaises(exceptions.InvalidConfiguration, users.run,
+                          self.ready)
+        self.ready.send.assert_called_once_with(None)
+        self.assertEqual([], self.managers)
+
+    def test_green(self):
+        if importutils.try_import('eventlet') is None:
+            self.skipTest('eventlet is not installed')
+        monkey_patch = self.patch('eventlet.monkey_patch')
+        statistic = statistics.SharedStatistic()
+        users = virtual_users.VirtualUsers(
+            test_stressaction.FakeStressAction, [None] * 2, 20, statistic,
+            max_runs=3, backend='green')
+        # Patched before any client is created
+        monkey_patch.side_effect = lambda: self.assertEqual([],
+                                                            self.managers)
+        users.run()
+        monkey_patch.assert_called_once_with()
+        self.assertEqual(60, statistic['runs'])
+
+
+class TestStartVirtualUsers(base.TestCase):
+    def setUp(self):
+        super(TestStartVirtualUsers, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.useFixture(fixtures.MonkeyPatch(
+            'tempest.stress.driver.processes', []))
+        self.useFixture(mockpatch.PatchObject(
+            virtual_users.VirtualUsers, '_manager',
+            side_effect=lambda credentials: mock.Mock()))
+
+    def _test(self, **kwargs):
+        test = {'action': 'tempest.tests.stress.test_stressaction.'
+                          'FakeStressAction'}
+        test.update(kwargs)
+        return test
+
+    def test_processes(self):
+        driver._start_virtual_users(
+            self._test(virtual_users=5, processes=2), None, 2, False)
+        self.assertEqual(2, len(driver.processes))
+        for process in driver.processes:
+            process['process'].join(30)
+            self.assertEqual(0, process['process'].exitcode)
+            self.assertEqual('FakeStressAction', process['action'])
+        self.assertEqual([6, 4], [process['statistic']['runs']
+                                  for process in driver.processes])
+        # Only the configuration of the worker processes is changed
+        self.assertFalse(cfg.CONF.http.connection_pool)
+
+    def test_no_users(self):
+        self.assertRaises(exceptions.InvalidConfiguration,
+                          driver._start_virtual_users,
+                          self._test(virtual_users=0), None, None, False)
+        self.assertEqual([], driver.processes)
@@ -0,0 +1,67 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from oslo_config import cfg
+from oslotest import mockpatch
+from tempest_lib import auth
+
+from tempest import clients
+from tempest import config
+from tempest.services.compute.json import servers_client
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class TestManager(base.TestCase):
+    def setUp(self):
+        super(TestManager, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.credentials = auth.KeystoneV2Credentials(
+            username='fake_username', password='fake_password',
+            tenant_name='fake_tenant_name')
+
+    def test_clients_created_on_first_access(self):
+        client_init = self.useFixture(mockpatch.PatchObject(
+            servers_client.ServersClient, '__init__', return_value=None))
+        manager = clients.Manager(self.credentials)
+        self.assertNotIn('servers_client', manager.__dict__)
+        self.assertFalse(client_init.mock.called)
+        servers = manager.servers_client
+        self.assertIsInstance(servers, servers_client.ServersClient)
+        self.assertIs(servers, manager.servers_client)
+        self.assertEqual(1, client_init.mock.call_count)
+
+    def test_client_set_before_access(self):
+        manager = clients.Manager(self.credentials)
+        fake_client = mock.Mock()
+        manager.servers_client = fake_client
+        self.assertIs(fake_client, manager.servers_client)
+
+    def test_unknown_attribute(self):
+        manager = clients.Manager(self.credentials)
+        self.assertRaises(AttributeError, getattr, manager, 'fake_client')
+
+    def test_disabled_service_client_not_set(self):
+        cfg.CONF.set_default('glance', False, group='service_available')
+        manager = clients.Manager(self.credentials)
+        self.assertFalse(hasattr(manager, 'image_client'))
+
+    @mock.patch('tempest.services.botoclients.APIClientEC2')
+    def test_ec2_credentials_fetched_on_access(self, mock_ec2):
+        cfg.CONF.set_default('api_v2', True,
+                             group='identity-feature-enabled')
+        manager = clients.Manager(self.credentials)
+        self.assertFalse(mock_ec2.called)
+        self.assertIs(mock_ec2.return_value, manager.ec2api_client)
+        mock_ec2.assert_called_once_with(manager.identity_client)
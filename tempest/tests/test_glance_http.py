@@ -13,8 +13,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import hashlib
+import io
+import os
 import socket
 
+import fixtures
 import mock
 from oslo_serialization import jsonutils as json
 from oslotest import mockpatch
@@ -137,8 +141,44 @@ class TestGlanceHTTPClient(base.TestCase):
         resp, body = self.client.raw_request('PUT', '/images', body=req_body)
         self.assertEqual(200, resp.status)
         self.assertEqual('fake_response_body', body.read())
+        # The size, data and end of each chunk, then the last chunk
         call_count = httplib.HTTPConnection.send.call_count
-        self.assertEqual(call_count - 1, req_body.tell())
+        self.assertEqual(3 * req_body.tell() + 1, call_count)
+
+    def _test_raw_request_chunked_body(self, req_body):
+        sent = []
+        self.useFixture(mockpatch.PatchObject(httplib.HTTPConnection,
+                        'endheaders'))
+        self.useFixture(mockpatch.PatchObject(
+            httplib.HTTPConnection, 'send',
+            side_effect=lambda data: sent.append(bytes(data))))
+        self._set_response_fixture({}, 200, 'fake_response_body')
+        self.client.chunk_size = 4
+        resp, body = self.client.raw_request('PUT', '/images', body=req_body)
+        self.assertEqual(200, resp.status)
+        self.assertEqual(b'4\r\nfake\r\n4\r\n_req\r\n4\r\nuest\r\n'
+                         b'4\r\n_bod\r\n1\r\ny\r\n0\r\n\r\n',
+                         b''.join(sent))
+
+    def test_raw_request_chunked_buffer_reused(self):
+        self._test_raw_request_chunked_body(io.BytesIO(b'fake_request_body'))
+
+    def test_raw_request_chunked_real_file(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path, 'img')
+        with open(path, 'wb') as f:
+            f.write(b'fake_request_body')
+        with open(path, 'rb') as req_body:
+            self._test_raw_request_chunked_body(req_body)
+            self.assertEqual(17, req_body.tell())
+
+    def test_raw_request_checksum(self):
+        self._set_response_fixture(
+            {'content-type': 'application/octet-stream'}, 200, 'image data')
+        resp, body = self.client.raw_request('GET', '/images/fake/file',
+                                             checksum='md5')
+        self.assertEqual('image data', ''.join(body))
+        self.assertEqual(hashlib.md5(b'image data').hexdigest(),
+                         body.checksum())
 
     def test_get_connection_class_for_https(self):
         conn_class = self.client.get_connection_class('https')
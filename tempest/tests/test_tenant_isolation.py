@@ -12,15 +12,22 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import os
+import time
+
+import fixtures
 import mock
 from oslo_config import cfg
 from oslotest import mockpatch
+from tempest_lib import exceptions as lib_exc
 from tempest_lib.services.identity.v2 import token_client as json_token_client
 
 from tempest.common import isolated_creds
 from tempest.common import service_client
+from tempest.common import token_cache
 from tempest import config
 from tempest import exceptions
+from tempest import manager
 from tempest.services.identity.v2.json import identity_client as \
     json_iden_client
 from tempest.services.network.json import network_client as json_network_client
@@ -562,3 +569,294 @@ class TestTenantIsolation(base.TestCase):
         self._mock_tenant_create('1234', 'fake_prim_tenant')
         self.assertRaises(exceptions.InvalidConfiguration,
                           iso_creds.get_primary_creds)
+
+    @mock.patch('tempest_lib.common.rest_client.RestClient')
+    def test_primary_creds_from_warm_pool(self, MockRestClient):
+        iso_creds = isolated_creds.IsolatedCreds(name='test class')
+        pooled_creds = mock.Mock(user_id='1234', tenant_id='5678')
+        pool = mock.Mock()
+        pool.get.return_value = pooled_creds
+        self.useFixture(mockpatch.PatchObject(isolated_creds, 'get_warm_pool',
+                                              return_value=pool))
+        user_fix = self._mock_user_create('1234', 'fake_prim_user')
+        update_tenant = self.patch('tempest.services.identity.v2.json.'
+                                   'identity_client.IdentityClient.'
+                                   'update_tenant')
+        update_user = self.patch('tempest.services.identity.v2.json.'
+                                 'identity_client.IdentityClient.update_user')
+        primary_creds = iso_creds.get_primary_creds()
+        self.assertIs(pooled_creds, primary_creds)
+        self.assertFalse(user_fix.mock.called)
+        # The pooled credentials are cleared with the other ones
+        self.assertIs(pooled_creds, iso_creds.isolated_creds['primary'])
+        # And renamed after the test class
+        project_name = pooled_creds.credentials.tenant_name
+        username = pooled_creds.credentials.username
+        self.assertIn('test class-', project_name)
+        self.assertIn('test class-', username)
+        update_tenant.assert_called_once_with('5678', name=project_name)
+        update_user.assert_called_once_with('1234', name=username)
+
+    @mock.patch('tempest_lib.common.rest_client.RestClient')
+    def test_role_creds_not_from_warm_pool(self, MockRestClient):
+        cfg.CONF.set_default('neutron', False, 'service_available')
+        iso_creds = isolated_creds.IsolatedCreds(name='test class')
+        pool_fix = self.useFixture(mockpatch.PatchObject(
+            isolated_creds, 'get_warm_pool'))
+        self._mock_list_2_roles()
+        self._mock_tenant_create('1234', 'fake_role_tenant')
+        self._mock_user_create('1234', 'fake_role_user')
+        with mock.patch.object(json_iden_client.IdentityClient,
+                               'assign_user_role') as user_mock:
+            iso_creds.get_creds_by_roles(roles=['role1', 'role2'])
+        # The pooled users would have the primary roles as well
+        self.assertFalse(pool_fix.mock.called)
+        self.assertEqual(2, user_mock.call_count)
+
+    @mock.patch('tempest_lib.common.rest_client.RestClient')
+    def test_empty_warm_pool(self, MockRestClient):
+        cfg.CONF.set_default('neutron', False, 'service_available')
+        iso_creds = isolated_creds.IsolatedCreds(name='test class')
+        pool = mock.Mock()
+        pool.get.return_value = None
+        self.useFixture(mockpatch.PatchObject(isolated_creds, 'get_warm_pool',
+                                              return_value=pool))
+        self._mock_assign_user_role()
+        self._mock_list_role()
+        self._mock_tenant_create('1234', 'fake_prim_tenant')
+        self._mock_user_create('1234', 'fake_prim_user')
+        primary_creds = iso_creds.get_primary_creds()
+        self.assertEqual(primary_creds.username, 'fake_prim_user')
+
+    @mock.patch('tempest_lib.common.rest_client.RestClient')
+    def test_warm_pool_skipped_with_network_resources(self, MockRestClient):
+        iso_creds = isolated_creds.IsolatedCreds(
+            name='test class', network_resources={'network': False,
+                                                  'router': False,
+                                                  'subnet': False,
+                                                  'dhcp': False})
+        pool_fix = self.useFixture(mockpatch.PatchObject(
+            isolated_creds, 'get_warm_pool'))
+        self.assertIsNone(iso_creds._get_pooled_credentials())
+        self.assertFalse(pool_fix.mock.called)
+
+    def test_warm_pool_disabled(self):
+        self.assertIsNone(isolated_creds.get_warm_pool())
+
+    @mock.patch('tempest_lib.common.rest_client.RestClient')
+    def test_warm_pool_refill_and_stop(self, MockRestClient):
+        provisioned = []
+
+        def provision(admin=False, roles=None):
+            provisioned.append(mock.Mock(tenant_id=str(len(provisioned))))
+            return provisioned[-1]
+
+        self.useFixture(mockpatch.PatchObject(
+            isolated_creds.IsolatedCreds, '_provision_credentials',
+            side_effect=provision))
+        clear_fix = self.useFixture(mockpatch.PatchObject(
+            isolated_creds.IsolatedCreds, 'clear_isolated_creds'))
+        pool = isolated_creds.WarmPool(2)
+
+        def wait_provisioned(count):
+            for _ in range(500):
+                if len(provisioned) >= count:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(count, len(provisioned))
+
+        wait_provisioned(2)
+        self.assertIs(provisioned[0], pool.get())
+        # The pool is refilled after the get
+        wait_provisioned(3)
+        pool.stop()
+        # The credentials left in the pool are cleared
+        self.assertEqual(1, clear_fix.mock.call_count)
+        self.assertIsNone(pool.get())
+
+    def _enable_task_pool(self):
+        cfg.CONF.set_default('isolated_creds_workers', 4, group='auth')
+        self.useFixture(mockpatch.PatchObject(isolated_creds, '_task_pool',
+                                              None))
+
+    def _mock_identity_client(self, method, return_value=None):
+        return self.useFixture(mockpatch.PatchObject(
+            json_iden_client.IdentityClient, method,
+            return_value=return_value)).mock
+
+    def _mock_network_client(self, method, return_value=None):
+        return self.useFixture(mockpatch.PatchObject(
+            json_network_client.NetworkClient, method,
+            return_value=return_value)).mock
+
+    @mock.patch('tempest_lib.common.rest_client.RestClient')
+    def test_concurrent_network_creation(self, MockRestClient):
+        self._enable_task_pool()
+        iso_creds = isolated_creds.IsolatedCreds(name='test class')
+        self._mock_assign_user_role()
+        self._mock_list_role()
+        self._mock_user_create('1234', 'fake_prim_user')
+        self._mock_tenant_create('1234', 'fake_prim_tenant')
+        self._mock_network_client(
+            'create_network', {'network': {'id': '12', 'name': 'fake_net'}})
+        self._mock_network_client(
+            'create_subnet', {'subnet': {'id': '34', 'name': 'fake_subnet'}})
+        self._mock_router_create('56', 'fake_router')
+        interface_mock = self._mock_network_client(
+            'add_router_interface_with_subnet_id')
+        primary_creds = iso_creds.get_primary_creds()
+        interface_mock.assert_called_once_with('56', '34')
+        self.assertEqual('fake_prim_user', primary_creds.username)
+        self.assertEqual('12', primary_creds.network['id'])
+        self.assertEqual('34', primary_creds.subnet['id'])
+        self.assertEqual('56', primary_creds.router['id'])
+
+    @mock.patch('tempest_lib.common.rest_client.RestClient')
+    def test_concurrent_network_creation_failure(self, MockRestClient):
+        self._enable_task_pool()
+        iso_creds = isolated_creds.IsolatedCreds(name='test class')
+        self._mock_assign_user_role()
+        self._mock_list_role()
+        self._mock_user_create('1234', 'fake_prim_user')
+        self._mock_tenant_create('1234', 'fake_prim_tenant')
+        self._mock_network_client(
+            'create_network', {'network': {'id': '12', 'name': 'fake_net'}})
+        self._mock_network_client(
+            'create_subnet', {'subnet': {'id': '34', 'name': 'fake_subnet'}})
+        self._mock_network_client('create_router').side_effect = (
+            lib_exc.BadRequest())
+        delete_network = self._mock_network_client('delete_network')
+        delete_subnet = self._mock_network_client('delete_subnet')
+        self._mock_network_client('list_security_groups',
+                                  {'security_groups': []})
+        delete_user = self._mock_identity_client('delete_user')
+        delete_tenant = self._mock_identity_client('delete_tenant')
+        self.assertRaises(lib_exc.BadRequest, iso_creds.get_primary_creds)
+        delete_network.assert_called_once_with('12')
+        delete_subnet.assert_called_once_with('34')
+        delete_user.assert_called_once_with('1234')
+        delete_tenant.assert_called_once_with('1234')
+
+    @mock.patch('tempest_lib.common.rest_client.RestClient')
+    def test_concurrent_creation_failure_with_router(self, MockRestClient):
+        self._enable_task_pool()
+        iso_creds = isolated_creds.IsolatedCreds(name='test class')
+        self._mock_assign_user_role()
+        self._mock_list_role()
+        self._mock_user_create('1234', 'fake_prim_user').mock.side_effect = (
+            lib_exc.Unauthorized())
+        self._mock_tenant_create('1234', 'fake_prim_tenant')
+        self._mock_network_client(
+            'create_network', {'network': {'id': '12', 'name': 'fake_net'}})
+        self._mock_network_client(
+            'create_subnet', {'subnet': {'id': '34', 'name': 'fake_subnet'}})
+        self._mock_router_create('56', 'fake_router')
+        self._mock_network_client('add_router_interface_with_subnet_id')
+        calls = mock.Mock()
+        calls.delete_router.side_effect = lib_exc.Conflict()
+        for method in ('remove_router_interface_with_subnet_id',
+                       'delete_router', 'delete_subnet', 'delete_network'):
+            self._mock_network_client(method).side_effect = getattr(calls,
+                                                                    method)
+        self._mock_network_client('list_security_groups',
+                                  {'security_groups': []})
+        delete_user = self._mock_identity_client('delete_user')
+        delete_tenant = self._mock_identity_client('delete_tenant')
+        # The error of the creation is raised, not that of the deletions
+        self.assertRaises(lib_exc.Unauthorized, iso_creds.get_primary_creds)
+        self.assertEqual([mock.call.remove_router_interface_with_subnet_id(
+                          '56', '34'),
+                          mock.call.delete_router('56'),
+                          mock.call.delete_subnet('34'),
+                          mock.call.delete_network('12')], calls.mock_calls)
+        self.assertFalse(delete_user.called)
+        delete_tenant.assert_called_once_with('1234')
+
+    @mock.patch('tempest_lib.common.rest_client.RestClient')
+    def test_concurrent_role_creds(self, MockRestClient):
+        self._enable_task_pool()
+        cfg.CONF.set_default('neutron', False, 'service_available')
+        iso_creds = isolated_creds.IsolatedCreds('v2', 'test class')
+        self._mock_list_2_roles()
+        self._mock_user_create('1234', 'fake_role_user')
+        self._mock_tenant_create('1234', 'fake_role_tenant')
+        with mock.patch.object(json_iden_client.IdentityClient,
+                               'assign_user_role') as user_mock:
+            role_creds = iso_creds.get_creds_by_roles(roles=['role1', 'role2'])
+        args = [call[1] for call in user_mock.mock_calls]
+        self.assertEqual(2, len(args))
+        self.assertIn(('1234', '1234', '1234'), args)
+        self.assertIn(('1234', '1234', '12345'), args)
+        self.assertEqual('fake_role_user', role_creds.username)
+
+    @mock.patch('tempest_lib.common.rest_client.RestClient')
+    def test_prefetch_credentials(self, MockRestClient):
+        self._enable_task_pool()
+        cfg.CONF.set_default('neutron', False, 'service_available')
+        iso_creds = isolated_creds.IsolatedCreds(name='test class')
+        self._mock_assign_user_role()
+        self._mock_list_roles('1234', 'admin')
+        user_fix = self._mock_user_create('1234', 'fake_user')
+        self._mock_tenant_create('1234', 'fake_tenant')
+        iso_creds.prefetch_credentials(['primary', 'alt', 'admin',
+                                        ['role_user', 'role1'], 'primary'])
+        self.assertEqual(['admin', 'alt', 'primary'],
+                         sorted(iso_creds.isolated_creds))
+        self.assertEqual(3, user_fix.mock.call_count)
+        # The prefetched credentials are returned afterwards
+        self.assertIs(iso_creds.isolated_creds['alt'],
+                      iso_creds.get_alt_creds())
+        self.assertEqual(3, user_fix.mock.call_count)
+
+    @mock.patch('tempest_lib.common.rest_client.RestClient')
+    def test_prefetch_credentials_without_task_pool(self, MockRestClient):
+        iso_creds = isolated_creds.IsolatedCreds(name='test class')
+        user_fix = self._mock_user_create('1234', 'fake_user')
+        iso_creds.prefetch_credentials(['primary', 'alt'])
+        self.assertEqual({}, iso_creds.isolated_creds)
+        self.assertFalse(user_fix.mock.called)
+
+    @mock.patch('tempest_lib.common.rest_client.RestClient')
+    def test_deferred_cleanup(self, MockRestClient):
+        cfg.CONF.set_default('neutron', False, 'service_available')
+        iso_creds = isolated_creds.IsolatedCreds(name='test class')
+        self._mock_assign_user_role()
+        self._mock_list_role()
+        self._mock_tenant_create('1234', 'fake_prim_tenant')
+        self._mock_user_create('1234', 'fake_prim_user')
+        iso_creds.get_primary_creds()
+        deferred_reaper = mock.Mock()
+        self.useFixture(mockpatch.PatchObject(
+            isolated_creds.reaper, 'get_reaper',
+            return_value=deferred_reaper))
+        delete_user = self.patch('tempest.services.identity.v2.json.'
+                                 'identity_client.IdentityClient.delete_user')
+        iso_creds.clear_isolated_creds()
+        self.assertFalse(delete_user.called)
+        deferred_reaper.reap.assert_called_once_with(
+            iso_creds, [{'user_id': '1234', 'username': 'fake_prim_user',
+                         'project_id': '1234',
+                         'project_name': 'fake_prim_tenant'}])
+        self.assertEqual({}, iso_creds.isolated_creds)
+
+    @mock.patch('tempest_lib.common.rest_client.RestClient')
+    def test_cleanup_removes_cached_tokens(self, MockRestClient):
+        cfg.CONF.set_default('neutron', False, 'service_available')
+        path = self.useFixture(fixtures.TempDir()).path
+        cfg.CONF.set_default('token_cache_dir', path, group='identity')
+        iso_creds = isolated_creds.IsolatedCreds(name='test class')
+        self._mock_assign_user_role()
+        self._mock_list_role()
+        self._mock_tenant_create('1234', 'fake_prim_tenant')
+        self._mock_user_create('1234', 'fake_prim_user')
+        creds = iso_creds.get_primary_creds()
+        manager.get_auth_provider(creds.credentials).get_token()
+        other = token_cache.get_cache_key(object, 'url', {}, 'other_user')
+        token_cache.get_token_cache().set(other, ('token', {}))
+        self.patch('tempest.services.identity.v2.json.identity_client.'
+                   'IdentityClient.delete_user')
+        self.patch('tempest.services.identity.v2.json.identity_client.'
+                   'IdentityClient.delete_tenant')
+        iso_creds.clear_isolated_creds()
+        # The token, and token lock, of the deleted user are removed
+        self.assertEqual(['%s.json' % other], os.listdir(path))
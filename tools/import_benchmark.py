@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Measure the time it takes to import a test module and to list the tests
+
+Each measurement runs in a fresh interpreter, from the root of the given
+tempest trees, so that a change can be compared with a checkout of the
+previous revision::
+
+    git worktree add /tmp/tempest-before HEAD~1
+    tools/import_benchmark.py . /tmp/tempest-before
+
+Besides the wall clock times (median of the runs), it reports how many
+service client and response schema modules were imported, and whether boto
+was.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+IMPORT_SCRIPT = """
+import sys
+import %s
+services = [m for m in sys.modules
+            if m.startswith('tempest.services.') and sys.modules[m]]
+schemas = [m for m in sys.modules
+           if m.startswith('tempest.api_schema.') and sys.modules[m]]
+sys.stdout.write('%%d %%d %%s\\n' %% (len(services), len(schemas),
+                                   'boto' in sys.modules))
+"""
+
+
+def _run(tree, args):
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(tree),
+               OS_TEST_LOCK_PATH=os.environ.get('OS_TEST_LOCK_PATH',
+                                                '/tmp'))
+    start = time.time()
+    with open(os.devnull, 'w') as devnull:
+        output = subprocess.check_output([sys.executable] + args, cwd=tree,
+                                         env=env, stderr=devnull)
+    return time.time() - start, output
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+def benchmark(tree, module, test_path, repeat):
+    import_times = []
+    list_times = []
+    for _ in range(repeat):
+        elapsed, output = _run(tree, ['-c', IMPORT_SCRIPT % module])
+        import_times.append(elapsed)
+        elapsed, _ = _run(tree, ['-m', 'subunit.run', 'discover',
+                                 '-t', './', test_path, '--list'])
+        list_times.append(elapsed)
+    # The last line, tempest may log to the standard output
+    services, schemas, boto = output.splitlines()[-1].split()
+    return {'tree': tree,
+            'import': median(import_times),
+            'list': median(list_times),
+            'services': int(services),
+            'schemas': int(schemas),
+            'boto': boto == b'True'}
+
+
+def get_options():
+    parser = argparse.ArgumentParser(
+        description='Measure the import time of a test module and the '
+                    'test listing time of tempest trees.')
+    parser.add_argument('trees', nargs='*', default=['.'], metavar='tree',
+                        help='root of the tempest trees to measure, the '
+                             'current directory by default')
+    parser.add_argument('--module',
+                        default='tempest.api.compute.servers.test_servers',
+                        help='test module to import')
+    parser.add_argument('--test-path', default='./tempest/test_discover',
+                        help='path of the tests to list')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of runs of each measurement')
+    return parser.parse_args()
+
+
+def main(opts=None):
+    if not opts:
+        opts = get_options()
+    print('%-32s %10s %10s %9s %8s %5s' % (
+        'tree', 'import (s)', 'list (s)', 'services', 'schemas', 'boto'))
+    for tree in opts.trees:
+        result = benchmark(tree, opts.module, opts.test_path, opts.repeat)
+        print('%-32s %10.2f %10.2f %9d %8d %5s' % (
+            result['tree'], result['import'], result['list'],
+            result['services'], result['schemas'], result['boto']))
+
+
+if __name__ == "__main__":
+    main()